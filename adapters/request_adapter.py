@@ -1,5 +1,8 @@
 # adapters/request_adapter.py
 import logging
+from entrypoint.provider_router import ROUTING_PROFILES
+from entrypoint.listwise_judge import EVALUATION_MODES
+from entrypoint.result_policy import parse_result_policy
 
 class LLMRequestAdapter:
     def __init__(self):
@@ -15,7 +18,8 @@ class LLMRequestAdapter:
           "short_description": ...,
           "long_description": ...,
           "item_product_type": ...,
-          "task_type": "generation" or "evaluation" (optional, defaults to 'generation'),
+          "item_id": optional, used to key stored results,
+          "task_type": "generation", "evaluation" or "pipeline" (optional, defaults to 'generation'),
           "image_url": optional,
           "attributes_list": optional
         }
@@ -34,8 +38,107 @@ class LLMRequestAdapter:
             'long_description': request_body['long_description'],
             'product_type': request_body['item_product_type'],
             'image_url': request_body.get('image_url',''),
-            'attributes_list': request_body.get('attributes_list',[])
+            'attributes_list': request_body.get('attributes_list',[]),
+            'item_id': request_body.get('item_id')
         }
         task_type = request_body.get('task_type','generation')
         self.logger.debug(f"Adapted request into item={item}, task_type={task_type}")
         return item, task_type
+
+    def adapt_batch(self, request_body: dict):
+        """
+        Adapt a batch request_body into (items, task_type).
+
+        Expected request_body keys:
+        {
+          "items": [ {<same fields as a single /enrich-item request>}, ... ],
+          "task_type": "generation" or "evaluation" (optional, defaults to 'generation')
+        }
+
+        Returns:
+            (items: list of dict, task_type: str)
+        """
+        raw_items = request_body.get('items')
+        if not isinstance(raw_items, list) or not raw_items:
+            raise ValueError("Batch request requires a non-empty 'items' list")
+
+        task_type = request_body.get('task_type','generation')
+        items = [self.adapt(raw_item)[0] for raw_item in raw_items]
+        self.logger.debug(f"Adapted batch request into {len(items)} items, task_type={task_type}")
+        return items, task_type
+
+    def adapt_options(self, request_body: dict, headers=None):
+        """
+        Extract per-request execution options.
+
+        The priority class and caller id may also be given as X-Priority / X-Caller-Id headers;
+        fields in the body win over headers.
+
+        Optional request_body keys:
+        {
+          "handlers": [handler names] - only these handlers may be used,
+          "task_handlers": {task name: [handler names]} - per-task handler limit (wins over "handlers"),
+          "routing_profile": "fast" | "balanced" | "quality" - keep only the top-k ranked handlers per task,
+          "top_k": number of handlers kept per task (defaults to the profile's),
+          "fuse_tasks": true/false - one composite prompt per handler for compatible Markdown tasks,
+          "pack_items": true/false - batch only: several items per prompt for short tasks,
+          "incremental": true/false - return the stored result for generation tasks whose inputs are unchanged,
+          "evaluation_mode": "pointwise" | "listwise" - pipeline only: judge all outputs of a task in one call,
+          "result_policy": "all" | "first_valid" | "quorum_<k>" | "cascade", or {task name: policy} - when to
+                           stop waiting for a task's handlers (the remaining calls are cancelled or never
+                           made, and marked skipped),
+          "priority": "interactive" | "standard" | "bulk" - scheduling class of the request's LLM calls,
+          "caller_id": identifies the caller for fair queuing within a priority class
+        }
+
+        Returns:
+            options: dict (empty if no options were given)
+        """
+        options = {}
+        handlers = request_body.get('handlers')
+        if handlers is not None:
+            if not isinstance(handlers, list) or not all(isinstance(h, str) for h in handlers):
+                raise ValueError("'handlers' must be a list of handler names")
+            options['handlers'] = handlers
+        task_handlers = request_body.get('task_handlers')
+        if task_handlers is not None:
+            if not isinstance(task_handlers, dict) or not all(
+                    isinstance(v, list) and all(isinstance(h, str) for h in v) for v in task_handlers.values()):
+                raise ValueError("'task_handlers' must map task names to lists of handler names")
+            options['task_handlers'] = task_handlers
+        if request_body.get('routing_profile'):
+            if request_body['routing_profile'] not in ROUTING_PROFILES:
+                raise ValueError(f"'routing_profile' must be one of {sorted(ROUTING_PROFILES)}")
+            options['profile'] = request_body['routing_profile']
+        if request_body.get('top_k') is not None:
+            top_k = request_body['top_k']
+            if not isinstance(top_k, int) or isinstance(top_k, bool) or top_k < 1:
+                raise ValueError("'top_k' must be a positive integer")
+            options['top_k'] = top_k
+        if request_body.get('fuse_tasks') is not None:
+            options['fuse_tasks'] = bool(request_body['fuse_tasks'])
+        if request_body.get('pack_items') is not None:
+            options['pack_items'] = bool(request_body['pack_items'])
+        if request_body.get('incremental') is not None:
+            options['incremental'] = bool(request_body['incremental'])
+        if request_body.get('evaluation_mode'):
+            if request_body['evaluation_mode'] not in EVALUATION_MODES:
+                raise ValueError(f"'evaluation_mode' must be one of {list(EVALUATION_MODES)}")
+            options['evaluation_mode'] = request_body['evaluation_mode']
+        result_policy = request_body.get('result_policy')
+        if result_policy is not None:
+            policies = result_policy.values() if isinstance(result_policy, dict) else [result_policy]
+            if not all(isinstance(p, str) for p in policies):
+                raise ValueError("'result_policy' must be a policy name or map task names to policy names")
+            for policy in policies:
+                parse_result_policy(policy)
+            options['result_policy'] = result_policy
+        headers = headers or {}
+        priority = request_body.get('priority') or headers.get('x-priority')
+        if priority:
+            options['priority'] = str(priority).lower()
+        caller_id = request_body.get('caller_id') or headers.get('x-caller-id')
+        if caller_id:
+            options['caller_id'] = str(caller_id)
+        self.logger.debug(f"Adapted request options={options}")
+        return options
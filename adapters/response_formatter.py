@@ -18,3 +18,37 @@ class DefaultJSONResponseFormatter:
         """
         self.logger.debug("Formatting results for response.")
         return results
+
+
+class SegmentStoreResponseFormatter:
+    def __init__(self, segment_store, include_results: bool = False):
+        """
+        Formatter for bulk runs: appends results to a SegmentStore instead of returning them in full.
+
+        Args:
+            segment_store: SegmentStore receiving one compressed record per (item, task).
+            include_results (bool): Also echo the full results back in the response.
+        """
+        self.segment_store = segment_store
+        self.include_results = include_results
+        self.logger = logging.getLogger(__name__)
+
+    def format(self, results, item_id=None):
+        """
+        Stores the results and returns a compact acknowledgement.
+
+        Args:
+            results (dict): processed results from ItemEnricher.
+            item_id (str): key the results are stored under.
+
+        Returns:
+            dict: {'item_id', 'stored_tasks'} (plus 'results' if include_results is set)
+        """
+        if item_id is None:
+            raise ValueError("SegmentStoreResponseFormatter requires an item_id")
+        stored = self.segment_store.append_item_results(item_id, results)
+        self.logger.debug(f"Stored {stored} task records for item '{item_id}'.")
+        formatted = {'item_id': item_id, 'stored_tasks': stored}
+        if self.include_results:
+            formatted['results'] = results
+        return formatted
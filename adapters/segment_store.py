@@ -0,0 +1,298 @@
+# adapters/segment_store.py
+import os
+import json
+import mmap
+import zlib
+import fcntl
+import struct
+import hashlib
+import logging
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Every record in a segment is a little-endian uint32 length followed by a zlib-compressed JSON payload.
+RECORD_HEADER = struct.Struct('<I')
+# Sidecar index entry: item hash, task hash, record offset, record length (28 bytes).
+INDEX_ENTRY = struct.Struct('<QQQI')
+# Held with an exclusive flock while a SegmentStore has the directory open.
+LOCK_FILE = 'store.lock'
+
+
+def key_hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class SegmentStore:
+    def __init__(self, directory: str, max_segment_bytes: int = 256 * 1024 * 1024, compression_level: int = 6):
+        """
+        Append-only store of compressed enrichment results, split into size-bounded segment files.
+
+        Each ``seg-NNNNNN.dat`` file has a ``seg-NNNNNN.idx`` sidecar of fixed-size entries keyed by
+        hashes of the item id and task. When a segment is sealed its index is sorted, so a single
+        item's records are found by binary search over the memory-mapped index and read straight
+        from the memory-mapped segment. Analytics scans simply stream the segment files in order.
+
+        A store is the directory's only writer: it holds an exclusive ``flock`` on ``store.lock`` in
+        the directory until it is closed, and opening a second store on the same directory (in this
+        or another process) fails.
+
+        Args:
+            directory (str): Directory holding the segment and index files.
+            max_segment_bytes (int): Size after which the active segment is sealed and a new one started.
+            compression_level (int): zlib compression level for record payloads.
+        """
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.compression_level = compression_level
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = self._acquire_directory_lock()
+
+        segment_ids = self._segment_ids()
+        self._active_id = segment_ids[-1] if segment_ids else 1
+        if os.path.exists(self._sealed_marker(self._active_id)):
+            self._active_id += 1
+        elif segment_ids:
+            self._recover_active()
+        self._open_active()
+
+    # ---- writing -----------------------------------------------------------------------------
+
+    def append(self, item_id: str, task: str, payload: Any) -> Tuple[int, int]:
+        """
+        Appends one (item, task) record.
+
+        Returns:
+            Tuple[int, int]: (segment id, record offset).
+        """
+        record = {'item_id': item_id, 'task': task, 'payload': payload}
+        body = zlib.compress(json.dumps(record, separators=(',', ':')).encode('utf-8'), self.compression_level)
+        with self._lock:
+            offset = self._data_file.tell()
+            self._data_file.write(RECORD_HEADER.pack(len(body)))
+            self._data_file.write(body)
+            self._index_file.write(INDEX_ENTRY.pack(key_hash(item_id), key_hash(task), offset, RECORD_HEADER.size + len(body)))
+            segment_id = self._active_id
+            if self._data_file.tell() >= self.max_segment_bytes:
+                self._seal_active()
+                self._active_id += 1
+                self._open_active()
+        return segment_id, offset
+
+    def append_item_results(self, item_id: str, results: Dict[str, Any]) -> int:
+        """
+        Appends one record per task from an ItemEnricher result dict ({task: {handler: result}}).
+
+        Returns:
+            int: Number of records written.
+        """
+        for task, handler_results in results.items():
+            self.append(item_id, task, handler_results)
+        return len(results)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._data_file.flush()
+            self._index_file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._data_file.flush()
+            self._index_file.flush()
+            os.fsync(self._data_file.fileno())
+            os.fsync(self._index_file.fileno())
+            self._data_file.close()
+            self._index_file.close()
+            # Closing the file releases the flock
+            self._lock_file.close()
+
+    # ---- reading -----------------------------------------------------------------------------
+
+    def lookup(self, item_id: str, task: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Random-access lookup of an item's records (optionally for a single task), oldest first.
+        """
+        self.flush()
+        item_h = key_hash(item_id)
+        task_h = key_hash(task) if task is not None else None
+        records = []
+        for segment_id in self._segment_ids():
+            locations = self._find_in_index(segment_id, item_h, task_h)
+            if not locations:
+                continue
+            with open(self._data_path(segment_id), 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for offset, length in locations:
+                    try:
+                        record = self._decode(data[offset:offset + length])
+                    except (zlib.error, ValueError, struct.error) as e:
+                        self.logger.warning(f"Skipping corrupt record at offset {offset} of segment {segment_id}: {e}")
+                        continue
+                    # Hash collisions are possible in principle; the payload carries the real keys.
+                    if record['item_id'] == item_id and (task is None or record['task'] == task):
+                        records.append(record)
+        return records
+
+    def scan(self, task: Optional[str] = None, buffer_size: int = 1 << 20) -> Iterator[Dict[str, Any]]:
+        """
+        Sequentially streams every record in write order, optionally filtered by task.
+        """
+        self.flush()
+        for segment_id in self._segment_ids():
+            with open(self._data_path(segment_id), 'rb', buffering=buffer_size) as f:
+                while True:
+                    header = f.read(RECORD_HEADER.size)
+                    if len(header) < RECORD_HEADER.size:
+                        break
+                    (length,) = RECORD_HEADER.unpack(header)
+                    body = f.read(length)
+                    if len(body) < length:
+                        self.logger.warning(f"Truncated record at the end of segment {segment_id}; stopping scan.")
+                        break
+                    try:
+                        record = json.loads(zlib.decompress(body))
+                    except (zlib.error, ValueError) as e:
+                        self.logger.warning(f"Corrupt record in segment {segment_id}; stopping its scan: {e}")
+                        break
+                    if task is None or record['task'] == task:
+                        yield record
+
+    # ---- internals ---------------------------------------------------------------------------
+
+    def _acquire_directory_lock(self):
+        lock_file = open(os.path.join(self.directory, LOCK_FILE), 'ab')
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            raise ValueError(f"Segment directory '{self.directory}' is already open by another SegmentStore; "
+                             f"every writer needs its own directory")
+        return lock_file
+
+    def _segment_ids(self) -> List[int]:
+        return sorted(int(name[4:10]) for name in os.listdir(self.directory)
+                      if name.startswith('seg-') and name.endswith('.dat'))
+
+    def _data_path(self, segment_id: int) -> str:
+        return os.path.join(self.directory, f"seg-{segment_id:06d}.dat")
+
+    def _index_path(self, segment_id: int) -> str:
+        return os.path.join(self.directory, f"seg-{segment_id:06d}.idx")
+
+    def _sealed_marker(self, segment_id: int) -> str:
+        return os.path.join(self.directory, f"seg-{segment_id:06d}.sealed")
+
+    def _open_active(self) -> None:
+        self._data_file = open(self._data_path(self._active_id), 'ab')
+        self._index_file = open(self._index_path(self._active_id), 'ab')
+
+    def _recover_active(self) -> None:
+        """
+        Repairs the active segment left by a process that stopped without closing the store: the
+        data file is cut after its last complete record and the index is rebuilt from the records
+        kept, so new records are never appended after a partial one.
+        """
+        data_path = self._data_path(self._active_id)
+        entries = []
+        valid_end = 0
+        with open(data_path, 'rb') as f:
+            while True:
+                header = f.read(RECORD_HEADER.size)
+                if len(header) < RECORD_HEADER.size:
+                    break
+                (length,) = RECORD_HEADER.unpack(header)
+                body = f.read(length)
+                if len(body) < length:
+                    break
+                try:
+                    record = json.loads(zlib.decompress(body))
+                except (zlib.error, ValueError):
+                    break
+                entries.append(INDEX_ENTRY.pack(key_hash(record['item_id']), key_hash(record['task']),
+                                                valid_end, RECORD_HEADER.size + length))
+                valid_end += RECORD_HEADER.size + length
+        size = os.path.getsize(data_path)
+        if valid_end < size:
+            with open(data_path, 'r+b') as f:
+                f.truncate(valid_end)
+                os.fsync(f.fileno())
+            self.logger.warning(f"Dropped {size - valid_end} bytes of incomplete records from the end of "
+                                f"segment {self._active_id}.")
+
+        index_path = self._index_path(self._active_id)
+        rebuilt = b''.join(entries)
+        if os.path.exists(index_path):
+            with open(index_path, 'rb') as f:
+                if f.read() == rebuilt:
+                    return
+        tmp_path = index_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(rebuilt)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, index_path)
+        self.logger.warning(f"Rebuilt the index of segment {self._active_id} with {len(entries)} records.")
+
+    def _seal_active(self) -> None:
+        self._data_file.flush()
+        os.fsync(self._data_file.fileno())
+        self._data_file.close()
+        self._index_file.close()
+
+        # Sort the index by (item hash, task hash, offset) so lookups can binary search it
+        index_path = self._index_path(self._active_id)
+        with open(index_path, 'rb') as f:
+            raw = f.read()
+        entries = sorted(INDEX_ENTRY.iter_unpack(raw))
+        tmp_path = index_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            for entry in entries:
+                f.write(INDEX_ENTRY.pack(*entry))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, index_path)
+        open(self._sealed_marker(self._active_id), 'wb').close()
+        self.logger.info(f"Sealed segment {self._active_id} with {len(entries)} records.")
+
+    def _find_in_index(self, segment_id: int, item_h: int, task_h: Optional[int]) -> List[Tuple[int, int]]:
+        index_path = self._index_path(segment_id)
+        if not os.path.exists(index_path) or os.path.getsize(index_path) < INDEX_ENTRY.size:
+            return []
+        with open(index_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as index:
+            count = len(index) // INDEX_ENTRY.size
+            is_sorted = os.path.exists(self._sealed_marker(segment_id))
+            if is_sorted:
+                start = bisect_left(_IndexView(index, count), item_h)
+            else:
+                # The active segment's index is in write order, so it is scanned linearly.
+                start = 0
+            locations = []
+            for position in range(start, count):
+                entry_item, entry_task, offset, length = INDEX_ENTRY.unpack_from(index, position * INDEX_ENTRY.size)
+                if entry_item != item_h:
+                    if is_sorted:
+                        break
+                    continue
+                if task_h is None or entry_task == task_h:
+                    locations.append((offset, length))
+            return locations
+
+    @staticmethod
+    def _decode(record: bytes) -> Dict[str, Any]:
+        (length,) = RECORD_HEADER.unpack_from(record)
+        return json.loads(zlib.decompress(record[RECORD_HEADER.size:RECORD_HEADER.size + length]))
+
+
+class _IndexView:
+    """Sequence view over the item hashes of a sorted, memory-mapped index, for bisect."""
+
+    def __init__(self, index: mmap.mmap, count: int):
+        self.index = index
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, position: int) -> int:
+        return INDEX_ENTRY.unpack_from(self.index, position * INDEX_ENTRY.size)[0]
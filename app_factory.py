@@ -1,55 +1,237 @@
 # app_factory.py
+import os
+import json
+import asyncio
 import logging
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from managers.hook_manager import HookManager
 from repositories.ae_inclusion_list_repository import AEInclusionListRepo, AEInclusionListRepository
-from sqlalchemy.orm import sessionmaker
-from models.database import engine
+from models.database import ScopedSession, create_async_session_factory, dispose_engines, run_in_session
 from entrypoint.task_manager import TaskManager
 from entrypoint.prompt_manager import PromptManager
 from entrypoint.llm_manager import LLMManager
 from entrypoint.item_enricher import ItemEnricher
+from entrypoint.styling_guide_manager import StylingGuideManager
+from entrypoint.provider_router import ProviderRouter
+from entrypoint.call_scheduler import CallScheduler, current_call_class
+from entrypoint.admission_controller import AdmissionController
+from exceptions.custom_exceptions import ServiceOverloadedException
+from utils.cpu_executor import CPUExecutor
+from utils.metrics import metrics
+from utils.process_info import memory_usage
 from adapters.request_adapter import LLMRequestAdapter
-from adapters.response_formatter import DefaultJSONResponseFormatter
+from adapters.response_formatter import DefaultJSONResponseFormatter, SegmentStoreResponseFormatter
+from adapters.segment_store import SegmentStore
 from repositories.styling_guide_repository import StylingGuideRepository
 from repositories.template_repository import TemplateRepository
+from repositories.enrichment_result_repository import EnrichmentResultRepository
+from repositories.config_schema_repository import ConfigSchemaRepository
+from entrypoint.result_writer import ResultWriter
+from entrypoint.job_worker import JobWorker
+from entrypoint.image_fetcher import ImageFetcher
+from repositories.job_repository import JobRepository
 
-def create_app():
+class ReleasingStreamingResponse(StreamingResponse):
+    def __init__(self, content, on_close, **kwargs):
+        """
+        StreamingResponse that calls ``on_close`` once the response is done, however it ends:
+        streamed in full, failed, or torn down by a client disconnect before the body was iterated.
+        """
+        super().__init__(content, **kwargs)
+        self.on_close = on_close
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.on_close()
+
+
+def build_components():
     """
-    Factory function to create and configure the FastAPI application.
+    Builds the repositories, managers and enricher shared by the API and the job workers.
+
+    Returns:
+        dict: Components by name ('item_enricher', 'job_repo', 'result_writer', ...).
     """
-    SessionLocal = sessionmaker(bind=engine)
-    db_session = SessionLocal()
+    # Thread-scoped session proxy: startup loading uses the main thread's session, and
+    # request-path DB work runs in worker threads (see run_in_session), each with its own session.
+    db_session = ScopedSession
 
     # Initialize repositories
     styling_guide_repo = StylingGuideRepository(db_session)
     template_repo = TemplateRepository(db_session)
     ae_inclusion_list_repo = AEInclusionListRepository(db_session)
     hook_manager = HookManager(db_session)
+    result_repo = EnrichmentResultRepository(db_session)
+    job_repo = JobRepository(db_session)
+    job_repo.ensure_schema()
+    # Columns added to the configuration tables must exist before the managers query them
+    ConfigSchemaRepository(db_session).ensure_schema()
+
+    # Shared pool for CPU-bound rendering/parsing (mode and size threshold come from the environment)
+    cpu_executor = CPUExecutor()
 
     # Initialize core managers
     task_manager = TaskManager(db_session)
-    prompt_manager = PromptManager(styling_guide_repo, template_repo, task_manager)
+    styling_guide_manager = StylingGuideManager(styling_guide_repo)
+    prompt_manager = PromptManager(styling_guide_manager, template_repo, task_manager, cpu_executor)
     llm_manager = LLMManager(db_session)
+    # Handlers are built on first use; PRELOAD_PROVIDERS=true builds them (and imports their SDKs) now
+    if os.getenv("PRELOAD_PROVIDERS", "false").lower() == "true":
+        llm_manager.preload()
+    # Rolling latency/error/quality stats for requests that pick a routing_profile
+    provider_router = ProviderRouter(alpha=float(os.getenv("ROUTER_EWMA_ALPHA", "0.2")))
+    llm_manager.router = provider_router
+    # Per-handler call slots; queued calls are served by priority class and caller
+    call_scheduler = CallScheduler()
     # Instantiate ItemEnricher with (prompt_manager, llm_manager)
     # Pass ae_inclusion_list_repo to item_enricher if we want to filter attributes for AE tasks
-    item_enricher = ItemEnricher(prompt_manager, llm_manager,task_manager,db_session, ae_inclusion_list_repo,hook_manager)
+    # Background persistence of every (task, handler) result; disable with PERSIST_RESULTS=false
+    result_writer = None
+    if os.getenv("PERSIST_RESULTS", "true").lower() == "true":
+        result_repo.ensure_schema()
+        result_writer = ResultWriter(result_repo, async_session_factory=create_async_session_factory(),
+                                     max_queue_size=int(os.getenv("RESULT_QUEUE_SIZE", "10000")),
+                                     batch_size=int(os.getenv("RESULT_FLUSH_BATCH_SIZE", "500")),
+                                     flush_interval=float(os.getenv("RESULT_FLUSH_INTERVAL", "1.0")))
+    item_enricher = ItemEnricher(prompt_manager, llm_manager,task_manager,db_session, ae_inclusion_list_repo,hook_manager,
+                                 cpu_executor=cpu_executor, result_writer=result_writer,
+                                 fuse_tasks=os.getenv("PROMPT_FUSION", "false").lower() == "true",
+                                 pack_items=os.getenv("ITEM_PACKING", "false").lower() == "true",
+                                 call_scheduler=call_scheduler,
+                                 image_fetcher=ImageFetcher() if os.getenv("IMAGE_PREFETCH", "true").lower() == "true" else None,
+                                 result_repository=result_repo if result_writer else None,
+                                 incremental=os.getenv("INCREMENTAL_ENRICHMENT", "false").lower() == "true",
+                                 evaluation_mode=os.getenv("EVALUATION_MODE", "pointwise").lower(),
+                                 result_policy=os.getenv("RESULT_POLICY", "all"))
+    ScopedSession.remove()
 
     # Adapters and Formatters
     request_adapter = LLMRequestAdapter()
     response_formatter = DefaultJSONResponseFormatter()
+    # Bulk runs can write to compressed append-only segments instead of returning full JSON
+    segment_store = None
+    batch_formatter = None
+    if os.getenv("SEGMENT_STORE_DIR"):
+        segment_store = SegmentStore(os.getenv("SEGMENT_STORE_DIR"),
+                                     max_segment_bytes=int(os.getenv("SEGMENT_MAX_BYTES", str(256 * 1024 * 1024))))
+        batch_formatter = SegmentStoreResponseFormatter(segment_store)
+
+    return {
+        'cpu_executor': cpu_executor,
+        'task_manager': task_manager,
+        'llm_manager': llm_manager,
+        'provider_router': provider_router,
+        'call_scheduler': call_scheduler,
+        'result_writer': result_writer,
+        'item_enricher': item_enricher,
+        'job_repo': job_repo,
+        'request_adapter': request_adapter,
+        'response_formatter': response_formatter,
+        'segment_store': segment_store,
+        'batch_formatter': batch_formatter,
+    }
+
+
+def create_app(components=None):
+    """
+    Factory function to create and configure the FastAPI application.
+
+    Args:
+        components (dict, optional): Output of build_components; built here when not given.
+    """
+    components = components or build_components()
+    cpu_executor = components['cpu_executor']
+    provider_router = components['provider_router']
+    call_scheduler = components['call_scheduler']
+    result_writer = components['result_writer']
+    item_enricher = components['item_enricher']
+    job_repo = components['job_repo']
+    request_adapter = components['request_adapter']
+    response_formatter = components['response_formatter']
+    segment_store = components['segment_store']
+    batch_formatter = components['batch_formatter']
+    # Optional job workers inside the API process (dedicated workers: python -m entrypoint.job_worker)
+    job_workers = [JobWorker(job_repo, item_enricher, response_formatter)
+                   for _ in range(int(os.getenv("JOB_INPROCESS_WORKERS", "0")))]
+    job_workers_stop = asyncio.Event()
+
+    # Bounds in-flight and queued requests; sheds load with 503 + Retry-After when saturated
+    admission = AdmissionController()
 
     app = FastAPI(title="Gen AI Item Enrichment API", version="1.0.0")
+    app.state.async_session_factory = create_async_session_factory()
+
+    @app.on_event("startup")
+    async def start_background_workers():
+        if result_writer:
+            result_writer.start()
+        for worker in job_workers:
+            asyncio.get_running_loop().create_task(worker.run(job_workers_stop))
+
+    @app.on_event("shutdown")
+    async def dispose_db():
+        admission.start_draining()
+        job_workers_stop.set()
+        if result_writer:
+            await result_writer.stop()
+        await dispose_engines()
+        cpu_executor.shutdown()
+        if segment_store:
+            segment_store.close()
+
+    def bind_call_class(options, default_priority=None):
+        # Every LLM call spawned while serving this request inherits its scheduling class
+        priority = call_scheduler.resolve_class(options.get('priority') or default_priority)
+        current_call_class.set((priority, options.get('caller_id', 'anonymous')))
+
+    async def admit():
+        try:
+            await admission.acquire()
+        except ServiceOverloadedException as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={'Retry-After': str(e.retry_after)})
+
+    @app.get("/ready")
+    async def ready_endpoint():
+        """
+        Readiness probe: 503 while the admission controller is shedding load or its queue is filling up.
+        """
+        stats = admission.stats()
+        return JSONResponse(status_code=200 if stats['ready'] else 503, content=stats)
+
+    @app.get("/metrics")
+    async def metrics_endpoint():
+        """
+        In-process metrics (counters, gauges, summaries) plus derived parse success rates per handler
+        and cascade escalation rates per task and product type.
+        """
+        return {
+            'parse_success_rate': item_enricher.parse_success_rates(),
+            'cascade_escalation_rate': item_enricher.cascade_escalation_rates(),
+            'routing': provider_router.stats(),
+            'scheduler': call_scheduler.stats(),
+            'admission': admission.stats(),
+            'process': {'pid': os.getpid(), **memory_usage()},
+            **metrics.snapshot(),
+        }
 
     @app.post("/enrich-item")
-    async def enrich_item_endpoint(request_body: dict):
+    async def enrich_item_endpoint(request_body: dict, request: Request):
         """
         Endpoint to enrich an item using configured LLM tasks.
         The request_body is adapted to item and task_type by LLMRequestAdapter.
         """
+        await admit()
         try:
-            item, task_type = request_adapter.adapt(request_body)
-            results = await item_enricher.enrich_item(item, task_type)
+            try:
+                item, task_type = request_adapter.adapt(request_body)
+                options = request_adapter.adapt_options(request_body, request.headers)
+                bind_call_class(options)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            results = await item_enricher.enrich_item(item, task_type, options)
             formatted_results = response_formatter.format(results)
             return formatted_results
         except HTTPException as he:
@@ -57,5 +239,101 @@ def create_app():
         except Exception as e:
             logging.error(f"Error in /enrich-item: {str(e)}", exc_info=True)
             raise HTTPException(status_code=500, detail="Internal server error")
+        finally:
+            admission.release()
+
+    @app.post("/enrich-item/stream")
+    async def enrich_item_stream_endpoint(request_body: dict, request: Request):
+        """
+        Runs the generation -> evaluation pipeline for one item and streams each node's result
+        as a line of NDJSON as soon as it completes.
+        """
+        await admit()
+        try:
+            item, _ = request_adapter.adapt(request_body)
+            options = request_adapter.adapt_options(request_body, request.headers)
+            bind_call_class(options)
+        except ValueError as e:
+            admission.release()
+            raise HTTPException(status_code=400, detail=str(e))
+
+        async def node_lines():
+            try:
+                async for event in item_enricher.enrich_item_pipeline(item, options):
+                    yield json.dumps(event, default=str) + "\n"
+            except Exception as e:
+                # Headers are already sent, so the failure is reported in-band
+                logging.error(f"Error in /enrich-item/stream: {str(e)}", exc_info=True)
+                yield json.dumps({'error': 'Internal server error'}) + "\n"
+
+        # The request holds its admission slot until the response ends, even if the body never starts
+        return ReleasingStreamingResponse(node_lines(), admission.release, media_type="application/x-ndjson")
+
+    @app.post("/enrich-items")
+    async def enrich_items_endpoint(request_body: dict, request: Request):
+        """
+        Batch endpoint: enriches several items in one request.
+        Responses are parsed in chunks across worker processes.
+        """
+        await admit()
+        try:
+            try:
+                items, task_type = request_adapter.adapt_batch(request_body)
+                options = request_adapter.adapt_options(request_body, request.headers)
+                # Batches are backfill traffic unless the caller says otherwise
+                bind_call_class(options, default_priority='bulk')
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            results = await item_enricher.enrich_items(items, task_type, options)
+            if batch_formatter:
+                # Compressing and writing the segment records is blocking work, kept off the event loop
+                return await asyncio.to_thread(
+                    lambda: [batch_formatter.format(item_results, item_id=item_enricher.resolve_item_id(item))
+                             for item, item_results in zip(items, results)])
+            return [response_formatter.format(item_results) for item_results in results]
+        except HTTPException as he:
+            raise he
+        except Exception as e:
+            logging.error(f"Error in /enrich-items: {str(e)}", exc_info=True)
+            raise HTTPException(status_code=500, detail="Internal server error")
+        finally:
+            admission.release()
+
+    @app.post("/jobs", status_code=202)
+    async def create_job_endpoint(request_body: dict, request: Request):
+        """
+        Queues an enrichment job and returns its id immediately. The body is a single-item request
+        or a batch ({"items": [...]}) plus the usual options, and optionally "callback_url" to be
+        POSTed the finished job.
+        """
+        try:
+            if 'items' in request_body:
+                items, task_type = request_adapter.adapt_batch(request_body)
+            else:
+                item, task_type = request_adapter.adapt(request_body)
+                items = [item]
+            options = request_adapter.adapt_options(request_body, request.headers)
+            options['priority'] = call_scheduler.resolve_class(options.get('priority') or 'bulk')
+            callback_url = request_body.get('callback_url')
+            if callback_url is not None and not (isinstance(callback_url, str) and callback_url.startswith(('http://', 'https://'))):
+                raise ValueError("'callback_url' must be an http(s) URL")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        payload = {'items': items, 'task_type': task_type, 'options': options, 'batch': 'items' in request_body}
+        job_id = await run_in_session(job_repo.enqueue, payload, callback_url,
+                                      int(os.getenv("JOB_MAX_ATTEMPTS", "3")))
+        metrics.inc('jobs_enqueued_total')
+        return {'job_id': job_id, 'status': 'queued'}
+
+    @app.get("/jobs/{job_id}")
+    async def get_job_endpoint(job_id: str):
+        """
+        Returns a job's status, and its result once it has finished.
+        """
+        job = await run_in_session(job_repo.get, job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+        job.pop('payload', None)
+        return job
 
     return app
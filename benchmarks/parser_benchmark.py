@@ -0,0 +1,73 @@
+# benchmarks/parser_benchmark.py
+"""
+Micro-benchmark for response parsing over a corpus of recorded LLM responses.
+
+Compares building a parser per response (the pre-cache behaviour of ParserFactory) with the
+cached parser, and reports per-format timings.
+
+Usage:
+    python -m benchmarks.parser_benchmark [--corpus PATH] [--repeat N]
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+
+from parsers.markdown_response_parser import MarkdownResponseParser
+from parsers.json_response_parser import JsonResponseParser
+from parsers.parser_factory import ParserFactory, parse_response
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus", "recorded_responses.jsonl")
+
+
+def load_corpus(path):
+    with open(path, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def parse_uncached(record):
+    if record["output_format"] == "markdown":
+        return MarkdownResponseParser().parse(record["response"], record["attributes_list"])
+    return JsonResponseParser().parse(record["response"])
+
+
+def parse_cached(record):
+    return parse_response(record["output_format"], record["response"], record["attributes_list"])
+
+
+def run(fn, corpus, repeat):
+    timings = defaultdict(float)
+    counts = defaultdict(int)
+    for _ in range(repeat):
+        for record in corpus:
+            start = time.perf_counter()
+            fn(record)
+            timings[record["output_format"]] += time.perf_counter() - start
+            counts[record["output_format"]] += 1
+    return {fmt: timings[fmt] / counts[fmt] * 1e6 for fmt in timings}
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    arg_parser.add_argument("--repeat", type=int, default=200)
+    args = arg_parser.parse_args()
+
+    # Parser logging would dominate the measurement
+    logging.disable(logging.CRITICAL)
+    corpus = load_corpus(args.corpus)
+    ParserFactory.clear_cache()
+
+    uncached = run(parse_uncached, corpus, max(1, args.repeat // 10))
+    cached = run(parse_cached, corpus, args.repeat)
+
+    print(f"corpus: {len(corpus)} responses from {args.corpus}")
+    print(f"{'format':<10}{'uncached us/op':>18}{'cached us/op':>16}{'speedup':>10}")
+    for fmt in sorted(cached):
+        print(f"{fmt:<10}{uncached[fmt]:>18.1f}{cached[fmt]:>16.1f}{uncached[fmt] / cached[fmt]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
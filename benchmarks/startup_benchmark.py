@@ -0,0 +1,105 @@
+# benchmarks/startup_benchmark.py
+"""
+Cold-start benchmark: import time of the serving modules and time to build the app components,
+each measured in a fresh interpreter.
+
+Also checks that importing the handler layer does not load any provider SDK; SDKs should only be
+imported when a handler that needs them is first used. Exits non-zero when a check fails or a
+median exceeds its budget, so it can guard regressions in CI.
+
+Usage:
+    python -m benchmarks.startup_benchmark [--repeat N] [--max-import-ms MS] [--max-startup-ms MS] [--skip-startup]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules timed on import, from the handler layer up to the whole app
+IMPORT_TARGETS = [
+    "providers.provider_factory",
+    "handlers.llm_handler",
+    "entrypoint.llm_manager",
+    "app_factory",
+]
+# Provider SDKs that must stay unloaded until a handler needs them
+LAZY_SDKS = ["openai", "google.generativeai", "anthropic"]
+
+IMPORT_SNIPPET = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed_ms = (time.perf_counter() - started) * 1000
+print(json.dumps({{'ms': elapsed_ms, 'loaded': [m for m in {sdks!r} if m in sys.modules]}}))
+"""
+
+STARTUP_SNIPPET = """
+import json, logging, time
+logging.disable(logging.CRITICAL)
+started = time.perf_counter()
+from app_factory import build_components
+imported_ms = (time.perf_counter() - started) * 1000
+build_components()
+print(json.dumps({'import_ms': imported_ms, 'ms': (time.perf_counter() - started) * 1000}))
+"""
+
+
+def run_snippet(code):
+    completed = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "failed")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def measure(code, repeat):
+    runs = [run_snippet(code) for _ in range(repeat)]
+    return statistics.median(run["ms"] for run in runs), runs[-1]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    arg_parser.add_argument("--max-import-ms", type=float, default=None,
+                            help="Fail if importing app_factory takes longer (median).")
+    arg_parser.add_argument("--max-startup-ms", type=float, default=None,
+                            help="Fail if building the components takes longer (median).")
+    arg_parser.add_argument("--skip-startup", action="store_true",
+                            help="Only measure imports (building the components needs the database).")
+    args = arg_parser.parse_args()
+
+    failures = []
+    print(f"{'module':<30}{'import ms':>12}  provider SDKs loaded")
+    for module in IMPORT_TARGETS:
+        try:
+            median_ms, last = measure(IMPORT_SNIPPET.format(module=module, sdks=LAZY_SDKS), args.repeat)
+        except RuntimeError as e:
+            print(f"{module:<30}{'error':>12}  {e}")
+            failures.append(f"import {module}: {e}")
+            continue
+        print(f"{module:<30}{median_ms:>12.1f}  {', '.join(last['loaded']) or '-'}")
+        if last["loaded"]:
+            failures.append(f"import {module} loaded {last['loaded']}")
+        if module == "app_factory" and args.max_import_ms and median_ms > args.max_import_ms:
+            failures.append(f"import app_factory took {median_ms:.1f}ms > {args.max_import_ms}ms")
+
+    if not args.skip_startup:
+        try:
+            median_ms, last = measure(STARTUP_SNIPPET, args.repeat)
+            print(f"{'build_components':<30}{median_ms:>12.1f}  (of which import {last['import_ms']:.1f}ms)")
+            if args.max_startup_ms and median_ms > args.max_startup_ms:
+                failures.append(f"startup took {median_ms:.1f}ms > {args.max_startup_ms}ms")
+        except RuntimeError as e:
+            print(f"{'build_components':<30}{'error':>12}  {e}")
+            failures.append(f"startup: {e}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
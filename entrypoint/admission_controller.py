@@ -0,0 +1,135 @@
+# entrypoint/admission_controller.py
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+from exceptions.custom_exceptions import ServiceOverloadedException
+from utils.metrics import metrics
+
+
+class AdmissionController:
+    def __init__(self, max_in_flight: Optional[int] = None, max_queue: Optional[int] = None,
+                 target_delay_ms: Optional[float] = None, interval_ms: Optional[float] = None,
+                 retry_after: Optional[int] = None):
+        """
+        Bounds the number of requests being served and waiting, and sheds load before the pod
+        runs out of memory or every request times out.
+
+        Up to ``max_in_flight`` requests run concurrently; up to ``max_queue`` more wait for a slot.
+        Queueing delay is controlled CoDel-style: if every request admitted from the queue during
+        ``interval_ms`` waited longer than ``target_delay_ms``, the queue is a standing queue rather
+        than a burst, and new arrivals that would have to queue are rejected until a request gets
+        through under the target again. Rejections carry a Retry-After hint.
+
+        Args:
+            max_in_flight (int): Concurrent requests. Defaults to ADMISSION_MAX_IN_FLIGHT or 64.
+            max_queue (int): Waiting requests. Defaults to ADMISSION_MAX_QUEUE or 128.
+            target_delay_ms (float): Acceptable queueing delay. Defaults to ADMISSION_TARGET_DELAY_MS or 500.
+            interval_ms (float): How long the delay must stay above target before shedding.
+                Defaults to ADMISSION_INTERVAL_MS or 1000.
+            retry_after (int): Seconds suggested to rejected clients. Defaults to ADMISSION_RETRY_AFTER or 2.
+        """
+        self.max_in_flight = max_in_flight or int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "64"))
+        self.max_queue = max_queue if max_queue is not None else int(os.getenv("ADMISSION_MAX_QUEUE", "128"))
+        self.target_delay = (target_delay_ms or float(os.getenv("ADMISSION_TARGET_DELAY_MS", "500"))) / 1000
+        self.interval = (interval_ms or float(os.getenv("ADMISSION_INTERVAL_MS", "1000"))) / 1000
+        self.retry_after = retry_after or int(os.getenv("ADMISSION_RETRY_AFTER", "2"))
+        self.logger = logging.getLogger(__name__)
+
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._first_above_time = 0.0
+        self._shedding = False
+        self._draining = False
+
+    async def acquire(self) -> None:
+        """
+        Admits the caller, waiting for a slot if needed.
+
+        Raises:
+            ServiceOverloadedException: If the request is shed.
+        """
+        if self._draining:
+            self._reject('draining')
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            self._publish()
+            return
+        if self._shedding:
+            self._reject('queue delay above target')
+        if len(self._waiters) >= self.max_queue:
+            self._reject('queue full')
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self._publish()
+        enqueued = time.monotonic()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            elif future in self._waiters:
+                self._waiters.remove(future)
+                self._publish()
+            raise
+        self._observe_sojourn(time.monotonic() - enqueued)
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < self.max_in_flight:
+            future = self._waiters.popleft()
+            if future.done():
+                continue
+            self.in_flight += 1
+            future.set_result(None)
+        if not self._waiters:
+            # An empty queue ends any standing-queue episode
+            self._first_above_time = 0.0
+            self._set_shedding(False)
+        self._publish()
+
+    def is_ready(self) -> bool:
+        """
+        Readiness for the load balancer: false while draining, shedding, or with the queue more
+        than half full, so traffic is steered away before requests are rejected.
+        """
+        return not self._draining and not self._shedding and len(self._waiters) * 2 <= self.max_queue
+
+    def start_draining(self) -> None:
+        self._draining = True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'in_flight': self.in_flight,
+            'queued': len(self._waiters),
+            'shedding': self._shedding,
+            'ready': self.is_ready(),
+        }
+
+    def _observe_sojourn(self, sojourn: float) -> None:
+        metrics.observe('admission_queue_wait_ms', sojourn * 1000)
+        now = time.monotonic()
+        if sojourn < self.target_delay:
+            self._first_above_time = 0.0
+            self._set_shedding(False)
+        elif not self._first_above_time:
+            self._first_above_time = now + self.interval
+        elif now >= self._first_above_time:
+            self._set_shedding(True)
+
+    def _set_shedding(self, shedding: bool) -> None:
+        if shedding != self._shedding:
+            self._shedding = shedding
+            self.logger.warning(f"Admission control {'started' if shedding else 'stopped'} shedding load "
+                                f"(in_flight={self.in_flight}, queued={len(self._waiters)}).")
+
+    def _reject(self, reason: str) -> None:
+        metrics.inc('admission_rejected_total', {'reason': reason})
+        raise ServiceOverloadedException(reason, self.retry_after)
+
+    def _publish(self) -> None:
+        metrics.set_gauge('admission_in_flight', self.in_flight)
+        metrics.set_gauge('admission_queued', len(self._waiters))
@@ -0,0 +1,179 @@
+# entrypoint/call_scheduler.py
+import os
+import time
+import asyncio
+import logging
+import contextvars
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Deque, Dict, Optional, Tuple
+from utils.metrics import metrics
+
+# Priority classes. Lower tiers are always served first, so queued work of a higher tier waits
+# whenever a lower tier has calls waiting; classes in the same tier share capacity by weight.
+PRIORITY_CLASSES: Dict[str, Dict[str, int]] = {
+    'interactive': {'tier': 0, 'weight': 8},
+    'standard':    {'tier': 1, 'weight': 4},
+    'bulk':        {'tier': 1, 'weight': 1},
+}
+DEFAULT_PRIORITY = 'standard'
+
+# (priority class, caller id) of the request being served; set once per request and inherited
+# by every LLM call task it spawns.
+current_call_class: contextvars.ContextVar[Tuple[str, str]] = contextvars.ContextVar(
+    'current_call_class', default=(DEFAULT_PRIORITY, 'anonymous'))
+
+
+class CallScheduler:
+    def __init__(self, max_concurrency: Optional[int] = None, classes: Optional[Dict[str, Dict[str, int]]] = None):
+        """
+        Schedules LLM calls onto a bounded number of concurrent slots per handler.
+
+        When a handler's slots are all busy, calls queue by priority class and caller. Lower tiers
+        (interactive) are dispatched before any queued call of a higher tier (standard, bulk);
+        within a tier, classes share slots in proportion to their weight (stride scheduling on a
+        per-class pass value), and within a class, callers are served round-robin so one caller's
+        backfill cannot starve another's.
+
+        Args:
+            max_concurrency (int): Concurrent calls per handler. Defaults to HANDLER_MAX_CONCURRENCY or 16.
+            classes (Dict[str, Dict[str, int]], optional): Priority classes; defaults to PRIORITY_CLASSES.
+        """
+        self.max_concurrency = max_concurrency or int(os.getenv("HANDLER_MAX_CONCURRENCY", "16"))
+        self.classes = classes or PRIORITY_CLASSES
+        self.logger = logging.getLogger(__name__)
+        self._lanes: Dict[str, _Lane] = {}
+
+    def resolve_class(self, priority: Optional[str]) -> str:
+        """
+        Validates a requested priority class, defaulting to 'standard'.
+
+        Raises:
+            ValueError: If the class is unknown.
+        """
+        if not priority:
+            return DEFAULT_PRIORITY
+        priority = priority.lower()
+        if priority not in self.classes:
+            raise ValueError(f"Unknown priority '{priority}'. Expected one of {sorted(self.classes)}")
+        return priority
+
+    @asynccontextmanager
+    async def slot(self, handler_name: str):
+        """
+        Holds one of the handler's call slots for the duration of the block, queueing first if needed.
+        The caller's priority class and id come from current_call_class.
+        """
+        priority, caller = current_call_class.get()
+        lane = self._lanes.get(handler_name)
+        if lane is None:
+            lane = self._lanes[handler_name] = _Lane(handler_name, self.max_concurrency, self.classes)
+        await lane.acquire(priority if priority in self.classes else DEFAULT_PRIORITY, caller)
+        try:
+            yield
+        finally:
+            lane.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {handler_name: {'in_flight': lane.in_flight, 'queued': lane.queued_by_class()}
+                for handler_name, lane in self._lanes.items()}
+
+
+class _Lane:
+    """Slots and wait queues of a single handler."""
+
+    def __init__(self, handler_name: str, capacity: int, classes: Dict[str, Dict[str, int]]):
+        self.handler_name = handler_name
+        self.capacity = capacity
+        self.classes = classes
+        self.in_flight = 0
+        self.waiting = 0
+        # class -> caller -> queued futures, and class -> callers with queued work in round-robin order
+        self.queues: Dict[str, Dict[str, Deque[asyncio.Future]]] = {name: {} for name in classes}
+        self.callers: Dict[str, Deque[str]] = {name: deque() for name in classes}
+        self.passes: Dict[str, float] = {name: 0.0 for name in classes}
+        self.virtual_time = 0.0
+
+    async def acquire(self, priority: str, caller: str) -> None:
+        labels = {'priority': priority}
+        if self.in_flight < self.capacity and not self.waiting:
+            self.in_flight += 1
+            metrics.observe('scheduler_queue_wait_ms', 0.0, labels)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        queue = self.queues[priority].get(caller)
+        if queue is None:
+            queue = self.queues[priority][caller] = deque()
+        if not queue:
+            self.callers[priority].append(caller)
+        if not any(self.queues[priority].values()):
+            # A class returning from idle starts at the current virtual time, without banked credit
+            self.passes[priority] = max(self.passes[priority], self.virtual_time)
+        queue.append(future)
+        self.waiting += 1
+        self._publish_depth(priority)
+
+        queued_at = time.perf_counter()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was granted just as the waiter was cancelled; hand it on
+                self.release()
+            else:
+                self._discard(priority, caller, future)
+            raise
+        metrics.observe('scheduler_queue_wait_ms', (time.perf_counter() - queued_at) * 1000, labels)
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        while self.in_flight < self.capacity and self.waiting:
+            future = self._next()
+            if future is None:
+                break
+            if future.done():
+                # The waiter was cancelled and has not cleaned up yet
+                continue
+            self.in_flight += 1
+            future.set_result(None)
+
+    def queued_by_class(self) -> Dict[str, int]:
+        return {name: sum(len(q) for q in callers.values()) for name, callers in self.queues.items()}
+
+    def _next(self) -> Optional[asyncio.Future]:
+        backlogged = [name for name in self.classes if self.callers[name]]
+        if not backlogged:
+            return None
+        tier = min(self.classes[name]['tier'] for name in backlogged)
+        priority = min((name for name in backlogged if self.classes[name]['tier'] == tier),
+                       key=lambda name: self.passes[name])
+        self.virtual_time = self.passes[priority]
+        self.passes[priority] += 1.0 / self.classes[priority]['weight']
+
+        callers = self.callers[priority]
+        caller = callers.popleft()
+        queue = self.queues[priority][caller]
+        future = queue.popleft()
+        if queue:
+            callers.append(caller)
+        else:
+            del self.queues[priority][caller]
+        self.waiting -= 1
+        self._publish_depth(priority)
+        return future
+
+    def _discard(self, priority: str, caller: str, future: asyncio.Future) -> None:
+        queue = self.queues[priority].get(caller)
+        if queue is None or future not in queue:
+            return
+        queue.remove(future)
+        self.waiting -= 1
+        if not queue:
+            del self.queues[priority][caller]
+            self.callers[priority].remove(caller)
+        self._publish_depth(priority)
+
+    def _publish_depth(self, priority: str) -> None:
+        metrics.set_gauge('scheduler_queue_depth', sum(len(q) for q in self.queues[priority].values()),
+                          {'priority': priority, 'handler': self.handler_name})
@@ -0,0 +1,179 @@
+# entrypoint/image_fetcher.py
+import io
+import os
+import time
+import base64
+import asyncio
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from utils.lru_cache import LRUCache, MISSING
+from utils.metrics import metrics
+
+SUPPORTED_MEDIA_TYPES = ('image/jpeg', 'image/png', 'image/gif', 'image/webp')
+
+# Provider image format -> builder of the inline image part for (media type, base64 data)
+IMAGE_PART_BUILDERS: Dict[str, Callable[[str, str], Dict[str, Any]]] = {
+    'gemini': lambda media_type, data: {'inline_data': {'mime_type': media_type, 'data': data}},
+    'claude': lambda media_type, data: {'type': 'image', 'source': {'type': 'base64', 'media_type': media_type,
+                                                                    'data': data}},
+}
+
+
+class ImageFetcher:
+    def __init__(self, max_bytes: Optional[int] = None, max_dimension: Optional[int] = None,
+                 timeout: Optional[float] = None, cache_size: Optional[int] = None,
+                 cache_ttl: Optional[float] = None, pool_size: Optional[int] = None,
+                 session: Optional[requests.Session] = None):
+        """
+        Fetches item images once and prepares them for vision calls.
+
+        Images are downloaded over a pooled HTTP session, streamed with a size limit, downscaled
+        when Pillow is installed and larger than ``max_dimension``, then base64-encoded once. The
+        inline part for each provider format (IMAGE_PART_BUILDERS) is built on first use and kept
+        with the image. Images are cached by URL in an LRU cache. Within ``cache_ttl`` a cached image
+        is reused as is; after that it is revalidated with its ETag (If-None-Match) and only
+        re-downloaded if it changed.
+
+        Args:
+            max_bytes (int): Largest accepted download. Defaults to IMAGE_MAX_BYTES or 5 MiB.
+            max_dimension (int): Longest side after downscaling. Defaults to IMAGE_MAX_DIMENSION or 1568.
+            timeout (float): Per-request timeout in seconds. Defaults to IMAGE_FETCH_TIMEOUT or 10.
+            cache_size (int): Cached images. Defaults to IMAGE_CACHE_SIZE or 256.
+            cache_ttl (float): Seconds a cached image is used without revalidation. Defaults to IMAGE_CACHE_TTL or 300.
+            pool_size (int): Pooled connections per host. Defaults to IMAGE_POOL_SIZE or 16.
+            session (requests.Session, optional): Session to use instead of a pooled one (e.g. in tests).
+        """
+        self.max_bytes = max_bytes or int(os.getenv("IMAGE_MAX_BYTES", str(5 * 1024 * 1024)))
+        self.max_dimension = max_dimension or int(os.getenv("IMAGE_MAX_DIMENSION", "1568"))
+        self.timeout = timeout or float(os.getenv("IMAGE_FETCH_TIMEOUT", "10"))
+        self.cache_ttl = cache_ttl if cache_ttl is not None else float(os.getenv("IMAGE_CACHE_TTL", "300"))
+        self.pool_size = pool_size or int(os.getenv("IMAGE_POOL_SIZE", "16"))
+        self.cache = LRUCache(maxsize=cache_size or int(os.getenv("IMAGE_CACHE_SIZE", "256")))
+        self.logger = logging.getLogger(__name__)
+        self._session = session
+        self._session_pid = os.getpid() if session else None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        # A pooled session is per process: connections must not be shared with a forked parent
+        if self._session is None or self._session_pid != os.getpid():
+            with self._lock:
+                if self._session is None or self._session_pid != os.getpid():
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    self._session, self._session_pid = session, os.getpid()
+        return self._session
+
+    async def prefetch(self, urls: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Fetches several images concurrently, each URL once.
+
+        Returns:
+            Dict[str, Optional[Dict[str, Any]]]: URL -> image (see fetch), or None where fetching failed.
+        """
+        urls = list(dict.fromkeys(url for url in urls if url))
+        images = await asyncio.gather(*(asyncio.to_thread(self._fetch_or_none, url) for url in urls))
+        return dict(zip(urls, images))
+
+    def fetch(self, url: str) -> Dict[str, Any]:
+        """
+        Returns the image at a URL, from the cache when possible.
+
+        Returns:
+            Dict[str, Any]: {'url', 'etag', 'media_type', 'data' (base64), 'bytes', 'fetched_at', 'parts'}.
+
+        Raises:
+            ValueError: If the image is too large or not a supported image type.
+            requests.exceptions.RequestException: If the download fails.
+        """
+        cached = self.cache.get(url)
+        if cached is not MISSING and time.monotonic() - cached['fetched_at'] < self.cache_ttl:
+            metrics.inc('image_cache_total', {'result': 'hit'})
+            return cached
+
+        headers = {}
+        if cached is not MISSING and cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        started = time.perf_counter()
+        with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+            if response.status_code == 304 and cached is not MISSING:
+                cached['fetched_at'] = time.monotonic()
+                metrics.inc('image_cache_total', {'result': 'revalidated'})
+                return cached
+            response.raise_for_status()
+            media_type = (response.headers.get('Content-Type') or '').split(';')[0].strip().lower()
+            if media_type not in SUPPORTED_MEDIA_TYPES:
+                raise ValueError(f"Unsupported image type '{media_type}' at {url}")
+            declared = response.headers.get('Content-Length')
+            if declared and declared.isdigit() and int(declared) > self.max_bytes:
+                raise ValueError(f"Image at {url} is {declared} bytes, above the {self.max_bytes} byte limit")
+            content = bytearray()
+            for chunk in response.iter_content(chunk_size=65536):
+                content.extend(chunk)
+                if len(content) > self.max_bytes:
+                    raise ValueError(f"Image at {url} exceeds the {self.max_bytes} byte limit")
+            etag = response.headers.get('ETag')
+        metrics.observe('image_fetch_ms', (time.perf_counter() - started) * 1000)
+        metrics.inc('image_cache_total', {'result': 'miss'})
+
+        content, media_type = self._downscale(bytes(content), media_type)
+        image = {
+            'url': url,
+            'etag': etag,
+            'media_type': media_type,
+            'data': base64.b64encode(content).decode('ascii'),
+            'bytes': len(content),
+            'fetched_at': time.monotonic(),
+            'parts': {},
+        }
+        self.cache.put(url, image)
+        return image
+
+    def encode(self, image: Dict[str, Any], image_format: str) -> Dict[str, Any]:
+        """
+        Returns the inline image part for a provider format, built once per image and format.
+
+        Raises:
+            ValueError: If the format is unknown.
+        """
+        part = image['parts'].get(image_format)
+        if part is None:
+            builder = IMAGE_PART_BUILDERS.get(image_format)
+            if builder is None:
+                raise ValueError(f"Unknown image format '{image_format}'. Expected one of {sorted(IMAGE_PART_BUILDERS)}")
+            part = image['parts'][image_format] = builder(image['media_type'], image['data'])
+        return part
+
+    def _fetch_or_none(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            return self.fetch(url)
+        except Exception as e:
+            self.logger.warning(f"Could not fetch image {url}: {e}")
+            metrics.inc('image_fetch_failures_total')
+            return None
+
+    def _downscale(self, content: bytes, media_type: str):
+        try:
+            from PIL import Image
+        except ImportError:
+            return content, media_type
+        try:
+            with Image.open(io.BytesIO(content)) as img:
+                if max(img.size) <= self.max_dimension or getattr(img, 'is_animated', False):
+                    return content, media_type
+                img.thumbnail((self.max_dimension, self.max_dimension))
+                output = io.BytesIO()
+                if img.mode in ('RGBA', 'LA', 'P'):
+                    img.save(output, format='PNG', optimize=True)
+                    return output.getvalue(), 'image/png'
+                img.convert('RGB').save(output, format='JPEG', quality=85)
+                return output.getvalue(), 'image/jpeg'
+        except Exception as e:
+            self.logger.warning(f"Could not downscale image: {e}")
+            return content, media_type
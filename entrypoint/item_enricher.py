@@ -1,11 +1,34 @@
 # entrypoint/item_enricher.py
+import asyncio
+import hashlib
+import json
 import logging
-from typing import Dict, Any
+import os
+import time
+from typing import Dict, Any, List, AsyncIterator
 from utils.dynamic_import import dynamic_import
+from utils.cpu_executor import CPUExecutor
+from models.database import run_in_session
+from models.llm_request_models import BaseLLMRequest
+from parsers.parser_factory import ParserFactory, parse_response_with_repairs, parse_responses
+from parsers.markdown_response_parser import load_task_sections
+from entrypoint.prompt_manager import FUSED_TASK_PREFIX
+from entrypoint.item_packer import ItemPacker
+from entrypoint.listwise_judge import ListwiseJudge, CANDIDATE_MARKER
+from entrypoint.result_policy import parse_result_policy, policy_label, agreement_key, confidence_of
+from parsers.json_repair import extract_json
+from parsers.schema_validator import top_level_fields
+from entrypoint.provider_router import quality_score
+from utils.metrics import metrics
+from utils.token_estimator import token_estimator
 
 
 class ItemEnricher:
-    def __init__(self, prompt_manager, llm_manager, task_manager, db_session, ae_inclusion_list_repo=None):
+    def __init__(self, prompt_manager, llm_manager, task_manager, db_session, ae_inclusion_list_repo=None, hook_manager=None,
+                 cpu_executor=None, batch_concurrency: int = 32, result_writer=None, fuse_tasks: bool = False,
+                 pack_items: bool = False, item_packer=None, call_scheduler=None, image_fetcher=None,
+                 result_repository=None, incremental: bool = False, evaluation_mode: str = 'pointwise',
+                 listwise_judge=None, result_policy: str = 'all', cascade_min_confidence: float = None):
         """
         Orchestrates item enrichment by generating prompts (PromptManager) and invoking LLMs (LLMManager).
 
@@ -13,17 +36,55 @@ class ItemEnricher:
             prompt_manager: PromptManager instance
             llm_manager: LLMManager instance
             task_manager: TaskManager instance
-            db_session: SQLAlchemy session
+            db_session: SQLAlchemy session (thread-scoped; request-path queries run via run_in_session)
             ae_inclusion_list_repo: AEInclusionListRepository instance or None
+            hook_manager: HookManager instance or None
+            cpu_executor: CPUExecutor used for response parsing (defaults to one configured from the environment)
+            batch_concurrency: Maximum number of in-flight LLM calls for a single enrich_items batch
+            result_writer: Optional ResultWriter persisting every (task, handler) result in the background
+            fuse_tasks: Default for the 'fuse_tasks' request option (one composite prompt per handler for
+                the Markdown tasks listed in parsers/task_sections.txt)
+            pack_items: Default for the 'pack_items' request option (several items per prompt in enrich_items)
+            item_packer: ItemPacker used for packing (defaults to one configured from the environment)
+            call_scheduler: Optional CallScheduler queueing LLM calls per handler by priority class and caller
+            image_fetcher: Optional ImageFetcher; when set, item images of image tasks are fetched once per
+                request and sent inline to handlers whose provider accepts images
+            result_repository: Optional EnrichmentResultRepository used to look up stored results
+            incremental: Default for the 'incremental' request option (generation tasks whose input
+                fingerprint matches the item's last stored result return that result instead of a call)
+            evaluation_mode: Default for the 'evaluation_mode' request option of pipelines: 'pointwise' (one
+                evaluation call per generated output) or 'listwise' (one call per evaluation task and judge
+                handler scoring all outputs of a generation task, see ListwiseJudge)
+            listwise_judge: ListwiseJudge used in listwise mode (defaults to one with a random seed)
+            result_policy: Default for the 'result_policy' request option: 'all', 'first_valid' or
+                'quorum_<k>' (see _invoke_with_policy), or 'cascade' (see _invoke_cascade)
+            cascade_min_confidence: Cascade responses stating a lower 'confidence' escalate to the next
+                tier. Defaults to CASCADE_MIN_CONFIDENCE or 0.6.
         """
         self.prompt_manager = prompt_manager
         self.llm_manager = llm_manager
         self.task_manager = task_manager
         self.db_session = db_session
         self.ae_inclusion_list_repo = ae_inclusion_list_repo
+        self.hook_manager = hook_manager
+        self.cpu_executor = cpu_executor or CPUExecutor()
+        self.batch_concurrency = batch_concurrency
+        self.result_writer = result_writer
+        self.fuse_tasks = fuse_tasks
+        self.pack_items = pack_items
+        self.item_packer = item_packer or ItemPacker()
+        self.call_scheduler = call_scheduler
+        self.image_fetcher = image_fetcher
+        self.result_repository = result_repository
+        self.incremental = incremental
+        self.evaluation_mode = evaluation_mode
+        self.listwise_judge = listwise_judge or ListwiseJudge()
+        self.result_policy = policy_label(parse_result_policy(result_policy))
+        self.cascade_min_confidence = cascade_min_confidence if cascade_min_confidence is not None \
+            else float(os.getenv("CASCADE_MIN_CONFIDENCE", "0.6"))
         self.logger = logging.getLogger(__name__)
 
-    async def enrich_item(self, item: Dict[str, Any], task_type: str) -> Dict[str, Any]:
+    async def enrich_item(self, item: Dict[str, Any], task_type: str, options: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Enriches the given item by generating prompts and calling LLMs.
 
@@ -35,41 +96,480 @@ class ItemEnricher:
 
         Args:
             item (Dict[str, Any]): Item details (title, desc, product_type, etc.).
-            task_type (str): 'generation' or 'evaluation'.
+            task_type (str): 'generation', 'evaluation' or 'pipeline' (see enrich_item_pipeline).
+            options (Dict[str, Any], optional): Per-request options (see LLMRequestAdapter.adapt_options),
+                e.g. 'handlers' / 'task_handlers' limiting which handlers serve which tasks.
 
         Returns:
             Dict[str, Any]: Processed LLM responses structured by tasks and handlers.
         """
-        self.logger.info(f"Processing {task_type} tasks for product type: '{item.get('product_type','unknown')}'")
+        if task_type == 'pipeline':
+            return await self.collect_pipeline(item, options)
 
-        # Step 1: Process item attributes if AEInclusionListRepo is available
-        if self.ae_inclusion_list_repo:
-            self._process_attributes(item)
+        self.logger.info(f"Processing {task_type} tasks for product type: '{item.get('product_type','unknown')}'")
 
-        # Step 2: Generate prompts per model family
-        family_names = set(self.llm_manager.family_names.values())
-        prompts_per_family = {}
-        for family_name in family_names:
-            prompts = self.prompt_manager.generate_prompts(item, family_name=family_name, task_type=task_type)
-            prompts_per_family[family_name] = prompts
-            self.logger.debug(f"Generated {len(prompts)} prompts for family '{family_name}'.")
+        # Steps 1-2 query the DB (inclusion list, templates), so they run off the event loop
+        prompts_per_family = await run_in_session(self._prepare_prompts_per_family, item, task_type, options)
 
         # Prepare a unified list of prompt tasks with provider_name attached
-        prompts_tasks = self._prepare_prompts_tasks(prompts_per_family)
+        prompts_tasks = self._prepare_prompts_tasks(prompts_per_family, task_type, options)
+        [reused], [prompts_tasks] = await self._reuse_unchanged([item], [prompts_tasks], task_type, options)
+        await self._attach_images(prompts_tasks)
 
         # Create a mapping from task_name to output_format
         task_to_format = self._get_task_format_map(prompts_per_family)
 
         # Step 3: Invoke LLMs and process results
-        results = await self._invoke_llms(prompts_tasks)
+        results = await self._invoke_prompts(prompts_tasks, options)
 
         # Step 4: If generation task, apply post process hooks (guardrails + custom hooks)
         if task_type == 'generation':
-            results = self._apply_postprocess_hooks(results)
+            results = await run_in_session(self._apply_postprocess_hooks, results)
+
+        processed_results = await self._process_results(results, task_to_format, item.get('attributes_list'))
 
-        processed_results = self._process_results(results, task_to_format)
+        # Fire-and-forget: the response never waits on the results store
+        if self.result_writer:
+            self.result_writer.submit(self._build_result_rows(item, task_type, results, processed_results,
+                                                              self._fingerprints(prompts_tasks)))
+        self._merge_reused(processed_results, reused)
         return processed_results
 
+    async def enrich_item_pipeline(self, item: Dict[str, Any], options: Dict[str, Any] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Runs generation and evaluation for an item as one dependency graph (generation_task_evaluation_tasks).
+
+        Every (generation task, handler) call is a node. As soon as a node's output is parsed and has
+        passed the postprocess hooks, the evaluation prompts linked to that task are rendered with the
+        output and scheduled, so evaluations overlap with generations still in flight and end-to-end
+        latency follows the critical path. Node results are yielded in completion order.
+
+        In listwise evaluation mode an evaluation task waits for every handler of its generation task
+        and then judges all parsed outputs in one call per judge handler; each output still gets its
+        own evaluation event, with 'listwise' {position, candidates} in its result.
+
+        Args:
+            item (Dict[str, Any]): Item details.
+            options (Dict[str, Any], optional): Per-request options, as for enrich_item.
+
+        Yields:
+            Dict[str, Any]: One event per node: node_id, depends_on, task_type, task, handler_name,
+            result (as in enrich_item) and elapsed_ms since the pipeline started.
+        """
+        self.logger.info(f"Processing pipeline for product type: '{item.get('product_type','unknown')}'")
+        started = time.perf_counter()
+        prompts_per_family = await run_in_session(self._prepare_prompts_per_family, item, 'generation', options)
+        task_to_format = self._get_task_format_map(prompts_per_family)
+
+        events = asyncio.Queue()
+        nodes = set()
+
+        def schedule(coro):
+            node = asyncio.ensure_future(coro)
+            nodes.add(node)
+            # Wakes the consumer once the node (and anything it scheduled) is accounted for
+            node.add_done_callback(lambda _: events.put_nowait(None))
+
+        generation_prompts_tasks = self._prepare_prompts_tasks(prompts_per_family, 'generation', options)
+        await self._attach_images(generation_prompts_tasks)
+        candidates = None
+        if (options or {}).get('evaluation_mode', self.evaluation_mode) == 'listwise':
+            # Generation task -> outputs still to come and parsed outputs so far
+            candidates = {}
+            for prompt_task in generation_prompts_tasks:
+                if self.task_manager.get_evaluation_tasks(prompt_task['task']):
+                    collected = candidates.setdefault(prompt_task['task'], {'pending': 0, 'outputs': []})
+                    collected['pending'] += 1
+        for prompt_task in generation_prompts_tasks:
+            schedule(self._run_generation_node(item, prompt_task, task_to_format.get(prompt_task['task'], 'json'),
+                                               schedule, events, started, options, candidates))
+        try:
+            while nodes:
+                event = await events.get()
+                if event is not None:
+                    yield event
+                    continue
+                for node in [n for n in nodes if n.done()]:
+                    nodes.discard(node)
+                    if not node.cancelled() and node.exception():
+                        self.logger.error(f"Pipeline node failed: {node.exception()}", exc_info=node.exception())
+        finally:
+            # The consumer went away (e.g. client disconnected): stop the remaining calls
+            for node in nodes:
+                node.cancel()
+        self.logger.info(f"Pipeline completed in {(time.perf_counter() - started) * 1000:.0f} ms.")
+
+    async def collect_pipeline(self, item: Dict[str, Any], options: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Non-streaming form of enrich_item_pipeline.
+
+        Returns:
+            Dict[str, Any]: {'generation': {task: {handler: result}},
+                             'evaluation': {task: {"<generation task>/<generation handler>": {handler: result}}}}
+        """
+        collected = {'generation': {}, 'evaluation': {}}
+        async for event in self.enrich_item_pipeline(item, options):
+            if event['task_type'] == 'generation':
+                collected['generation'].setdefault(event['task'], {})[event['handler_name']] = event['result']
+            else:
+                evaluations = collected['evaluation'].setdefault(event['task'], {})
+                evaluations.setdefault(event['depends_on'].split(':', 1)[1], {})[event['handler_name']] = event['result']
+        return collected
+
+    async def _run_generation_node(self, item, prompt_task, output_format, schedule, events, started, options=None,
+                                   candidates=None):
+        task_name, handler_name = prompt_task['task'], prompt_task['provider_name']
+        node_id = f"generation:{task_name}/{handler_name}"
+        try:
+            extra_context = await self._generate_node_output(item, prompt_task, output_format, node_id, events, started)
+        except asyncio.CancelledError:
+            # The pipeline is being torn down (e.g. the client went away): schedule nothing more
+            raise
+        except Exception:
+            # A failed node still counts as answered, so the task's other outputs get judged
+            self._collect_candidate(item, task_name, None, node_id, candidates, schedule, events, started, options)
+            raise
+        self._collect_candidate(item, task_name, extra_context, node_id, candidates, schedule, events, started, options)
+        if extra_context and candidates is None:
+            await self._schedule_evaluations(item, extra_context, node_id, schedule, events, started, options)
+
+    def _collect_candidate(self, item, task_name, extra_context, node_id, candidates, schedule, events, started, options):
+        # Listwise: the task's outputs are judged together once every handler has answered
+        if candidates is None or task_name not in candidates:
+            return
+        collected = candidates[task_name]
+        collected['pending'] -= 1
+        if extra_context:
+            collected['outputs'].append(dict(extra_context, node_id=node_id))
+        if collected['pending'] == 0 and collected['outputs']:
+            schedule(self._schedule_listwise_evaluations(item, task_name, collected['outputs'], schedule,
+                                                         events, started, options))
+
+    async def _generate_node_output(self, item, prompt_task, output_format, node_id, events, started):
+        """
+        Runs one generation node and emits its event.
+
+        Returns:
+            Optional[Dict[str, Any]]: The template context for its evaluations, or None when the output
+            did not parse or the task has no evaluation tasks.
+        """
+        task_name, handler_name = prompt_task['task'], prompt_task['provider_name']
+        handler = self.llm_manager.handlers.get(handler_name)
+        if not handler:
+            self.logger.error(f"Handler '{handler_name}' not found for task '{task_name}'.")
+            return None
+
+        _, _, response = await self._invoke_single_llm(task_name, prompt_task['prompt'], handler_name, handler,
+                                                       images=self._image_parts(prompt_task, handler))
+        results = await run_in_session(self._apply_postprocess_hooks, {task_name: {handler_name: response}})
+        response = results[task_name][handler_name]
+        processed = await self._process_single_response(handler_name, task_name, response, output_format,
+                                                        item.get('attributes_list'))
+        if self.result_writer:
+            self.result_writer.submit(self._build_result_rows(item, 'generation', results, {task_name: {handler_name: processed}},
+                                                              self._fingerprints([prompt_task])))
+        events.put_nowait(self._node_event(node_id, None, 'generation', task_name, handler_name, processed, started))
+
+        if 'response' not in processed or not self.task_manager.get_evaluation_tasks(task_name):
+            return None
+        generated_output = processed['response']
+        return {
+            'generated_output': generated_output if isinstance(generated_output, str) else json.dumps(generated_output),
+            'generation_task': task_name,
+            'generation_handler': handler_name,
+        }
+
+    async def _schedule_evaluations(self, item, extra_context, depends_on, schedule, events, started, options=None):
+        evaluation_tasks = self.task_manager.get_evaluation_tasks(extra_context['generation_task'])
+        prompts_per_family = await run_in_session(self._prepare_dependent_prompts, item, evaluation_tasks, extra_context, options)
+        task_to_format = self._get_task_format_map(prompts_per_family)
+        for evaluation_task in self._prepare_prompts_tasks(prompts_per_family, 'evaluation', options):
+            schedule(self._run_evaluation_node(item, evaluation_task, task_to_format.get(evaluation_task['task'], 'json'),
+                                               depends_on, events, started))
+
+    async def _schedule_listwise_evaluations(self, item, task_name, outputs, schedule, events, started, options=None):
+        """
+        Schedules one listwise judge call per (evaluation task, judge handler) over all parsed outputs
+        of a generation task, instead of one call per output. Evaluation tasks whose template does not
+        show the generated output as is, and tasks with a single output, are judged pointwise.
+        """
+        if len(outputs) == 1:
+            await self._schedule_evaluations(item, outputs[0], outputs[0]['node_id'], schedule, events, started, options)
+            return
+        extra_context = {'generated_output': CANDIDATE_MARKER, 'generation_task': task_name, 'generation_handler': None}
+        evaluation_tasks = self.task_manager.get_evaluation_tasks(task_name)
+        prompts_per_family = await run_in_session(self._prepare_dependent_prompts, item, evaluation_tasks, extra_context, options)
+        task_to_format = self._get_task_format_map(prompts_per_family)
+        pointwise_tasks = set()
+        for prompt_task in self._prepare_prompts_tasks(prompts_per_family, 'evaluation', options):
+            evaluation_task = prompt_task['task']
+            expected_metrics = self.task_manager.get_task_config(evaluation_task, 'evaluation').get('expected_metrics')
+            ordered = self.listwise_judge.order(outputs)
+            judge_task = self.listwise_judge.build(prompt_task, [o['generated_output'] for o in ordered], expected_metrics)
+            if judge_task is None:
+                pointwise_tasks.add(evaluation_task)
+                continue
+            metrics.inc('listwise_evaluations_total', {'task': evaluation_task})
+            metrics.inc('llm_calls_avoided_total', {'task': evaluation_task, 'task_type': 'evaluation'}, len(ordered) - 1)
+            schedule(self._run_listwise_node(item, judge_task, ordered, task_to_format.get(evaluation_task, 'json'),
+                                             events, started))
+        if pointwise_tasks:
+            self.logger.warning(f"Evaluation tasks {sorted(pointwise_tasks)} do not show the generated output as is; "
+                                f"judging them pointwise.")
+            for output in outputs:
+                prompts_per_family = await run_in_session(self._prepare_dependent_prompts, item, sorted(pointwise_tasks),
+                                                          output, options)
+                for evaluation_task in self._prepare_prompts_tasks(prompts_per_family, 'evaluation', options):
+                    schedule(self._run_evaluation_node(item, evaluation_task,
+                                                       task_to_format.get(evaluation_task['task'], 'json'),
+                                                       output['node_id'], events, started))
+
+    async def _run_listwise_node(self, item, judge_task, ordered, output_format, events, started):
+        task_name, handler_name = judge_task['task'], judge_task['provider_name']
+        handler = self.llm_manager.handlers.get(handler_name)
+        if not handler:
+            self.logger.error(f"Handler '{handler_name}' not found for task '{task_name}'.")
+            return
+
+        _, _, response = await self._invoke_single_llm(task_name, judge_task['prompt'], handler_name, handler,
+                                                       max_tokens=judge_task['max_tokens'])
+        if response.get('error'):
+            judgement = {'handler_name': handler_name, 'error': response['error']}
+        else:
+            # The judgement is one JSON object for all candidates, whatever the task's own output format
+            try:
+                parsed, repairs = await self.cpu_executor.run(parse_response_with_repairs, 'json', response.get('response', ''),
+                                                              None, size=len(response.get('response') or ''))
+                judgement = self._parse_outcome(handler_name, task_name, True, parsed, repairs)
+            except Exception as e:
+                judgement = self._parse_outcome(handler_name, task_name, False, str(e), [])
+
+        evaluations = self.listwise_judge.split(judgement.get('response'), len(ordered)) if 'response' in judgement \
+            else [None] * len(ordered)
+        validator = self.task_manager.get_output_validator(task_name)
+        per_candidate = {}
+        for position, (output, evaluation) in enumerate(zip(ordered, evaluations), 1):
+            listwise = {'position': position, 'candidates': len(ordered)}
+            if evaluation is None:
+                processed = {'handler_name': handler_name, 'listwise': listwise,
+                             'error': judgement.get('error') or 'Candidate missing from the listwise judgement'}
+            else:
+                errors = validator(evaluation) if validator else None
+                processed = {'handler_name': handler_name, 'response': evaluation, 'listwise': listwise}
+                if errors:
+                    metrics.inc('schema_failures_total', {'handler': handler_name, 'task': task_name})
+                    processed = {'handler_name': handler_name, 'listwise': listwise, 'error': 'Schema validation failed',
+                                 'schema_errors': [f"{path or '(response)'}: {message}" for path, message in errors]}
+            depends_on = output['node_id']
+            candidate = depends_on.split(':', 1)[1]
+            per_candidate[candidate] = processed.get('response')
+            self._feed_quality(task_name, output['generation_task'], output['generation_handler'], processed)
+            node_id = f"evaluation:{task_name}/{handler_name}<-{candidate}"
+            events.put_nowait(self._node_event(node_id, depends_on, 'evaluation', task_name, handler_name, processed, started))
+
+        if self.result_writer:
+            # One row for the judge call; its parsed response maps "<generation task>/<handler>" to the evaluation
+            stored = dict(judgement, response=per_candidate) if 'response' in judgement else judgement
+            self.result_writer.submit(self._build_result_rows(item, 'evaluation', {task_name: {handler_name: response}},
+                                                              {task_name: {handler_name: stored}},
+                                                              self._fingerprints([judge_task])))
+
+    async def _run_evaluation_node(self, item, prompt_task, output_format, depends_on, events, started):
+        task_name, handler_name = prompt_task['task'], prompt_task['provider_name']
+        handler = self.llm_manager.handlers.get(handler_name)
+        if not handler:
+            self.logger.error(f"Handler '{handler_name}' not found for task '{task_name}'.")
+            return
+
+        _, _, response = await self._invoke_single_llm(task_name, prompt_task['prompt'], handler_name, handler,
+                                                       images=self._image_parts(prompt_task, handler))
+        processed = await self._process_single_response(handler_name, task_name, response, output_format,
+                                                        item.get('attributes_list'))
+        if self.result_writer:
+            self.result_writer.submit(self._build_result_rows(item, 'evaluation', {task_name: {handler_name: response}},
+                                                              {task_name: {handler_name: processed}},
+                                                              self._fingerprints([prompt_task])))
+        generation_task, generation_handler = depends_on.split(':', 1)[1].split('/', 1)
+        self._feed_quality(task_name, generation_task, generation_handler, processed)
+        node_id = f"evaluation:{task_name}/{handler_name}<-{depends_on.split(':', 1)[1]}"
+        events.put_nowait(self._node_event(node_id, depends_on, 'evaluation', task_name, handler_name, processed, started))
+
+    def _feed_quality(self, evaluation_task, generation_task, generation_handler, processed):
+        # Evaluation scores of a handler's generations drive quality-aware routing
+        router = self.llm_manager.router
+        if not router or 'response' not in processed:
+            return
+        expected_metrics = self.task_manager.get_task_config(evaluation_task, 'evaluation').get('expected_metrics')
+        score = quality_score(processed['response'], expected_metrics)
+        if score is not None:
+            router.record_quality(generation_task, generation_handler, score)
+
+    @staticmethod
+    def _node_event(node_id, depends_on, task_type, task, handler_name, result, started):
+        return {
+            'node_id': node_id,
+            'depends_on': depends_on,
+            'task_type': task_type,
+            'task': task,
+            'handler_name': handler_name,
+            'result': result,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    def _prepare_dependent_prompts(self, item: Dict[str, Any], task_names: List[str], extra_context: Dict[str, Any],
+                                   options: Dict[str, Any] = None) -> Dict[str, Any]:
+        family_names = self._active_families(options)
+        return {family_name: self.prompt_manager.generate_dependent_prompts(item, family_name, 'evaluation',
+                                                                            task_names, extra_context)
+                for family_name in family_names}
+
+    async def enrich_items(self, items: List[Dict[str, Any]], task_type: str, options: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """
+        Batch variant of enrich_item. LLM calls for all items share a concurrency limit, and
+        responses are parsed in chunks across worker processes instead of one by one.
+
+        Args:
+            items (List[Dict[str, Any]]): Items to enrich.
+            task_type (str): 'generation', 'evaluation' or 'pipeline'.
+            options (Dict[str, Any], optional): Per-request options applied to every item, as for enrich_item.
+
+        Returns:
+            List[Dict[str, Any]]: Processed results, one entry per item in input order.
+        """
+        self.logger.info(f"Processing {task_type} tasks for a batch of {len(items)} items.")
+        if task_type == 'pipeline':
+            semaphore = asyncio.Semaphore(self.batch_concurrency)
+
+            async def run_pipeline(item):
+                async with semaphore:
+                    return await self.collect_pipeline(item, options)
+            return list(await asyncio.gather(*(run_pipeline(item) for item in items)))
+
+        prompts_per_item = await run_in_session(
+            lambda: [self._prepare_prompts_per_family(item, task_type, options) for item in items])
+
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
+        prompts_tasks_per_item = [self._prepare_prompts_tasks(prompts_per_family, task_type, options)
+                                  for prompts_per_family in prompts_per_item]
+        reused_per_item, prompts_tasks_per_item = await self._reuse_unchanged(items, prompts_tasks_per_item,
+                                                                             task_type, options)
+        # One fetch per distinct image across the batch
+        await self._attach_images([pt for prompts_tasks in prompts_tasks_per_item for pt in prompts_tasks])
+        if (options or {}).get('pack_items', self.pack_items) and len(items) > 1:
+            results_per_item = await self._invoke_packed(items, prompts_tasks_per_item, options, semaphore)
+        else:
+            results_per_item = await asyncio.gather(*(
+                self._invoke_prompts(prompts_tasks, options, semaphore) for prompts_tasks in prompts_tasks_per_item))
+
+        if task_type == 'generation':
+            results_per_item = await run_in_session(
+                lambda: [self._apply_postprocess_hooks(results) for results in results_per_item])
+
+        # Collect every successful response so parsing runs as one chunked batch
+        jobs, job_keys = [], []
+        processed_per_item = []
+        for index, (item, results) in enumerate(zip(items, results_per_item)):
+            task_to_format = self._get_task_format_map(prompts_per_item[index])
+            processed = {}
+            for task, handler_responses in results.items():
+                output_format = task_to_format.get(task, 'json')
+                processed[task] = {}
+                for handler_name, response in handler_responses.items():
+                    if response.get('skipped'):
+                        processed[task][handler_name] = {'handler_name': handler_name, 'skipped': response['skipped']}
+                        continue
+                    if response.get('error'):
+                        processed[task][handler_name] = {'handler_name': handler_name, 'error': response['error']}
+                        continue
+                    jobs.append((output_format, response.get('response', ''), item.get('attributes_list')))
+                    job_keys.append((index, task, handler_name))
+            processed_per_item.append(processed)
+
+        outcomes = await self.cpu_executor.map_chunked(parse_responses, jobs)
+        for (index, task, handler_name), (ok, value, repairs) in zip(job_keys, outcomes):
+            processed_per_item[index][task][handler_name] = self._parse_outcome(handler_name, task, ok, value, repairs)
+
+        # Schema checks (and targeted re-asks) for the parsed results
+        validations = [(index, task, handler_name) for index, task, handler_name in job_keys
+                       if self.task_manager.get_output_validator(task)]
+        validated = await asyncio.gather(*(
+            self._validate_and_reask(task, handler_name, processed_per_item[index][task][handler_name],
+                                     results_per_item[index][task][handler_name])
+            for index, task, handler_name in validations))
+        for (index, task, handler_name), result in zip(validations, validated):
+            processed_per_item[index][task][handler_name] = result
+
+        if self.result_writer:
+            # Batch producers can afford to wait, so a full queue slows the batch instead of dropping rows
+            for item, results, processed, prompts_tasks in zip(items, results_per_item, processed_per_item,
+                                                               prompts_tasks_per_item):
+                await self.result_writer.submit_wait(self._build_result_rows(item, task_type, results, processed,
+                                                                             self._fingerprints(prompts_tasks)))
+        for processed, reused in zip(processed_per_item, reused_per_item):
+            self._merge_reused(processed, reused)
+        return processed_per_item
+
+    def _prepare_prompts_per_family(self, item: Dict[str, Any], task_type: str, options: Dict[str, Any] = None) -> Dict[str, Any]:
+        # Step 1: Process item attributes if AEInclusionListRepo is available
+        if self.ae_inclusion_list_repo:
+            self._process_attributes(item)
+
+        # Step 2: Generate prompts per model family (only families with a handler this request may use)
+        family_names = self._active_families(options)
+        prompts_per_family = {}
+        for family_name in family_names:
+            prompts = self.prompt_manager.generate_prompts(item, family_name=family_name, task_type=task_type)
+            prompts_per_family[family_name] = prompts
+            self.logger.debug(f"Generated {len(prompts)} prompts for family '{family_name}'.")
+        return prompts_per_family
+
+    def _build_result_rows(self, item: Dict[str, Any], task_type: str, results, processed_results,
+                           fingerprints: Dict[tuple, str] = None) -> List[Dict[str, Any]]:
+        item_id = self.resolve_item_id(item)
+        rows = []
+        for task, handler_responses in results.items():
+            for handler_name, response in handler_responses.items():
+                if response.get('skipped'):
+                    # Cancelled by the task's result policy: no answer to store
+                    continue
+                processed = processed_results.get(task, {}).get(handler_name, {})
+                if response.get('raw_response') is None:
+                    parse_status = 'llm_error'
+                elif response.get('error'):
+                    parse_status = 'hook_error'
+                elif 'response' in processed:
+                    parse_status = 'ok'
+                elif 'schema_errors' in processed:
+                    parse_status = 'schema_error'
+                else:
+                    parse_status = 'parse_error'
+                usage = response.get('usage') or {}
+                rows.append({
+                    'item_id': item_id,
+                    'task_name': task,
+                    'task_type': task_type,
+                    'handler_name': handler_name,
+                    'prompt_hash': response.get('prompt_hash'),
+                    'response': response.get('raw_response'),
+                    'parsed_response': processed.get('response', processed.get('partial_response')),
+                    'parse_status': parse_status,
+                    'error': processed.get('error'),
+                    'latency_ms': response.get('latency_ms'),
+                    # Estimated when the provider reports no usage
+                    'prompt_tokens': usage.get('prompt_tokens') or response.get('input_tokens_estimate'),
+                    'completion_tokens': usage.get('completion_tokens'),
+                    'input_fingerprint': (fingerprints or {}).get((task, handler_name)),
+                })
+        return rows
+
+    @staticmethod
+    def resolve_item_id(item: Dict[str, Any]) -> str:
+        if item.get('item_id'):
+            return str(item['item_id'])
+        # No id on the request: fall back to a stable hash of the item content
+        content = {k: item.get(k) for k in ('item_title', 'short_description', 'long_description', 'product_type', 'image_url')}
+        return hashlib.sha256(json.dumps(content, sort_keys=True).encode('utf-8')).hexdigest()
+
     def _process_attributes(self, item: Dict[str, Any]):
         """
         Processes attributes for the given item:
@@ -93,35 +593,233 @@ class ItemEnricher:
             item['attributes_list'] = full_attrs
             self.logger.debug(f"No attributes_list provided. Assigned full inclusion list: {full_attrs}")
 
-    def _prepare_prompts_tasks(self, prompts_per_family):
+    def _active_families(self, options: Dict[str, Any] = None):
+        allowed = (options or {}).get('handlers')
+        return {family for handler_name, family in self.llm_manager.family_names.items()
+                if not allowed or handler_name in allowed}
+
+    def _select_handlers(self, task_name: str, task_type: str, options: Dict[str, Any] = None) -> List[str]:
+        """
+        Handlers that should serve a task: the generation_task_providers mapping (all handlers when
+        unmapped), narrowed by the request's 'task_handlers' override for the task, else its 'handlers' list.
+        """
+        options = options or {}
+        handler_names = self.llm_manager.get_task_handlers(task_name, task_type)
+        override = (options.get('task_handlers') or {}).get(task_name) or options.get('handlers')
+        if override:
+            handler_names = [name for name in handler_names if name in override]
+        return self.llm_manager.select_handlers(task_name, task_type, handler_names,
+                                                options.get('profile'), options.get('top_k'))
+
+    def _prepare_prompts_tasks(self, prompts_per_family, task_type: str = 'generation', options: Dict[str, Any] = None):
         prompts_tasks = []
-        for handler_name, handler in self.llm_manager.handlers.items():
+        selected = {}
+        fan_out = {}
+        for handler_name in self.llm_manager.handlers:
             family_name = self.llm_manager.get_family_name(handler_name)
             prompts = prompts_per_family.get(family_name, [])
             for prompt_task in prompts:
+                task_name = prompt_task['task']
+                if task_name not in selected:
+                    selected[task_name] = set(self._select_handlers(task_name, task_type, options))
+                fan_out[task_name] = fan_out.get(task_name, 0) + 1
+                if handler_name not in selected[task_name]:
+                    continue
                 pt_copy = prompt_task.copy()
                 pt_copy['provider_name'] = handler_name
                 prompts_tasks.append(pt_copy)
+        self._record_routing(prompts_tasks, fan_out, task_type)
         return prompts_tasks
 
-    async def _invoke_llms(self, prompts_tasks):
-        import asyncio
+    def _record_routing(self, prompts_tasks, fan_out: Dict[str, int], task_type: str):
+        # Calls avoided are measured against the fan-out to every handler with a prompt for the task
+        made = {}
+        for pt in prompts_tasks:
+            made[pt['task']] = made.get(pt['task'], 0) + 1
+        for task_name, possible in fan_out.items():
+            labels = {'task': task_name, 'task_type': task_type}
+            metrics.inc('llm_calls_total', labels, made.get(task_name, 0))
+            metrics.inc('llm_calls_avoided_total', labels, possible - made.get(task_name, 0))
+        total_possible = sum(fan_out.values())
+        self.logger.info(f"Routing {task_type}: {len(prompts_tasks)} LLM calls for {len(fan_out)} tasks "
+                         f"({total_possible - len(prompts_tasks)} of {total_possible} avoided).")
+
+    async def _invoke_prompts(self, prompts_tasks, options: Dict[str, Any] = None, semaphore=None):
+        """
+        Invokes the prompt tasks, fusing compatible Markdown tasks per handler into one call first
+        when the 'fuse_tasks' option (or the enricher default) is on.
+        """
+        if not (options or {}).get('fuse_tasks', self.fuse_tasks):
+            return await self._invoke_llms(prompts_tasks, semaphore, options)
+        # Tasks under an early-exit policy (first_valid, quorum, cascade) keep their own calls per handler
+        prompts_tasks, raced = self._split_by_policy(prompts_tasks, options, 'fusion')
+        prompts_tasks, fused_parts = self._fuse_prompts_tasks(prompts_tasks)
+        results = await self._invoke_llms(prompts_tasks + raced, semaphore, options)
+        if fused_parts:
+            results = await self._split_fused_results(results, fused_parts, semaphore, options)
+        return results
+
+    def _fuse_prompts_tasks(self, prompts_tasks):
+        task_keys = load_task_sections()
+        parser = ParserFactory.get_parser('markdown')
+        sections = {task: parser.patterns[key] for task, key in task_keys.items() if key in parser.patterns}
+
+        per_handler = {}
+        remaining = []
+        for pt in prompts_tasks:
+            if pt.get('output_format') == 'markdown' and pt['task'] in sections and not pt.get('image_url'):
+                per_handler.setdefault(pt['provider_name'], []).append(pt)
+            else:
+                remaining.append(pt)
+
+        fused_parts = {}
+        for handler_name, parts in per_handler.items():
+            if len(parts) < 2:
+                remaining.extend(parts)
+                continue
+            fused = self.prompt_manager.fuse_prompts(parts, sections)
+            fused['provider_name'] = handler_name
+            fused_parts[(fused['task'], handler_name)] = parts
+            remaining.append(fused)
+            metrics.inc('fused_calls_total', {'handler': handler_name})
+            metrics.inc('fused_tasks_total', {'handler': handler_name}, len(parts))
+        if fused_parts:
+            self.logger.info(f"Fused {sum(len(p) for p in fused_parts.values())} task prompts into {len(fused_parts)} calls.")
+        return remaining, fused_parts
+
+    async def _split_fused_results(self, results, fused_parts, semaphore=None, options: Dict[str, Any] = None):
+        """
+        Splits composite responses back into one Markdown response per task (its '### ' section), so
+        hooks, parsing and persistence see the same shape as unfused calls. Tasks whose section is
+        missing are re-asked individually with their original prompt.
+        """
+        task_keys = load_task_sections()
+        parser = ParserFactory.get_parser('markdown')
+        reasks = []
+        for fused_name in [task for task in results if task.startswith(FUSED_TASK_PREFIX)]:
+            for handler_name, response in results.pop(fused_name).items():
+                parts = fused_parts[(fused_name, handler_name)]
+                fused_with = [part['task'] for part in parts]
+                if response.get('error'):
+                    # A failed call would fail again per task; report the error for each of them
+                    for part in parts:
+                        results.setdefault(part['task'], {})[handler_name] = {**response, 'fused_with': fused_with}
+                    continue
+                sections = parser.split_sections(response.get('response') or '')
+                usage = response.get('usage')
+                for part in parts:
+                    text = parser.section_text(sections, task_keys[part['task']])
+                    if text is None:
+                        metrics.inc('fusion_missing_total', {'task': part['task'], 'handler': handler_name})
+                        reasks.append(part)
+                        continue
+                    # Token usage belongs to the composite call, so it is attributed to one task only
+                    results.setdefault(part['task'], {})[handler_name] = {
+                        **response, 'response': text, 'raw_response': text, 'usage': usage, 'fused_with': fused_with}
+                    usage = None
+        if reasks:
+            self.logger.info(f"Re-asking {len(reasks)} tasks missing from fused responses: "
+                             f"{sorted({part['task'] for part in reasks})}")
+            for task_name, handler_responses in (await self._invoke_llms(reasks, semaphore, options)).items():
+                results.setdefault(task_name, {}).update(handler_responses)
+        return results
+
+    async def _invoke_packed(self, items, prompts_tasks_per_item, options, semaphore):
+        """
+        Batch invocation with item packing: short tasks for items of the same product type share one
+        call per pack, the rest run per item as usual. Each packed answer is split out per item and
+        checked; only the items whose answer is missing or unparsable are re-run on their own.
+        """
+        output_limits = {name: self.llm_manager.get_max_tokens(name) for name in self.llm_manager.handlers}
+        # Tasks under an early-exit policy are not packed: a pack per handler would call every handler
+        split = [self._split_by_policy(prompts_tasks, options, 'packing') for prompts_tasks in prompts_tasks_per_item]
+        packs, remaining = self.item_packer.plan(items, [packable for packable, _ in split], output_limits)
+        remaining = [rest + raced for rest, (_, raced) in zip(remaining, split)]
+
+        async def invoke_pack(pack):
+            handler = self.llm_manager.handlers.get(pack['provider_name'])
+            if not handler:
+                self.logger.error(f"Handler '{pack['provider_name']}' not found for task '{pack['task']}'.")
+                return pack, None
+            _, _, response = await self._invoke_single_llm(pack['task'], pack['prompt'], pack['provider_name'],
+                                                           handler, semaphore, pack['max_tokens'])
+            return pack, response
+
+        per_item, packed = await asyncio.gather(
+            asyncio.gather(*(self._invoke_prompts(prompts_tasks, options, semaphore) for prompts_tasks in remaining)),
+            asyncio.gather(*(invoke_pack(pack) for pack in packs)))
+        results_per_item = list(per_item)
+
+        reruns = [[] for _ in items]
+        for pack, response in packed:
+            handler_name = pack['provider_name']
+            answers = self.item_packer.split(pack, response.get('response') if response and not response.get('error') else '')
+            usage = response.get('usage') if response else None
+            for (index, pt), answer in zip(pack['members'], answers):
+                if answer is None or not self._packed_answer_ok(pt, answer):
+                    reruns[index].append(pt)
+                    continue
+                # Token usage belongs to the packed call, so it is attributed to one item only
+                results_per_item[index].setdefault(pt['task'], {})[handler_name] = {
+                    **response, 'prompt': pt['prompt'], 'response': answer, 'raw_response': answer,
+                    'usage': usage, 'packed_with': len(pack['members'])}
+                usage = None
+            labels = {'task': pack['task'], 'handler': handler_name}
+            metrics.inc('packed_calls_total', labels)
+            metrics.inc('packed_items_total', labels, len(pack['members']))
+
+        rerun_count = sum(len(r) for r in reruns)
+        if rerun_count:
+            metrics.inc('packed_reruns_total', None, rerun_count)
+            self.logger.info(f"Re-running {rerun_count} prompts whose packed answers were missing or invalid.")
+            rerun_results = await asyncio.gather(*(self._invoke_llms(r, semaphore, options) for r in reruns))
+            for results, extra in zip(results_per_item, rerun_results):
+                for task_name, handler_responses in extra.items():
+                    results.setdefault(task_name, {}).update(handler_responses)
+        return results_per_item
+
+    def _packed_answer_ok(self, prompt_task, answer: str) -> bool:
+        if prompt_task.get('output_format', 'json') == 'json':
+            try:
+                value, _ = extract_json(answer)
+            except ValueError:
+                return False
+            validator = self.task_manager.get_output_validator(prompt_task['task'])
+            return not validator or not validator(value)
+        key = load_task_sections().get(prompt_task['task'])
+        if key:
+            parser = ParserFactory.get_parser('markdown')
+            if key in parser.patterns:
+                return parser.section_text(parser.split_sections(answer), key) is not None
+        return bool(answer.strip())
 
-        tasks_list = []
+    async def _invoke_llms(self, prompts_tasks, semaphore=None, options: Dict[str, Any] = None):
+        calls_per_task = {}
         for pt in prompts_tasks:
             task_name = pt['task']
-            prompt = pt['prompt']
             provider_name = pt['provider_name']
             handler = self.llm_manager.handlers.get(provider_name)
             if not handler:
                 self.logger.error(f"Handler '{provider_name}' not found for task '{task_name}'.")
                 continue
-            tasks_list.append(self._invoke_single_llm(task_name, prompt, provider_name, handler))
+            calls_per_task.setdefault(task_name, []).append((pt, handler))
+
+        def start(pt, handler):
+            return self._invoke_single_llm(pt['task'], pt['prompt'], pt['provider_name'], handler, semaphore,
+                                           pt.get('max_tokens'), self._image_parts(pt, handler))
 
-        task_results = await asyncio.gather(*tasks_list)
+        async def invoke_task(task_name, calls):
+            policy = self._result_policy(task_name, options)
+            if policy[0] == 'all' or len(calls) < 2:
+                return await asyncio.gather(*(start(pt, handler) for pt, handler in calls))
+            if policy[0] == 'cascade':
+                return await self._invoke_cascade(task_name, calls, start)
+            return await self._invoke_with_policy(task_name, [(pt, start(pt, handler)) for pt, handler in calls], policy)
+
+        task_results = await asyncio.gather(*(invoke_task(task_name, calls) for task_name, calls in calls_per_task.items()))
 
         results = {}
-        for task_name, handler_name, handler_response in task_results:
+        for task_name, handler_name, handler_response in (r for per_task in task_results for r in per_task):
             if task_name not in results:
                 results[task_name] = {}
             results[task_name][handler_name] = handler_response
@@ -129,15 +827,278 @@ class ItemEnricher:
         self.logger.info("LLM invocation completed.")
         return results
 
-    async def _invoke_single_llm(self, task_name: str, prompt: str, handler_name: str, handler) -> (str, str, Dict[str,Any]):
+    def _split_by_policy(self, prompts_tasks, options: Dict[str, Any], purpose: str):
+        """
+        Splits prompt tasks into those under the 'all' result policy, which may be fused or packed,
+        and those under an early-exit policy, which must stay one call per handler.
+        """
+        combinable, raced = [], []
+        for pt in prompts_tasks:
+            (combinable if self._result_policy(pt['task'], options)[0] == 'all' else raced).append(pt)
+        if raced:
+            self.logger.info(f"Skipping {purpose} for tasks {sorted({pt['task'] for pt in raced})}: "
+                             f"their result policy runs handlers separately.")
+        return combinable, raced
+
+    def _result_policy(self, task_name: str, options: Dict[str, Any] = None):
+        policy = (options or {}).get('result_policy', self.result_policy)
+        if isinstance(policy, dict):
+            policy = policy.get(task_name, self.result_policy)
+        if task_name.startswith(FUSED_TASK_PREFIX):
+            # A fused call answers several tasks; it is never raced against other handlers
+            policy = 'all'
+        return parse_result_policy(policy)
+
+    async def _invoke_with_policy(self, task_name: str, calls, policy):
+        """
+        Runs a task's handler calls under an early-exit result policy. Responses are checked as they
+        complete: 'first_valid' stops at the first valid one (it parses, passes the postprocess hooks
+        and the output schema), 'quorum' once k valid responses agree (see agreement_key). The calls
+        still running are then cancelled and returned as skipped. If the policy is never met, every
+        response is returned as with 'all'.
+
+        Returns:
+            List[Tuple[str, str, Dict[str, Any]]]: (task, handler, response) per call.
+        """
+        name, k = policy
+        label = policy_label(policy)
+        pending = {asyncio.ensure_future(call): pt for pt, call in calls}
+        completed, votes, met = [], {}, False
+        try:
+            while pending and not met:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    pt = pending.pop(future)
+                    completed.append(future.result())
+                    key = await self._accepted_key(task_name, completed[-1][2], pt.get('output_format', 'json'))
+                    if key is None:
+                        continue
+                    votes[key] = votes.get(key, 0) + 1
+                    if name == 'first_valid' or votes[key] >= k:
+                        met = True
+        finally:
+            for future in pending:
+                future.cancel()
+        if pending:
+            # Let the cancelled calls release their scheduler slots before moving on
+            await asyncio.wait(pending)
+            metrics.inc('result_policy_skipped_total', {'task': task_name, 'policy': label}, len(pending))
+            self.logger.info(f"Result policy '{label}' met for task '{task_name}'; skipped "
+                             f"{sorted(pt['provider_name'] for pt in pending.values())}.")
+        metrics.inc('result_policy_total', {'task': task_name, 'policy': label, 'outcome': 'met' if met else 'unmet'})
+        skipped = [(task_name, pt['provider_name'], {'response': None, 'error': None, 'raw_response': None, 'skipped': label})
+                   for pt in pending.values()]
+        return completed + skipped
+
+    async def _invoke_cascade(self, task_name: str, calls, start):
+        """
+        Runs a task's handler calls tier by tier, cheapest first (ProviderConfig.cost_tier; handlers
+        without a tier come last). The task escalates to the next tier only when no response of the
+        current tier is accepted: the call failed, the response did not parse, a guardrail or the
+        output schema rejected it, or its stated confidence is below cascade_min_confidence. Tiers
+        never reached are returned as skipped.
+
+        Returns:
+            List[Tuple[str, str, Dict[str, Any]]]: (task, handler, response) per call.
+        """
+        tiers = {}
+        for pt, handler in calls:
+            tiers.setdefault(self.llm_manager.get_cost_tier(pt['provider_name']), []).append((pt, handler))
+        order = sorted(tiers, key=lambda tier: (tier is None, tier if tier is not None else 0))
+        labels = {'task': task_name, 'product_type': calls[0][0].get('product_type') or 'unknown'}
+        metrics.inc('cascade_total', labels)
+
+        completed, resolved_at = [], None
+        for position, tier in enumerate(order):
+            tier_calls = tiers[tier]
+            results = await asyncio.gather(*(start(pt, handler) for pt, handler in tier_calls))
+            completed.extend(results)
+            reasons = [await self._escalation_reason(task_name, response, pt.get('output_format', 'json'))
+                       for (pt, _), (_, _, response) in zip(tier_calls, results)]
+            if None in reasons:
+                resolved_at = position
+                break
+            if position + 1 < len(order):
+                # The reason given by most of the tier's handlers (the first such on a tie)
+                reason = max(reasons, key=reasons.count)
+                metrics.inc('cascade_escalations_total', {**labels, 'from_tier': str(tier), 'reason': reason})
+                self.logger.info(f"Cascade for task '{task_name}' escalates from tier {tier} ({reason}).")
+        metrics.inc('cascade_resolved_total', {**labels, 'tier': str(order[resolved_at]) if resolved_at is not None else 'none'})
+        if resolved_at != 0:
+            metrics.inc('cascade_escalated_total', labels)
+
+        skipped = [(task_name, pt['provider_name'], {'response': None, 'error': None, 'raw_response': None, 'skipped': 'cascade'})
+                   for tier in order[(resolved_at if resolved_at is not None else len(order)) + 1:]
+                   for pt, _ in tiers[tier]]
+        if skipped:
+            metrics.inc('result_policy_skipped_total', {'task': task_name, 'policy': 'cascade'}, len(skipped))
+        return completed + skipped
+
+    async def _escalation_reason(self, task_name: str, response: Dict[str, Any], output_format: str):
+        """
+        Returns why a cascade response is not accepted, or None if it is.
+        """
+        reason, parsed = await self._check_response(task_name, response, output_format)
+        if reason:
+            return reason
+        confidence = confidence_of(parsed)
+        if confidence is not None and confidence < self.cascade_min_confidence:
+            return 'low_confidence'
+        return None
+
+    async def _accepted_key(self, task_name: str, response: Dict[str, Any], output_format: str):
+        """
+        Returns the agreement key of a valid response, or None.
+        """
+        reason, parsed = await self._check_response(task_name, response, output_format)
+        return None if reason else agreement_key(parsed)
+
+    async def _check_response(self, task_name: str, response: Dict[str, Any], output_format: str):
+        """
+        Checks a response as the result policies see it: it parses and passes the postprocess hooks
+        and the output schema. Hooks run on a copy, so the response itself goes through them once
+        more with the other results.
+
+        Returns:
+            Tuple[Optional[str], Any]: (None, parsed response) if valid, else (reason, None) with reason
+            'llm_error', 'guardrail_rejection', 'parse_failure' or 'schema_failure'.
+        """
+        if response.get('error') or not response.get('response'):
+            return 'llm_error', None
+        probe = await run_in_session(self._apply_postprocess_hooks, {task_name: {'probe': dict(response)}})
+        content = probe[task_name]['probe']
+        if content.get('error'):
+            return 'guardrail_rejection', None
+        try:
+            parsed, _ = await self.cpu_executor.run(parse_response_with_repairs, output_format, content.get('response') or '',
+                                                    None, size=len(content.get('response') or ''))
+        except Exception:
+            return 'parse_failure', None
+        validator = self.task_manager.get_output_validator(task_name)
+        if validator and validator(parsed):
+            return 'schema_failure', None
+        return None, parsed
+
+    async def _invoke_single_llm(self, task_name: str, prompt: str, handler_name: str, handler, semaphore=None,
+                                 max_tokens: int = None, images: List[Dict[str, Any]] = None) -> (str, str, Dict[str,Any]):
+        # Call metadata kept alongside the response for the results store
+        call_info = {'prompt': prompt, 'prompt_hash': hashlib.sha256(prompt.encode('utf-8')).hexdigest(),
+                     'latency_ms': None, 'usage': None,
+                     'input_tokens_estimate': token_estimator.count(prompt, self.llm_manager.get_family_name(handler_name))}
+        metrics.observe('prompt_input_tokens', call_info['input_tokens_estimate'], {'task': task_name, 'handler': handler_name})
+        # Set once a slot is held, so latency covers the provider call only (queueing is in scheduler_queue_wait_ms)
+        timing = {}
         try:
             task_config = self.llm_manager.get_task_config(task_name, 'generation') or self.llm_manager.get_task_config(task_name, 'evaluation')
-            max_tokens = task_config.get('max_tokens', 150)
-            response = await handler.invoke(request={"prompt": prompt, "parameters": {"max_tokens": max_tokens}}, task=task_name)
-            return task_name, handler_name, {'response': response.get('response'), 'error': None}
+            max_tokens = max_tokens or task_config.get('max_tokens', 150)
+            request = BaseLLMRequest(prompt=prompt, parameters={"max_tokens": max_tokens}, images=images)
+            if semaphore:
+                async with semaphore:
+                    response = await self._call_handler(handler_name, handler, request, task_name, timing)
+            else:
+                response = await self._call_handler(handler_name, handler, request, task_name, timing)
+            call_info['latency_ms'] = (time.perf_counter() - timing['start']) * 1000
+            call_info['usage'] = response.get('usage')
+            self.llm_manager.record_call(handler_name, call_info['latency_ms'], True)
+            return task_name, handler_name, {'response': response.get('response'), 'error': None,
+                                             'raw_response': response.get('response'), **call_info}
         except Exception as e:
             self.logger.error(f"Error invoking handler '{handler_name}' for task '{task_name}': {e}", exc_info=True)
-            return task_name, handler_name, {'response': None, 'error': str(e)}
+            if 'start' in timing:
+                # Failures before the handler was called say nothing about the provider
+                call_info['latency_ms'] = (time.perf_counter() - timing['start']) * 1000
+                self.llm_manager.record_call(handler_name, call_info['latency_ms'], False)
+            return task_name, handler_name, {'response': None, 'error': str(e), 'raw_response': None, **call_info}
+
+    async def _reuse_unchanged(self, items, prompts_tasks_per_item, task_type: str, options: Dict[str, Any] = None):
+        """
+        Incremental re-enrichment: a generation (task, handler) whose input fingerprint (see
+        PromptManager._input_fingerprint) equals that of the item's last successfully parsed stored
+        result is not called again; the stored result is returned instead.
+
+        Under an early-exit result policy (first_valid, quorum, cascade) the last run left no rows for
+        the handlers it cancelled or never reached, so reuse is decided per task: once any handler of
+        the task has a matching stored result, the task's other handlers are skipped as well.
+
+        Returns:
+            Tuple[List[Dict], List[List[Dict]]]: Reused results per item ({task: {handler: result}})
+            and the prompt tasks still to run per item.
+        """
+        if (task_type != 'generation' or not self.result_repository
+                or not (options or {}).get('incremental', self.incremental)):
+            return [{} for _ in items], prompts_tasks_per_item
+
+        def lookup():
+            return [self.result_repository.latest_results(self.resolve_item_id(item),
+                                                          sorted({pt['task'] for pt in prompts_tasks}))
+                    for item, prompts_tasks in zip(items, prompts_tasks_per_item)]
+
+        stored_per_item = await run_in_session(lookup)
+        reused_per_item, remaining_per_item = [], []
+        for prompts_tasks, stored in zip(prompts_tasks_per_item, stored_per_item):
+            reused, remaining = {}, []
+            for pt in prompts_tasks:
+                previous = stored.get((pt['task'], pt['provider_name']))
+                if previous and pt.get('input_fingerprint') and previous['input_fingerprint'] == pt['input_fingerprint']:
+                    reused.setdefault(pt['task'], {})[pt['provider_name']] = {
+                        'handler_name': pt['provider_name'], 'response': previous['parsed_response'],
+                        'reused_from': previous['created_at']}
+                    metrics.inc('tasks_reused_total', {'task': pt['task']})
+                else:
+                    remaining.append(pt)
+            for pt in [pt for pt in remaining if pt['task'] in reused]:
+                policy = self._result_policy(pt['task'], options)
+                if policy[0] != 'all':
+                    remaining.remove(pt)
+                    reused[pt['task']][pt['provider_name']] = {'handler_name': pt['provider_name'],
+                                                               'skipped': policy_label(policy)}
+            reused_per_item.append(reused)
+            remaining_per_item.append(remaining)
+        total_reused = sum(1 for reused in reused_per_item for h in reused.values() for r in h.values() if 'skipped' not in r)
+        if total_reused:
+            self.logger.info(f"Reused {total_reused} stored results with unchanged inputs.")
+        return reused_per_item, remaining_per_item
+
+    @staticmethod
+    def _merge_reused(processed_results, reused):
+        for task, handler_results in reused.items():
+            processed_results.setdefault(task, {}).update(handler_results)
+
+    @staticmethod
+    def _fingerprints(prompts_tasks):
+        return {(pt['task'], pt['provider_name']): pt.get('input_fingerprint') for pt in prompts_tasks}
+
+    async def _attach_images(self, prompts_tasks):
+        """
+        Image stage: fetches the images of image tasks (each URL once, see ImageFetcher) and attaches
+        them to their prompt tasks. A task whose image cannot be fetched runs with the URL only.
+        """
+        if not self.image_fetcher:
+            return
+        urls = [pt['image_url'] for pt in prompts_tasks if pt.get('image_url')]
+        if not urls:
+            return
+        images = await self.image_fetcher.prefetch(urls)
+        for pt in prompts_tasks:
+            image = images.get(pt.get('image_url'))
+            if image:
+                pt['image'] = image
+
+    def _image_parts(self, prompt_task, handler):
+        image_format = getattr(handler, 'image_format', None)
+        if not prompt_task.get('image') or not image_format:
+            return None
+        return [self.image_fetcher.encode(prompt_task['image'], image_format)]
+
+    async def _call_handler(self, handler_name: str, handler, request: BaseLLMRequest, task_name: str,
+                            timing: Dict[str, float]):
+        if not self.call_scheduler:
+            timing['start'] = time.perf_counter()
+            return await handler.invoke(request=request, task=task_name)
+        # Waits for one of the handler's slots, in priority order (see CallScheduler)
+        async with self.call_scheduler.slot(handler_name):
+            timing['start'] = time.perf_counter()
+            return await handler.invoke(request=request, task=task_name)
 
     def _get_task_format_map(self, prompts_per_family):
         format_map = {}
@@ -146,33 +1107,119 @@ class ItemEnricher:
                 format_map[p['task']] = p['output_format']
         return format_map
 
-    def _process_results(self, results, task_to_format):
-        from parsers.parser_factory import ParserFactory
-
+    async def _process_results(self, results, task_to_format, attributes_list=None):
         processed_results = {}
         for task, handler_responses in results.items():
             output_format = task_to_format.get(task, 'json')
-            task_results = {}
-            for handler_name, response in handler_responses.items():
-                parsed = self._process_single_response(handler_name, task, response, output_format, ParserFactory)
-                task_results[handler_name] = parsed
-            processed_results[task] = task_results
+            handler_names = list(handler_responses.keys())
+            parsed = await asyncio.gather(*(
+                self._process_single_response(handler_name, task, handler_responses[handler_name], output_format, attributes_list)
+                for handler_name in handler_names))
+            processed_results[task] = dict(zip(handler_names, parsed))
         return processed_results
 
-    def _process_single_response(self, handler_name, task, response, output_format, parser_factory):
+    async def _process_single_response(self, handler_name, task, response, output_format, attributes_list=None):
+        if response.get('skipped'):
+            return {'handler_name': handler_name, 'skipped': response['skipped']}
         if response.get('error'):
             return {'handler_name': handler_name, 'error': response['error']}
 
         response_content = response.get('response', '')
-        parser = parser_factory.get_parser(output_format)
 
         try:
-            parsed_response = parser.parse(response_content)
-            return {'handler_name': handler_name, 'response': parsed_response}
+            # Small responses parse inline; large ones go to the CPU executor so the loop stays responsive
+            parsed_response, repairs = await self.cpu_executor.run(
+                parse_response_with_repairs, output_format, response_content, attributes_list, size=len(response_content or ''))
         except Exception as e:
-            self.logger.error(f"Parsing failed for task '{task}', handler '{handler_name}': {e}", exc_info=True)
+            return self._parse_outcome(handler_name, task, False, str(e), [])
+        result = self._parse_outcome(handler_name, task, True, parsed_response, repairs)
+        return await self._validate_and_reask(task, handler_name, result, response)
+
+    async def _validate_and_reask(self, task, handler_name, result, response):
+        """
+        Validates a parsed result against the task's output schema. When only some fields are missing
+        or invalid, the same handler is asked once more for just those fields and the answer is merged
+        into the partial result, instead of discarding the whole response.
+        """
+        validator = self.task_manager.get_output_validator(task)
+        if not validator or 'response' not in result:
+            return result
+
+        parsed = result['response']
+        errors = validator(parsed)
+        if not errors:
+            return result
+
+        labels = {'handler': handler_name, 'task': task}
+        metrics.inc('schema_failures_total', labels)
+        fields = top_level_fields(errors)
+        handler = self.llm_manager.handlers.get(handler_name)
+        if '' in fields or not isinstance(parsed, dict) or not handler or not response.get('prompt'):
+            # The response as a whole does not fit the schema; there is nothing partial to keep
+            return {'handler_name': handler_name, 'error': 'Schema validation failed',
+                    'schema_errors': [f"{path or '(response)'}: {message}" for path, message in errors]}
+
+        schema = self.task_manager.get_task_config(task, 'generation').get('output_schema') or \
+            self.task_manager.get_task_config(task, 'evaluation').get('output_schema')
+        reask_prompt = self.prompt_manager.build_reask_prompt(response['prompt'], parsed, fields, errors, schema)
+        self.logger.info(f"Re-asking handler '{handler_name}' for fields {fields} of task '{task}'.")
+        metrics.inc('reask_total', labels)
+        _, _, reask_response = await self._invoke_single_llm(task, reask_prompt, handler_name, handler)
+
+        merged = dict(parsed)
+        if not reask_response.get('error'):
+            try:
+                patch, _ = parse_response_with_repairs('json', reask_response.get('response') or '')
+                if isinstance(patch, dict):
+                    merged.update({field: patch[field] for field in fields if field in patch})
+            except ValueError as e:
+                self.logger.warning(f"Re-ask response for task '{task}', handler '{handler_name}' did not parse: {e}")
+
+        remaining = validator(merged)
+        if remaining:
+            return {'handler_name': handler_name, 'error': 'Schema validation failed', 'partial_response': merged,
+                    'schema_errors': [f"{path or '(response)'}: {message}" for path, message in remaining]}
+
+        metrics.inc('reask_success_total', labels)
+        return {**result, 'response': merged, 'reasked_fields': fields}
+
+    def _parse_outcome(self, handler_name, task, ok, value, repairs):
+        """
+        Builds the per-handler result for a parse attempt and records parse success metrics.
+        """
+        labels = {'handler': handler_name, 'task': task}
+        metrics.inc('parse_attempts_total', labels)
+        if not ok:
+            self.logger.error(f"Parsing failed for task '{task}', handler '{handler_name}': {value}")
+            metrics.inc('parse_failures_total', labels)
             return {'handler_name': handler_name, 'error': 'Parsing failed'}
 
+        metrics.inc('parse_success_total', labels)
+        result = {'handler_name': handler_name, 'response': value}
+        if repairs:
+            metrics.inc('parse_repaired_total', labels)
+            result['repairs'] = repairs
+        return result
+
+    @staticmethod
+    def parse_success_rates():
+        """
+        Returns {handler_name: success rate} over all parse attempts so far.
+        """
+        attempts = metrics.counters_by_label('parse_attempts_total', 'handler')
+        successes = metrics.counters_by_label('parse_success_total', 'handler')
+        return {handler: successes.get(handler, 0) / total for handler, total in attempts.items() if total}
+
+    @staticmethod
+    def cascade_escalation_rates():
+        """
+        Returns {"<task>/<product type>": share of cascades that needed more than the cheapest tier}.
+        """
+        totals = metrics.counters_by_labels('cascade_total', ('task', 'product_type'))
+        escalated = metrics.counters_by_labels('cascade_escalated_total', ('task', 'product_type'))
+        return {f"{task}/{product_type}": escalated.get((task, product_type), 0) / total
+                for (task, product_type), total in totals.items() if total}
+
     def _apply_postprocess_hooks(self, results):
         # Retrieve hooks (both guardrail and custom) from a single table, for example:
         # post_process_hooks_config table:
@@ -0,0 +1,142 @@
+# entrypoint/item_packer.py
+import os
+import re
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+from entrypoint.prompt_manager import split_paragraphs
+
+# Matches the '### Item <n>' line that opens each item's answer in a packed response.
+ITEM_HEADER = re.compile(r"^[ \t]*#{2,3}[ \t]*Item[ \t]+(\d+)[ \t]*:?[ \t]*$", re.MULTILINE | re.IGNORECASE)
+
+
+class ItemPacker:
+    def __init__(self, context_tokens: Optional[int] = None, max_items: Optional[int] = None,
+                 max_task_tokens: Optional[int] = None, chars_per_token: int = 4):
+        """
+        Packs the prompts of several items (same task, product type and handler) into one prompt with
+        item-indexed '### Item n' sections, for short tasks whose fixed prompt overhead (styling guide,
+        instructions) dwarfs the item content.
+
+        Paragraphs shared by every prompt in a group are written once; each item keeps only its own
+        paragraphs. Pack size is bounded by the context window, the handler's output limit and the
+        task's max_tokens per item. Token counts are estimated from character counts.
+
+        Args:
+            context_tokens (int): Context window assumed for packed prompts. Defaults to PACK_CONTEXT_TOKENS or 8000.
+            max_items (int): Upper bound on items per pack. Defaults to PACK_MAX_ITEMS or 10.
+            max_task_tokens (int): Only tasks with max_tokens up to this are packed. Defaults to PACK_MAX_TASK_TOKENS or 200.
+            chars_per_token (int): Characters per token used for estimates.
+        """
+        self.context_tokens = context_tokens or int(os.getenv("PACK_CONTEXT_TOKENS", "8000"))
+        self.max_items = max_items or int(os.getenv("PACK_MAX_ITEMS", "10"))
+        self.max_task_tokens = max_task_tokens or int(os.getenv("PACK_MAX_TASK_TOKENS", "200"))
+        self.chars_per_token = chars_per_token
+        self.logger = logging.getLogger(__name__)
+
+    def estimate_tokens(self, text: str) -> int:
+        return len(text) // self.chars_per_token + 1
+
+    def is_packable(self, prompt_task: Dict[str, Any]) -> bool:
+        # Calls carrying an item image stay per item
+        return ((prompt_task.get('max_tokens') or 150) <= self.max_task_tokens and 'fused_tasks' not in prompt_task
+                and not prompt_task.get('image_url'))
+
+    def plan(self, items: List[Dict[str, Any]], prompts_tasks_per_item: List[List[Dict[str, Any]]],
+             output_limits: Dict[str, Optional[int]]) -> Tuple[List[Dict[str, Any]], List[List[Dict[str, Any]]]]:
+        """
+        Groups packable prompt tasks across items and builds the packed prompts.
+
+        Args:
+            items (List[Dict[str, Any]]): The batch items.
+            prompts_tasks_per_item (List[List[Dict[str, Any]]]): Prompt tasks (with provider_name) per item.
+            output_limits (Dict[str, Optional[int]]): Handler name -> max output tokens (None if unknown).
+
+        Returns:
+            Tuple[List[Dict[str, Any]], List[List[Dict[str, Any]]]]: The packed prompt tasks, each with
+            'members' [(item index, original prompt task)], and the prompt tasks left to run per item.
+        """
+        remaining = [[] for _ in items]
+        groups: Dict[Tuple[str, str, str], List[Tuple[int, Dict[str, Any]]]] = {}
+        for index, (item, prompts_tasks) in enumerate(zip(items, prompts_tasks_per_item)):
+            for pt in prompts_tasks:
+                if self.is_packable(pt):
+                    key = (pt['provider_name'], pt['task'], (item.get('product_type') or '').lower())
+                    groups.setdefault(key, []).append((index, pt))
+                else:
+                    remaining[index].append(pt)
+
+        packs = []
+        for (handler_name, _, _), members in groups.items():
+            chunks = self._chunk(members, output_limits.get(handler_name)) if len(members) > 1 else [members]
+            for chunk in chunks:
+                if len(chunk) == 1:
+                    index, pt = chunk[0]
+                    remaining[index].append(pt)
+                else:
+                    packs.append(self._build(chunk))
+        if packs:
+            self.logger.info(f"Packed {sum(len(p['members']) for p in packs)} prompts into {len(packs)} calls.")
+        return packs, remaining
+
+    def split(self, pack: Dict[str, Any], response: str) -> List[Optional[str]]:
+        """
+        Splits a packed response into one answer per member, in member order (None where an item's
+        section is missing or empty).
+        """
+        answers: Dict[int, str] = {}
+        headers = list(ITEM_HEADER.finditer(response or ''))
+        for position, header in enumerate(headers):
+            end = headers[position + 1].start() if position + 1 < len(headers) else len(response)
+            body = response[header.end():end].strip()
+            if body:
+                answers.setdefault(int(header.group(1)), body)
+        return [answers.get(number) for number in range(1, len(pack['members']) + 1)]
+
+    def _chunk(self, members, output_limit: Optional[int]) -> List[List[Tuple[int, Dict[str, Any]]]]:
+        shared, own = self._shared_paragraphs([pt['prompt'] for _, pt in members])
+        shared_tokens = self.estimate_tokens("\n\n".join(shared)) + 100  # plus the packing instructions
+        answer_tokens = members[0][1].get('max_tokens') or 150
+        max_items = self.max_items
+        if output_limit:
+            max_items = min(max_items, max(1, output_limit // answer_tokens))
+
+        chunks, current, used = [], [], shared_tokens
+        for member, paragraphs in zip(members, own):
+            cost = self.estimate_tokens("\n\n".join(paragraphs)) + answer_tokens
+            if current and (len(current) >= max_items or used + cost > self.context_tokens):
+                chunks.append(current)
+                current, used = [], shared_tokens
+            current.append(member)
+            used += cost
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def _build(self, members) -> Dict[str, Any]:
+        first = members[0][1]
+        shared, own = self._shared_paragraphs([pt['prompt'] for _, pt in members])
+        blocks = list(shared)
+        blocks.append(f'Apply the instructions above to each of the {len(members)} items below. '
+                      f'Each item\'s details are in its own "### Item n" section.')
+        for number, paragraphs in enumerate(own, 1):
+            blocks.append(f"### Item {number}")
+            blocks.extend(paragraphs)
+        blocks.append('Answer for every item, in order. Start each answer with a line "### Item n" matching the '
+                      'item number, followed by the answer in exactly the format requested for a single item.')
+        answer_tokens = first.get('max_tokens') or 150
+        return {
+            'task': first['task'],
+            'provider_name': first['provider_name'],
+            'prompt': "\n\n".join(blocks),
+            'output_format': first.get('output_format', 'json'),
+            'max_tokens': answer_tokens * len(members),
+            'members': members,
+        }
+
+    @staticmethod
+    def _shared_paragraphs(prompts: List[str]) -> Tuple[List[str], List[List[str]]]:
+        paragraphs = [split_paragraphs(prompt) for prompt in prompts]
+        common = set(paragraphs[0]).intersection(*paragraphs[1:])
+        shared = [p for p in dict.fromkeys(paragraphs[0]) if p in common]
+        own = [[p for p in task_paragraphs if p not in common] for task_paragraphs in paragraphs]
+        return shared, own
@@ -0,0 +1,163 @@
+# entrypoint/job_worker.py
+import os
+import uuid
+import socket
+import signal
+import asyncio
+import logging
+import argparse
+from typing import Any, Dict, Optional
+import requests
+from entrypoint.call_scheduler import current_call_class
+from models.database import run_in_session
+from utils.metrics import metrics
+
+
+class JobWorker:
+    def __init__(self, job_repository, item_enricher, response_formatter, worker_id: Optional[str] = None,
+                 lease_seconds: Optional[float] = None, poll_interval: Optional[float] = None,
+                 callback_timeout: Optional[float] = None):
+        """
+        Runs enrichment jobs from the durable job queue.
+
+        The worker leases one job at a time, extends the lease while the job runs and records the
+        outcome. If the worker dies mid-job the lease expires and another worker picks the job up;
+        failed attempts are retried until the job's max_attempts is reached. Finished jobs are
+        POSTed to their callback_url when one was given.
+
+        Args:
+            job_repository (JobRepository): The job queue.
+            item_enricher (ItemEnricher): Runs the enrichment.
+            response_formatter: Formats each item's results, as the synchronous endpoints do.
+            worker_id (str, optional): Lease owner id. Defaults to <hostname>-<pid>-<random>.
+            lease_seconds (float): Visibility timeout of a leased job. Defaults to JOB_LEASE_SECONDS or 120.
+            poll_interval (float): Sleep between polls of an empty queue. Defaults to JOB_POLL_INTERVAL or 1.
+            callback_timeout (float): Timeout of completion callbacks. Defaults to JOB_CALLBACK_TIMEOUT or 10.
+        """
+        self.job_repository = job_repository
+        self.item_enricher = item_enricher
+        self.response_formatter = response_formatter
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.lease_seconds = lease_seconds or float(os.getenv("JOB_LEASE_SECONDS", "120"))
+        self.poll_interval = poll_interval or float(os.getenv("JOB_POLL_INTERVAL", "1"))
+        self.callback_timeout = callback_timeout or float(os.getenv("JOB_CALLBACK_TIMEOUT", "10"))
+        self.logger = logging.getLogger(__name__)
+
+    async def run(self, stop_event: asyncio.Event) -> None:
+        """
+        Processes jobs until stop_event is set. The job in progress is finished first.
+        """
+        self.logger.info(f"Job worker {self.worker_id} started.")
+        while not stop_event.is_set():
+            try:
+                processed = await self.process_next()
+            except Exception as e:
+                # Queue unavailable (e.g. database locked or restarting); back off and retry
+                self.logger.error(f"Job worker {self.worker_id} failed to poll the queue: {e}")
+                processed = False
+            if not processed:
+                try:
+                    await asyncio.wait_for(stop_event.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        self.logger.info(f"Job worker {self.worker_id} stopped.")
+
+    async def process_next(self) -> bool:
+        """
+        Leases and runs a single job.
+
+        Returns:
+            bool: True if a job was processed, False if the queue was empty.
+        """
+        job = await run_in_session(self.job_repository.lease, self.worker_id, self.lease_seconds)
+        if job is None:
+            return False
+        job_id = job['job_id']
+        self.logger.info(f"Job {job_id} leased by {self.worker_id} (attempt {job['attempts']}/{job['max_attempts']}).")
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            result = await self._run_job(job['payload'])
+        except Exception as e:
+            heartbeat.cancel()
+            self.logger.error(f"Job {job_id} failed: {e}")
+            status = await run_in_session(self.job_repository.fail, job_id, self.worker_id, str(e))
+            metrics.inc('jobs_failed_total', {'status': status or 'lease_lost'})
+            if status == 'failed':
+                await self._notify(job, {'job_id': job_id, 'status': 'failed', 'error': str(e)})
+            return True
+        heartbeat.cancel()
+        if await run_in_session(self.job_repository.complete, job_id, self.worker_id, result):
+            metrics.inc('jobs_completed_total')
+            await self._notify(job, {'job_id': job_id, 'status': 'succeeded', 'result': result})
+        else:
+            # The lease expired and another worker took the job over; its outcome wins
+            self.logger.warning(f"Job {job_id} finished by {self.worker_id} after losing its lease; result discarded.")
+            metrics.inc('jobs_failed_total', {'status': 'lease_lost'})
+        return True
+
+    async def _run_job(self, payload: Dict[str, Any]) -> Any:
+        options = payload.get('options') or {}
+        # Jobs are scheduled like the request that queued them (bulk unless it asked otherwise)
+        current_call_class.set((options.get('priority') or 'bulk', options.get('caller_id', 'anonymous')))
+        items, task_type = payload['items'], payload['task_type']
+        if payload.get('batch'):
+            results = await self.item_enricher.enrich_items(items, task_type, options)
+            return [self.response_formatter.format(item_results) for item_results in results]
+        results = await self.item_enricher.enrich_item(items[0], task_type, options)
+        return self.response_formatter.format(results)
+
+    async def _heartbeat(self, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                if not await run_in_session(self.job_repository.heartbeat, job_id, self.worker_id, self.lease_seconds):
+                    self.logger.warning(f"Worker {self.worker_id} lost the lease on job {job_id}.")
+                    return
+            except Exception as e:
+                self.logger.error(f"Heartbeat for job {job_id} failed: {e}")
+
+    async def _notify(self, job: Dict[str, Any], body: Dict[str, Any]) -> None:
+        if not job.get('callback_url'):
+            return
+        try:
+            response = await asyncio.to_thread(requests.post, job['callback_url'], json=body,
+                                               timeout=self.callback_timeout)
+            response.raise_for_status()
+            metrics.inc('job_callbacks_total', {'status': 'ok'})
+        except Exception as e:
+            # The result stays available through GET /jobs/{id}
+            self.logger.error(f"Callback for job {job['job_id']} to {job['callback_url']} failed: {e}")
+            metrics.inc('job_callbacks_total', {'status': 'error'})
+
+
+async def _serve(concurrency: int) -> None:
+    from app_factory import build_components
+
+    components = build_components()
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    result_writer = components['result_writer']
+    if result_writer:
+        result_writer.start()
+    workers = [JobWorker(components['job_repo'], components['item_enricher'], components['response_formatter'])
+               for _ in range(concurrency)]
+    try:
+        await asyncio.gather(*(worker.run(stop_event) for worker in workers))
+    finally:
+        if result_writer:
+            await result_writer.stop()
+        components['cpu_executor'].shutdown()
+        if components['segment_store']:
+            components['segment_store'].close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs enrichment jobs from the durable job queue.")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("JOB_WORKER_CONCURRENCY", "4")),
+                        help="Jobs processed concurrently by this process.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_serve(args.concurrency))
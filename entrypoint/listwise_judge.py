@@ -0,0 +1,116 @@
+# entrypoint/listwise_judge.py
+import re
+import random
+import logging
+from typing import Any, Dict, List, Optional
+
+# 'pointwise': one evaluation call per generated output; 'listwise': one call judges all outputs of a task
+EVALUATION_MODES = ('pointwise', 'listwise')
+
+# Rendered in place of the generated output; the candidates are listed after the evaluation instructions
+CANDIDATE_MARKER = "[[CANDIDATE OUTPUT]]"
+_CANDIDATE_KEY = re.compile(r"(\d+)")
+
+
+def metric_names(expected_metrics: Any) -> List[str]:
+    """
+    Names of the metrics an evaluation task expects (expected_metrics is a list of names, or a dict
+    of name -> {'max': scale}).
+    """
+    if isinstance(expected_metrics, dict):
+        return list(expected_metrics)
+    if isinstance(expected_metrics, list):
+        return [m for m in expected_metrics if isinstance(m, str)]
+    return []
+
+
+class ListwiseJudge:
+    def __init__(self, seed: Optional[int] = None):
+        """
+        Builds listwise judge prompts: all candidate outputs of a generation task in one evaluation
+        prompt, with per-candidate scores parsed back out.
+
+        The evaluation template is rendered once with CANDIDATE_MARKER as its generated output, so the
+        item, styling guide and rubric are sent once instead of once per candidate. Candidates are
+        numbered in a shuffled order to reduce position bias.
+
+        Args:
+            seed (int, optional): Seed of the shuffling (for reproducible orders, e.g. in tests).
+        """
+        self.random = random.Random(seed)
+        self.logger = logging.getLogger(__name__)
+
+    def order(self, candidates: List[Any]) -> List[Any]:
+        """
+        Returns the candidates in a random order.
+        """
+        ordered = list(candidates)
+        self.random.shuffle(ordered)
+        return ordered
+
+    def build(self, prompt_task: Dict[str, Any], outputs: List[str], expected_metrics: Any = None) -> Optional[Dict[str, Any]]:
+        """
+        Builds the judge prompt task from an evaluation prompt task rendered with CANDIDATE_MARKER.
+
+        Args:
+            prompt_task (Dict[str, Any]): Evaluation prompt task (with provider_name).
+            outputs (List[str]): Candidate outputs, in the order they are to be numbered.
+            expected_metrics: The evaluation task's expected_metrics, named in the answer instructions.
+
+        Returns:
+            Optional[Dict[str, Any]]: A copy of prompt_task with the listwise prompt, max_tokens scaled
+            by the number of candidates and 'candidates' set, or None if the template does not show
+            the generated output as is (it cannot be judged listwise then).
+        """
+        prompt = prompt_task['prompt']
+        if CANDIDATE_MARKER not in prompt:
+            return None
+        count = len(outputs)
+        blocks = [prompt.replace(CANDIDATE_MARKER, "(one of the candidates listed below)"),
+                  f"Evaluate each of the {count} candidates below on its own, by the instructions above. "
+                  f"The candidates are listed in no particular order."]
+        for number, output in enumerate(outputs, 1):
+            blocks.append(f"### Candidate {number}")
+            blocks.append(output)
+        names = metric_names(expected_metrics)
+        instructions = (f'Return a single JSON object with one key per candidate number ("1" to "{count}"). The value '
+                        f'for each candidate is the evaluation you would give that candidate alone, as a JSON object')
+        if names:
+            instructions += f" with the fields {', '.join(names)}"
+        blocks.append(instructions + ".")
+
+        judge_task = dict(prompt_task)
+        judge_task['prompt'] = "\n\n".join(blocks)
+        judge_task['max_tokens'] = (prompt_task.get('max_tokens') or 150) * count
+        judge_task['candidates'] = count
+        return judge_task
+
+    def split(self, judgement: Any, count: int) -> List[Optional[Dict[str, Any]]]:
+        """
+        Splits a parsed listwise judgement into one evaluation per candidate number, in number order
+        (None where a candidate is missing).
+
+        Accepts an object keyed by candidate number ("1", "Candidate 1", ...), optionally wrapped in
+        a "candidates" key, or a list of evaluations either carrying a "candidate" number or in order.
+        """
+        if isinstance(judgement, dict) and isinstance(judgement.get('candidates'), (dict, list)):
+            judgement = judgement['candidates']
+        evaluations: Dict[int, Dict[str, Any]] = {}
+        if isinstance(judgement, dict):
+            for key, value in judgement.items():
+                match = _CANDIDATE_KEY.search(str(key))
+                if match and isinstance(value, dict):
+                    evaluations.setdefault(int(match.group(1)), value)
+        elif isinstance(judgement, list):
+            for position, value in enumerate(judgement, 1):
+                if not isinstance(value, dict):
+                    continue
+                number = value.get('candidate')
+                if isinstance(number, str) and _CANDIDATE_KEY.search(number):
+                    number = int(_CANDIDATE_KEY.search(number).group(1))
+                if isinstance(number, int) and not isinstance(number, bool):
+                    value = {k: v for k, v in value.items() if k != 'candidate'}
+                else:
+                    number = position
+                evaluations.setdefault(number, value)
+        return [evaluations.get(number) for number in range(1, count + 1)]
@@ -1,7 +1,58 @@
 # entrypoint/llm_manager.py
 import logging
+from collections.abc import Mapping
 from sqlalchemy.orm import Session
 from models.models import ProviderConfig, GenerationTask, EvaluationTask
+from utils.metrics import metrics
+
+# Marks a handler whose construction failed, so it is not retried on every lookup
+_FAILED = object()
+
+
+class LazyHandlerMap(Mapping):
+    """
+    Handler name -> BaseModelHandler, constructed on first lookup.
+
+    Iterating, len() and ``in`` only look at the configured names, so nothing is built until a
+    handler is actually called. A handler whose construction fails (e.g. missing credentials) is
+    logged once and treated as missing, like a name that is not configured, until reset().
+    """
+
+    def __init__(self, configs):
+        self.configs = configs
+        self._built = {}
+        self.logger = logging.getLogger(__name__)
+
+    def __getitem__(self, name):
+        handler = self._built.get(name)
+        if handler is _FAILED:
+            raise KeyError(name)
+        if handler is None:
+            provider_kwargs = self.configs[name]
+            from handlers.llm_handler import BaseModelHandler
+            try:
+                handler = BaseModelHandler(**provider_kwargs)
+            except Exception as e:
+                self.logger.error(f"Failed to initialize handler '{name}': {e}")
+                metrics.inc('handler_init_failures_total', {'handler': name})
+                self._built[name] = _FAILED
+                raise KeyError(name) from e
+            self._built[name] = handler
+            self.logger.debug(f"Initialized handler '{name}'.")
+        return handler
+
+    def __iter__(self):
+        return iter(self.configs)
+
+    def __len__(self):
+        return len(self.configs)
+
+    def __contains__(self, name):
+        return name in self.configs
+
+    def reset(self):
+        self._built.clear()
+
 
 class LLMManager:
     def __init__(self, db_session: Session):
@@ -9,16 +60,23 @@ class LLMManager:
         LLMManager initializes and stores providers (handlers) and tasks config.
         """
         self.db_session = db_session
-        self.handlers = {}
+        # handler name -> constructor kwargs; handlers are built from them on first use
+        self.handler_configs = {}
+        self.handlers = LazyHandlerMap(self.handler_configs)
         self.family_names = {}
+        # handler name -> ProviderConfig.cost_tier (None when not set)
+        self.cost_tiers = {}
         self.tasks = {}
+        # generation task name -> provider names from generation_task_providers (only active providers)
+        self.task_providers = {}
+        # Optional ProviderRouter used for profile-based (top-k) handler selection
+        self.router = None
         self.logger = logging.getLogger(__name__)
         self._load_providers()
         self._load_tasks()
 
     def _load_providers(self):
         providers = self.db_session.query(ProviderConfig).filter_by(is_active=True).all()
-        from handlers.llm_handler import BaseModelHandler
         for provider in providers:
             name = provider.name
             family_name = provider.family
@@ -30,9 +88,10 @@ class LLMManager:
                 'api_base'   : provider.api_base,
                 'version'    : provider.version,
             }
-            self.handlers[name] = BaseModelHandler(**provider_kwargs)
+            self.handler_configs[name] = provider_kwargs
             self.family_names[name] = family_name
-            self.logger.debug(f"Initialized handler '{name}' for family '{family_name}'.")
+            self.cost_tiers[name] = provider.cost_tier
+            self.logger.debug(f"Registered handler '{name}' for family '{family_name}'.")
 
     def _load_tasks(self):
         generation_tasks = self.db_session.query(GenerationTask).all()
@@ -42,6 +101,9 @@ class LLMManager:
                 'max_tokens': t.max_tokens,
                 'output_format': t.output_format
             }
+            providers = [p.name for p in t.providers if p.name in self.handlers]
+            if providers:
+                self.task_providers[t.task_name] = providers
 
         evaluation_tasks = self.db_session.query(EvaluationTask).all()
         for t in evaluation_tasks:
@@ -53,8 +115,51 @@ class LLMManager:
 
         self.logger.info(f"Loaded {len(self.tasks)} tasks into LLMManager.")
 
+    def preload(self):
+        """
+        Builds every handler now instead of on first use (imports their provider SDKs and validates
+        their configuration at startup).
+        """
+        built = [name for name in self.handlers if self.handlers.get(name) is not None]
+        self.logger.info(f"Preloaded {len(built)}/{len(self.handlers)} handlers.")
+
+    def reset_connections(self):
+        """
+        Drops built handlers so provider clients open fresh HTTP connection pools when next used.
+        Called in forked workers, which must not share the parent's sockets.
+        """
+        self.handlers.reset()
+
+    def get_max_tokens(self, handler_name: str):
+        return (self.handler_configs.get(handler_name) or {}).get('max_tokens')
+
     def get_task_config(self, task_name: str, task_type: str):
         return self.tasks.get((task_name, task_type), {})
 
+    def get_task_handlers(self, task_name: str, task_type: str):
+        """
+        Returns the handler names that should serve a task: the providers mapped to it in
+        generation_task_providers, or every active handler when no mapping exists.
+        """
+        if task_type == 'generation' and task_name in self.task_providers:
+            return list(self.task_providers[task_name])
+        return list(self.handlers)
+
+    def select_handlers(self, task_name: str, task_type: str, handler_names, profile: str = None, top_k: int = None):
+        """
+        Narrows the candidate handlers for a task to the top-k under a routing profile
+        ('fast', 'balanced', 'quality'). Without a profile or router, all candidates are kept.
+        """
+        if not profile or not self.router or len(handler_names) <= 1:
+            return list(handler_names)
+        return self.router.select(task_name, list(handler_names), profile, top_k)
+
+    def record_call(self, handler_name: str, latency_ms: float, ok: bool):
+        if self.router:
+            self.router.record_call(handler_name, latency_ms, ok)
+
+    def get_cost_tier(self, handler_name: str):
+        return self.cost_tiers.get(handler_name)
+
     def get_family_name(self, handler_name: str):
         return self.family_names.get(handler_name, 'default')
@@ -1,26 +1,82 @@
 # entrypoint/prompt_manager.py
+import os
+import re
+import json
+import hashlib
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
+from repositories.template_repository import render_template, template_variables
+from utils.lru_cache import LRUCache, MISSING
+from utils.metrics import metrics
+from utils.text_normalizer import normalize_text
+from utils.token_estimator import token_estimator
+
+# Task name prefix of a composite call built by PromptManager.fuse_prompts
+FUSED_TASK_PREFIX = 'fused:'
+
+# Template fields shortened when a prompt exceeds its token budget, least important first.
+# Fields not listed (title, product type, upstream output of evaluations) are never shortened.
+TRUNCATION_PRIORITY = ['original_long_description', 'attributes_list', 'styling_guide', 'original_short_description']
+# A shortened field keeps at least this many tokens
+MIN_FIELD_TOKENS = 32
+# Item fields compacted (markup, whitespace, repeated sentences) before they reach a template
+NORMALIZED_ITEM_FIELDS = ('item_title', 'short_description', 'long_description')
+# Item field -> template context key it is rendered as (see _prepare_context)
+ITEM_CONTEXT_FIELDS = {
+    'item_title': 'original_title',
+    'short_description': 'original_short_description',
+    'long_description': 'original_long_description',
+}
+
+
+def split_paragraphs(prompt: str) -> List[str]:
+    """
+    Splits a rendered prompt into its blank-line separated paragraphs (stripped, empty ones dropped).
+    """
+    return [p.strip() for p in re.split(r"\n\s*\n", prompt) if p.strip()]
 
 class PromptManager:
-    def __init__(self, styling_guide_repo, template_repo, task_manager):
+    def __init__(self, styling_guide_manager, template_repo, task_manager, cpu_executor=None):
         """
         Manages prompt generation logic.
 
         Args:
-            styling_guide_repo: Repository for fetching styling guides.
+            styling_guide_manager: StylingGuideManager resolving styling guides from its in-memory cache.
             template_repo: Repository for fetching templates.
             task_manager: Manages task configuration.
+            cpu_executor: Optional CPUExecutor used to render large templates off the calling thread.
+
+        Each rendered prompt must fit the model family's context window (PROMPT_CONTEXT_TOKENS, or
+        the family's entry in the PROMPT_CONTEXT_TOKENS_BY_FAMILY JSON object) less the task's
+        max_tokens. The template's static token cost is measured once per template text; the
+        variable fields share what is left and are truncated in TRUNCATION_PRIORITY order.
+
+        Unless PROMPT_NORMALIZATION is false, item text and styling guides are compacted first (see
+        utils.text_normalizer); normalized item text is memoized in an LRU cache of
+        NORMALIZED_TEXT_CACHE_SIZE entries.
         """
-        self.styling_guide_repo = styling_guide_repo
+        self.styling_guide_manager = styling_guide_manager
         self.template_repo = template_repo
         self.task_manager = task_manager
+        self.cpu_executor = cpu_executor
+        self.token_estimator = token_estimator
+        self.context_tokens = int(os.getenv("PROMPT_CONTEXT_TOKENS", "8000"))
+        self.family_context_tokens = {k.lower(): int(v) for k, v in
+                                      json.loads(os.getenv("PROMPT_CONTEXT_TOKENS_BY_FAMILY", "{}")).items()}
+        # (template hash, family) -> tokens of the template rendered without any variables
+        self._static_costs: Dict[Tuple[str, str], int] = {}
+        self.normalize = os.getenv("PROMPT_NORMALIZATION", "true").lower() == "true"
+        # Tasks whose calls carry the item image (prefetched by ItemEnricher)
+        self.image_tasks = {t.strip() for t in os.getenv("IMAGE_TASKS", "vision_attribute_extraction").split(',') if t.strip()}
+        self._normalized_text = LRUCache(maxsize=int(os.getenv("NORMALIZED_TEXT_CACHE_SIZE", "4096")))
         self.logger = logging.getLogger(__name__)
 
     def generate_prompts(self, item: Dict[str,Any], family_name: Optional[str], task_type: str) -> List[Dict[str,Any]]:
         product_type = item.get('product_type','unknown').lower()
         self.logger.info(f"Generating prompts for product_type='{product_type}', task_type='{task_type}'")
 
+        item, saved = self._normalize_item(item)
+
         prompts_tasks = []
         default_tasks = self.task_manager.get_default_tasks(task_type)
         self.logger.debug(f"Default tasks: {default_tasks}")
@@ -31,9 +87,33 @@ class PromptManager:
             if cond_key and item.get(cond_key):
                 self._handle_tasks(family_name, item, product_type, prompts_tasks, [t_name], task_type, True)
 
+        self._record_normalization(saved, len(prompts_tasks))
+        return prompts_tasks
+
+    def generate_dependent_prompts(self, item: Dict[str,Any], family_name: Optional[str], task_type: str,
+                                   task_names: List[str], extra_context: Dict[str,Any]) -> List[Dict[str,Any]]:
+        """
+        Generates prompts for an explicit list of tasks whose templates also see the output of an
+        upstream task (e.g. evaluation tasks judging a generated title).
+
+        Args:
+            item (Dict[str,Any]): Item details.
+            family_name (Optional[str]): Model family the templates are rendered for.
+            task_type (str): Type of the tasks in task_names.
+            task_names (List[str]): Tasks to render.
+            extra_context (Dict[str,Any]): Additional template variables, e.g. 'generated_output'.
+
+        Returns:
+            List[Dict[str,Any]]: Prompt dicts, as from generate_prompts.
+        """
+        product_type = item.get('product_type','unknown').lower()
+        item, saved = self._normalize_item(item)
+        prompts_tasks = []
+        self._handle_tasks(family_name, item, product_type, prompts_tasks, task_names, task_type, False, extra_context)
+        self._record_normalization(saved, len(prompts_tasks))
         return prompts_tasks
 
-    def _handle_tasks(self, family_name, item, product_type, prompts_tasks, tasks, task_type, is_conditional):
+    def _handle_tasks(self, family_name, item, product_type, prompts_tasks, tasks, task_type, is_conditional, extra_context=None):
         for task_name in tasks:
             if not self.task_manager.is_task_defined(task_name, task_type):
                 self.logger.warning(f"Task '{task_name}' not defined.")
@@ -43,28 +123,102 @@ class PromptManager:
             output_format = task_config.get('output_format','json')
             max_tokens = task_config.get('max_tokens',150)
 
-            styling_guide = self.styling_guide_repo.get_styling_guide(product_type, task_name)
+            try:
+                if self.normalize:
+                    styling_guide = self.styling_guide_manager.get_normalized_styling_guide(product_type, task_name)
+                else:
+                    styling_guide = self.styling_guide_manager.get_styling_guide(product_type, task_name)
+            except ValueError:
+                styling_guide = None
             if not styling_guide:
                 self.logger.warning(f"No styling guide for '{product_type}', '{task_name}'. Skipping.")
                 continue
 
             context = self._prepare_context(item, product_type, styling_guide)
-            template_content = self.template_repo.get_template_text(task_name, task_type, family_name)
-            if not template_content:
+            if extra_context:
+                context.update(extra_context)
+            template = self.template_repo.get_template(task_name, task_type, family_name)
+            if not template or not template.get('text'):
                 self.logger.error(f"No template for task='{task_name}', family='{family_name}', type='{task_type}'.")
                 continue
+            template_content = template['text']
 
-            prompt = self.template_repo.render_template(template_content, context)
+            budget = self._input_budget(template_content, family_name, max_tokens)
+            context, truncated_fields = self._fit_context(context, budget, family_name, task_name)
+
+            prompt = self._render(template_content, context)
             if not prompt:
                 self.logger.error(f"Failed to render template for task='{task_name}'.")
                 continue
 
-            prompts_tasks.append({
+            prompt_task = {
                 'task': task_name,
                 'prompt': prompt,
                 'output_format': output_format,
-                'max_tokens': max_tokens
-            })
+                'max_tokens': max_tokens,
+                'product_type': product_type
+            }
+            if truncated_fields:
+                prompt_task['truncated_fields'] = truncated_fields
+            if task_name in self.image_tasks and item.get('image_url'):
+                prompt_task['image_url'] = item['image_url']
+            prompt_task['input_fingerprint'] = self._input_fingerprint(
+                template, context, family_name, product_type, task_name, prompt_task)
+            prompts_tasks.append(prompt_task)
+
+    def _input_fingerprint(self, template: Dict[str, Any], context: Dict[str, Any], family_name: Optional[str],
+                           product_type: str, task_name: str, prompt_task: Dict[str, Any]) -> str:
+        """
+        Hash of everything a task's output depends on: the context fields its template renders
+        (the variables found in its text, plus its recorded placeholders mapped to context keys),
+        the template and styling guide versions, and the task's output settings. Fields the
+        template does not read, such as price, do not affect it.
+        """
+        fields = set(template_variables(template['text']))
+        placeholders = template.get('placeholders')
+        if isinstance(placeholders, (dict, list)):
+            fields.update(ITEM_CONTEXT_FIELDS.get(p, p) for p in placeholders if isinstance(p, str))
+        inputs = {
+            'fields': {name: context.get(name) for name in sorted(fields)},
+            'image_url': prompt_task.get('image_url'),
+            'template_version': template.get('version'),
+            'styling_guide_version': self.styling_guide_manager.get_styling_guide_version(product_type, task_name),
+            'family': family_name,
+            'output_format': prompt_task['output_format'],
+            'max_tokens': prompt_task['max_tokens'],
+        }
+        return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def _normalize_item(self, item: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        """
+        Compacts the item's text fields.
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, int]]: A normalized copy of the item (the item itself when
+            normalization is off) and the approximate input tokens saved per field.
+        """
+        if not self.normalize:
+            return item, {}
+        item = dict(item)
+        saved = {}
+        for field in NORMALIZED_ITEM_FIELDS:
+            text = item.get(field)
+            if not isinstance(text, str) or not text:
+                continue
+            normalized = self._normalized_text.get(text)
+            if normalized is MISSING:
+                normalized = normalize_text(text)
+                self._normalized_text.put(text, normalized)
+            item[field] = normalized
+            saved[field] = self.token_estimator.approximate(text) - self.token_estimator.approximate(normalized)
+        return item, saved
+
+    @staticmethod
+    def _record_normalization(saved: Dict[str, int], prompts: int) -> None:
+        # Each rendered prompt carries the item text, so savings scale with the number of prompts
+        for field, tokens in saved.items():
+            if tokens and prompts:
+                metrics.inc('normalization_tokens_saved_total', {'field': field}, tokens * prompts)
 
     def _prepare_context(self, item, product_type, styling_guide):
         context = {
@@ -78,3 +232,158 @@ class PromptManager:
             'output_format': 'json'
         }
         return {k:v for k,v in context.items() if v}
+
+    def _input_budget(self, template_content: str, family_name: Optional[str], max_tokens: int) -> int:
+        """
+        Tokens available to a template's variable fields: the family's context window less the
+        completion allowance and the template's own static text.
+        """
+        family = (family_name or '').lower()
+        key = (hashlib.sha1(template_content.encode('utf-8')).hexdigest(), family)
+        static_cost = self._static_costs.get(key)
+        if static_cost is None:
+            static_text = self.template_repo.render_template(template_content, {}) or template_content
+            static_cost = self._static_costs[key] = self.token_estimator.count(static_text, family_name)
+        window = self.family_context_tokens.get(family, self.context_tokens)
+        return window - (max_tokens or 150) - static_cost
+
+    def _fit_context(self, context: Dict[str, Any], budget: int, family_name: Optional[str],
+                     task_name: str) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Truncates variable fields, lowest priority first, until their tokens fit the budget.
+
+        Returns:
+            Tuple[Dict[str, Any], List[str]]: The (possibly shortened) context and the truncated field names.
+        """
+        sizes = {name: self._field_tokens(value, family_name) for name, value in context.items()}
+        overflow = sum(sizes.values()) - budget
+        if overflow <= 0:
+            return context, []
+
+        context = dict(context)
+        truncated = []
+        for name in TRUNCATION_PRIORITY:
+            if overflow <= 0:
+                break
+            if name not in context or sizes[name] <= MIN_FIELD_TOKENS:
+                continue
+            keep = max(MIN_FIELD_TOKENS, sizes[name] - overflow)
+            context[name] = self._truncate_field(context[name], keep, family_name)
+            new_size = self._field_tokens(context[name], family_name)
+            overflow -= sizes[name] - new_size
+            truncated.append(name)
+            metrics.inc('prompt_truncations_total', {'task': task_name, 'field': name})
+        if overflow > 0:
+            self.logger.warning(f"Prompt for task '{task_name}' exceeds its input budget by ~{overflow} tokens "
+                                f"after truncation.")
+        if truncated:
+            self.logger.info(f"Truncated {truncated} to fit task '{task_name}' into {budget} input tokens.")
+        return context, truncated
+
+    def _field_tokens(self, value: Any, family_name: Optional[str]) -> int:
+        if isinstance(value, str):
+            return self.token_estimator.count(value, family_name)
+        return self.token_estimator.count(json.dumps(value, ensure_ascii=False, default=str), family_name)
+
+    def _truncate_field(self, value: Any, max_tokens: int, family_name: Optional[str]) -> Any:
+        if isinstance(value, str):
+            return self.token_estimator.truncate(value, max_tokens, family_name)
+        if isinstance(value, list):
+            # Keep whole entries (e.g. attributes) from the front
+            kept, used = [], 0
+            for entry in value:
+                used += self._field_tokens(entry, family_name) + 1
+                if used > max_tokens:
+                    break
+                kept.append(entry)
+            return kept
+        return value
+
+    def _render(self, template_content: str, context: Dict[str, Any]) -> Optional[str]:
+        if not self.cpu_executor:
+            return self.template_repo.render_template(template_content, context)
+        size = len(template_content) + sum(len(v) for v in context.values() if isinstance(v, str))
+        return self.cpu_executor.run_sync(render_template, template_content, context, size=size)
+
+    def fuse_prompts(self, prompts_tasks: List[Dict[str, Any]], sections: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Merges several rendered Markdown task prompts for the same item into one composite prompt.
+
+        Paragraphs that appear in more than one task prompt (item text, product context, shared
+        instructions) are written once in a shared block; each task keeps only its own paragraphs
+        and is told which '### <header>' section to answer under, so the response can be split back
+        per task with the section parser.
+
+        Args:
+            prompts_tasks (List[Dict[str, Any]]): Prompt dicts (as from generate_prompts) to fuse.
+            sections (Dict[str, Any]): Task name -> (section header, field label).
+
+        Returns:
+            Dict[str, Any]: A prompt dict for the composite call, with 'fused_tasks' listing the task names.
+        """
+        paragraphs = [split_paragraphs(pt['prompt']) for pt in prompts_tasks]
+        seen_in = {}
+        for index, task_paragraphs in enumerate(paragraphs):
+            for paragraph in task_paragraphs:
+                seen_in.setdefault(paragraph, set()).add(index)
+        shared = [p for p in dict.fromkeys(p for task_paragraphs in paragraphs for p in task_paragraphs)
+                  if len(seen_in[p]) > 1]
+        shared_set = set(shared)
+
+        blocks = [f"You will complete {len(prompts_tasks)} tasks for the same item."]
+        if shared:
+            blocks += ["Context shared by all tasks:", "\n\n".join(shared)]
+        for number, (pt, task_paragraphs) in enumerate(zip(prompts_tasks, paragraphs), 1):
+            header, label = sections[pt['task']]
+            own = [p for p in task_paragraphs if p not in shared_set]
+            blocks.append(f"## Task {number}: {header}")
+            if own:
+                blocks.append("\n\n".join(own))
+            blocks.append(f'Answer this task under the heading "### {header}", starting with "**{label}**:".')
+        blocks.append("Answer every task, each in its own ### section, in the order given.")
+
+        fused_tasks = [pt['task'] for pt in prompts_tasks]
+        return {
+            'task': FUSED_TASK_PREFIX + '+'.join(fused_tasks),
+            'prompt': "\n\n".join(blocks),
+            'output_format': 'markdown',
+            'max_tokens': sum(pt.get('max_tokens') or 150 for pt in prompts_tasks),
+            'fused_tasks': fused_tasks,
+        }
+
+    def build_reask_prompt(self, original_prompt: str, partial_response: Dict[str, Any],
+                           fields: List[str], errors: List[Any], output_schema: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Builds a follow-up prompt asking only for the fields that were missing or invalid.
+        The original prompt is kept for grounding, but the model only has to produce the listed
+        fields, so the (more expensive, latency-dominating) output is a fraction of a full re-run.
+
+        Args:
+            original_prompt (str): The prompt that produced the partial response.
+            partial_response (Dict[str, Any]): The parsed response with the valid fields.
+            fields (List[str]): Top-level fields to ask for again.
+            errors (List[Any]): (path, message) validation errors for those fields.
+            output_schema (Dict[str, Any], optional): The task schema; the relevant properties are included.
+
+        Returns:
+            str: The follow-up prompt.
+        """
+        problems = "\n".join(f"- {path or '(response)'}: {message}" for path, message in errors)
+        field_schemas = {}
+        if output_schema:
+            properties = output_schema.get('properties', {})
+            field_schemas = {f: properties[f] for f in fields if f in properties}
+        kept = {k: v for k, v in partial_response.items() if k not in fields}
+
+        sections = [
+            original_prompt,
+            "---",
+            "Your previous answer was incomplete. These fields are already accepted and must not be repeated:",
+            json.dumps(kept, ensure_ascii=False),
+            "These fields were missing or invalid:",
+            problems,
+        ]
+        if field_schemas:
+            sections += ["They must satisfy this JSON schema:", json.dumps(field_schemas, ensure_ascii=False)]
+        sections.append(f"Respond with only a JSON object containing exactly these keys: {json.dumps(fields)}.")
+        return "\n".join(sections)
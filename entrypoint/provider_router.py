@@ -0,0 +1,140 @@
+# entrypoint/provider_router.py
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from utils.metrics import metrics
+
+# Score weights per routing profile, plus how many handlers are kept per task by default.
+ROUTING_PROFILES: Dict[str, Dict[str, float]] = {
+    'fast':     {'latency': 0.7, 'reliability': 0.2, 'quality': 0.1, 'top_k': 1},
+    'balanced': {'latency': 0.4, 'reliability': 0.3, 'quality': 0.3, 'top_k': 2},
+    'quality':  {'latency': 0.1, 'reliability': 0.2, 'quality': 0.7, 'top_k': 3},
+}
+
+# Assumed quality of a (task, handler) pair until evaluations have been observed for it
+DEFAULT_QUALITY = 0.5
+
+
+class ProviderRouter:
+    def __init__(self, alpha: float = 0.2, profiles: Optional[Dict[str, Dict[str, float]]] = None):
+        """
+        Ranks handlers for a task by rolling (EWMA) latency, error rate and evaluation quality.
+
+        Latency and errors are tracked per handler; quality per (task, handler), fed by evaluation
+        task results for that handler's generations. Handlers without observations are scored
+        optimistically (fastest latency, no errors, default quality) so new providers get traffic.
+
+        Args:
+            alpha (float): EWMA smoothing factor; higher values react faster to recent calls.
+            profiles (Dict[str, Dict[str, float]], optional): Routing profiles; defaults to ROUTING_PROFILES.
+        """
+        self.alpha = alpha
+        self.profiles = profiles or ROUTING_PROFILES
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._latency_ms: Dict[str, float] = {}
+        self._error_rate: Dict[str, float] = {}
+        self._quality: Dict[Tuple[str, str], float] = {}
+
+    def record_call(self, handler_name: str, latency_ms: float, ok: bool) -> None:
+        with self._lock:
+            self._latency_ms[handler_name] = self._ewma(self._latency_ms.get(handler_name), latency_ms)
+            self._error_rate[handler_name] = self._ewma(self._error_rate.get(handler_name), 0.0 if ok else 1.0)
+        metrics.set_gauge('router_latency_ewma_ms', self._latency_ms[handler_name], {'handler': handler_name})
+        metrics.set_gauge('router_error_rate_ewma', self._error_rate[handler_name], {'handler': handler_name})
+
+    def record_quality(self, task_name: str, handler_name: str, score: float) -> None:
+        """
+        Feeds an evaluation score (0..1) for a handler's output on a task.
+        """
+        key = (task_name, handler_name)
+        with self._lock:
+            self._quality[key] = self._ewma(self._quality.get(key), max(0.0, min(1.0, score)))
+        metrics.set_gauge('router_quality_ewma', self._quality[key], {'task': task_name, 'handler': handler_name})
+
+    def rank(self, task_name: str, handler_names: List[str], profile: str) -> List[Tuple[str, float]]:
+        """
+        Scores candidate handlers for a task under a profile, best first.
+
+        Raises:
+            ValueError: If the profile is unknown.
+        """
+        weights = self.profiles.get(profile)
+        if not weights:
+            raise ValueError(f"Unknown routing profile '{profile}'. Expected one of {sorted(self.profiles)}")
+        with self._lock:
+            latencies = {h: self._latency_ms.get(h) for h in handler_names}
+            known = [l for l in latencies.values() if l]
+            fastest = min(known) if known else None
+            scored = []
+            for handler_name in handler_names:
+                latency = latencies[handler_name]
+                latency_score = fastest / latency if fastest and latency else 1.0
+                reliability = 1.0 - self._error_rate.get(handler_name, 0.0)
+                quality = self._quality.get((task_name, handler_name), DEFAULT_QUALITY)
+                score = (weights['latency'] * latency_score + weights['reliability'] * reliability
+                         + weights['quality'] * quality)
+                scored.append((handler_name, score))
+        # Ties keep the configured handler order
+        return sorted(scored, key=lambda s: -s[1])
+
+    def select(self, task_name: str, handler_names: List[str], profile: str, top_k: Optional[int] = None) -> List[str]:
+        """
+        Picks the top-k handlers for a task under a profile and records the decision.
+        """
+        ranked = self.rank(task_name, handler_names, profile)
+        k = top_k or int(self.profiles[profile]['top_k'])
+        chosen = [handler_name for handler_name, _ in ranked[:k]]
+        for handler_name in chosen:
+            metrics.inc('router_selections_total', {'task': task_name, 'handler': handler_name, 'profile': profile})
+        self.logger.info(f"Routing task '{task_name}' with profile '{profile}': chose {chosen} from "
+                         f"{[(h, round(s, 3)) for h, s in ranked]}")
+        return chosen
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'latency_ewma_ms': dict(self._latency_ms),
+                'error_rate_ewma': dict(self._error_rate),
+                'quality_ewma': {f"{task}/{handler}": q for (task, handler), q in self._quality.items()},
+            }
+
+    def _ewma(self, previous: Optional[float], value: float) -> float:
+        if previous is None:
+            return value
+        return self.alpha * value + (1 - self.alpha) * previous
+
+
+def quality_score(evaluation: Any, expected_metrics: Any = None) -> Optional[float]:
+    """
+    Reduces a parsed evaluation response to a single 0..1 score.
+
+    The metrics named in the task's expected_metrics (a list of names, or a dict of
+    name -> {'max': scale}) are averaged; without expected_metrics every numeric top-level value
+    is used. Values above 1 are normalised by their declared 'max', else by the smallest common
+    scale (5, 10 or 100) that fits them.
+
+    Returns:
+        Optional[float]: The score, or None if the response holds no usable metric.
+    """
+    if not isinstance(evaluation, dict):
+        return None
+    if isinstance(expected_metrics, dict):
+        names = list(expected_metrics)
+    elif isinstance(expected_metrics, list):
+        names = [m for m in expected_metrics if isinstance(m, str)]
+    else:
+        names = [k for k, v in evaluation.items() if isinstance(v, (int, float)) and not isinstance(v, bool)]
+
+    scores = []
+    for name in names:
+        value = evaluation.get(name)
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            continue
+        scale = None
+        if isinstance(expected_metrics, dict) and isinstance(expected_metrics[name], dict):
+            scale = expected_metrics[name].get('max')
+        if not scale:
+            scale = next((s for s in (1, 5, 10, 100) if value <= s), value or 1)
+        scores.append(max(0.0, min(1.0, value / scale)))
+    return sum(scores) / len(scores) if scores else None
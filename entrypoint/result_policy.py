@@ -0,0 +1,78 @@
+# entrypoint/result_policy.py
+import re
+import json
+from typing import Any, Optional, Tuple
+
+# 'all': wait for every handler; 'first_valid': the first response that parses and passes the
+# guardrails wins; 'quorum_<k>' (e.g. quorum_2): stop once k valid responses agree; 'cascade': call
+# the handlers tier by tier (ProviderConfig.cost_tier, cheapest first) until one is accepted
+RESULT_POLICIES = ('all', 'first_valid', 'quorum_k', 'cascade')
+
+# Fields of a parsed response read as the model's confidence in it (0..1, or a percentage)
+CONFIDENCE_FIELDS = ('confidence', 'confidence_score')
+
+_QUORUM = re.compile(r"^quorum_(\d+)$")
+_WORDS = re.compile(r"\w+")
+
+
+def parse_result_policy(value: str) -> Tuple[str, Optional[int]]:
+    """
+    Parses a result policy name.
+
+    Returns:
+        Tuple[str, Optional[int]]: ('all', None), ('first_valid', None), ('cascade', None) or ('quorum', k).
+
+    Raises:
+        ValueError: If the name is not a known policy.
+    """
+    name = str(value or 'all').strip().lower()
+    if name in ('all', 'first_valid', 'cascade'):
+        return name, None
+    match = _QUORUM.match(name)
+    if match and int(match.group(1)) >= 1:
+        return 'quorum', int(match.group(1))
+    raise ValueError(f"Unknown result policy '{value}'. Expected 'all', 'first_valid', 'cascade' "
+                     f"or 'quorum_<k>' (e.g. quorum_2)")
+
+
+def policy_label(policy: Tuple[str, Optional[int]]) -> str:
+    name, k = policy
+    return f"quorum_{k}" if name == 'quorum' else name
+
+
+def agreement_key(value: Any) -> str:
+    """
+    Key under which two parsed responses count as the same answer for a quorum: text is compared
+    by its words only (ignoring case, punctuation and whitespace), objects by their normalized
+    fields whatever their order.
+    """
+    return json.dumps(_normalize(value), sort_keys=True, ensure_ascii=False)
+
+
+def confidence_of(value: Any) -> Optional[float]:
+    """
+    The confidence a parsed response states for itself (its 'confidence' field, percentages scaled
+    to 0..1), or None if it states none.
+    """
+    if not isinstance(value, dict):
+        return None
+    for field in CONFIDENCE_FIELDS:
+        confidence = value.get(field)
+        if isinstance(confidence, str):
+            try:
+                confidence = float(confidence.strip().rstrip('%'))
+            except ValueError:
+                continue
+        if isinstance(confidence, (int, float)) and not isinstance(confidence, bool):
+            return confidence / 100 if confidence > 1 else float(confidence)
+    return None
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return ' '.join(_WORDS.findall(value.lower()))
+    if isinstance(value, dict):
+        return {str(k).lower(): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
@@ -0,0 +1,151 @@
+# entrypoint/result_writer.py
+import asyncio
+import atexit
+import logging
+import time
+from typing import Any, Dict, List, Optional
+from models.database import run_in_session
+
+# Queue marker telling the background task to flush what it holds and exit.
+_STOP = object()
+
+
+class ResultWriter:
+    def __init__(self, repository, async_session_factory=None, max_queue_size: int = 10000,
+                 batch_size: int = 500, flush_interval: float = 1.0, max_retries: int = 3):
+        """
+        Persists enrichment results in the background through a bounded queue.
+
+        Rows are flushed in one transaction whenever ``batch_size`` rows are buffered or
+        ``flush_interval`` seconds have passed since the first buffered row, whichever comes first.
+        The request path only ever enqueues (submit); when the queue is full the rows are
+        dropped and counted rather than making the request wait. Batch callers that can
+        afford to slow down use submit_wait, which blocks until there is room.
+
+        Args:
+            repository: EnrichmentResultRepository used for the bulk inserts.
+            async_session_factory: Optional AsyncSession factory; when set, flushes use the async engine
+                instead of a worker thread.
+            max_queue_size (int): Maximum number of buffered rows.
+            batch_size (int): Maximum rows per flush transaction.
+            flush_interval (float): Maximum seconds a row waits before being flushed.
+            max_retries (int): Attempts per flush before the batch is given up on.
+        """
+        self.repository = repository
+        self.async_session_factory = async_session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self._task: Optional[asyncio.Task] = None
+        self.logger = logging.getLogger(__name__)
+        atexit.register(self.flush_pending_sync)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            self.logger.info("Result writer started.")
+
+    def submit(self, rows: List[Dict[str, Any]]) -> bool:
+        """
+        Enqueues rows without waiting. Returns False if any row had to be dropped because the queue is full.
+        """
+        for index, row in enumerate(rows):
+            try:
+                self.queue.put_nowait(row)
+            except asyncio.QueueFull:
+                dropped = len(rows) - index
+                self.dropped += dropped
+                self.logger.warning(f"Result queue full; dropped {dropped} rows (total dropped={self.dropped}).")
+                return False
+        return True
+
+    async def submit_wait(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Enqueues rows, waiting for room in the queue (backpressure for batch producers).
+        """
+        for row in rows:
+            await self.queue.put(row)
+
+    async def stop(self) -> None:
+        """
+        Stops the background task and flushes everything still queued.
+        """
+        if self._task is not None:
+            await self.queue.put(_STOP)
+            await self._task
+            self._task = None
+        batch = self._drain()
+        while batch:
+            await self._flush(batch)
+            batch = self._drain()
+        self.logger.info(f"Result writer stopped (written={self.written}, dropped={self.dropped}, failed={self.failed}).")
+
+    def flush_pending_sync(self) -> None:
+        """
+        Last-resort flush at interpreter exit, for rows still queued if the loop died without stop().
+        """
+        batch = self._drain()
+        while batch:
+            try:
+                self.written += self.repository.bulk_insert(batch)
+            except Exception as e:
+                self.failed += len(batch)
+                self.logger.error(f"Failed to flush {len(batch)} results at exit: {e}")
+            batch = self._drain()
+
+    def stats(self) -> Dict[str, int]:
+        return {'queued': self.queue.qsize(), 'written': self.written, 'dropped': self.dropped, 'failed': self.failed}
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            row = await self.queue.get()
+            if row is _STOP:
+                break
+            batch = [row]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(self.queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+                if row is _STOP:
+                    stopping = True
+                    break
+                batch.append(row)
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        for attempt in range(self.max_retries):
+            try:
+                if self.async_session_factory is not None:
+                    written = await self.repository.async_bulk_insert(self.async_session_factory, batch)
+                else:
+                    written = await run_in_session(self.repository.bulk_insert, batch)
+                self.written += written
+                self.logger.debug(f"Flushed {written} results.")
+                return
+            except Exception as e:
+                self.logger.error(f"Result flush failed (attempt {attempt + 1}/{self.max_retries}): {e}")
+                if attempt < self.max_retries - 1:
+                    await asyncio.sleep(0.5 * 2 ** attempt)
+        self.failed += len(batch)
+        self.logger.error(f"Giving up on {len(batch)} results after {self.max_retries} attempts.")
+
+    def _drain(self) -> List[Dict[str, Any]]:
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                row = self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if row is not _STOP:
+                batch.append(row)
+        return batch
@@ -1,23 +1,109 @@
 import logging
 import difflib
-from typing import Dict, Any
+from typing import Dict, Optional, Iterable, Tuple
 from repositories.styling_guide_repository import StylingGuideRepository
+from utils.lru_cache import LRUCache, MISSING
+from utils.ngram_index import NGramIndex
+from utils.text_normalizer import normalize_text
+from utils.token_estimator import token_estimator
+from utils.metrics import metrics
+
+# Dedicated logger so fuzzy-match decisions can be routed to an audit sink.
+audit_logger = logging.getLogger("styling_guide_audit")
+
 
 class StylingGuideManager:
-    def __init__(self, repo: StylingGuideRepository):
+    def __init__(self, repo: StylingGuideRepository, cache_size: int = 4096, cutoff: float = 0.6, candidate_limit: int = 10):
+        """
+        Caches styling guides in memory and resolves (possibly misspelled) product types and task names to them.
+
+        Fuzzy lookups shortlist candidates from a character trigram index and only score that
+        shortlist with difflib, so a miss costs roughly the same with ten or ten thousand product types.
+        Every resolution (including "no match") is memoized in a bounded LRU cache.
+
+        Args:
+            repo (StylingGuideRepository): Repository used to load active styling guides.
+            cache_size (int): Maximum number of memoized product type / task resolutions.
+            cutoff (float): Minimum difflib similarity ratio for a fuzzy match.
+            candidate_limit (int): Number of trigram candidates scored per fuzzy lookup.
+        """
         self.repo = repo
+        self.cutoff = cutoff
+        self.candidate_limit = candidate_limit
         self.styling_guide_cache: Dict[str, Dict[str, str]] = {}
+        self.styling_guide_versions: Dict[str, Dict[str, int]] = {}
+        # (product type, task, version) -> (normalized guide, approximate tokens saved by normalizing)
+        self.normalized_guides: Dict[Tuple[str, str, int], Tuple[str, int]] = {}
+        self.product_type_index = NGramIndex(n=3)
+        self.resolved_product_types = LRUCache(maxsize=cache_size)
+        self.resolved_tasks = LRUCache(maxsize=cache_size)
         self.load_all_styling_guides()
 
     def load_all_styling_guides(self) -> None:
         """
-        Loads all styling guides using the repository into an in-memory cache.
+        Loads all styling guides using the repository into an in-memory cache and rebuilds the lookup index.
         """
         self.styling_guide_cache = self.repo.fetch_active_styling_guides()
         if not self.styling_guide_cache:
             logging.error("No styling guides loaded from the database.")
             raise ValueError("No styling guides loaded from the database.")
-        logging.info(f"Loaded styling guides for product types: {list(self.styling_guide_cache.keys())}")
+        self.styling_guide_versions = self.repo.fetch_active_styling_guide_versions()
+        self.normalized_guides = {}
+        self.product_type_index.build(self.styling_guide_cache.keys())
+        self.resolved_product_types.clear()
+        self.resolved_tasks.clear()
+        logging.info(f"Loaded styling guides for {len(self.styling_guide_cache)} product types.")
+
+    def resolve_product_type(self, product_type: str) -> Optional[str]:
+        """
+        Resolves a product type to a known product type, exactly or via fuzzy matching.
+
+        Args:
+            product_type (str): The product type as received on the request.
+
+        Returns:
+            Optional[str]: The matched product type, or None if nothing is close enough.
+        """
+        product_type = product_type.lower()
+        if product_type in self.styling_guide_cache:
+            return product_type
+
+        resolved = self.resolved_product_types.get(product_type)
+        if resolved is not MISSING:
+            return resolved
+
+        candidates = self.product_type_index.candidates(product_type, limit=self.candidate_limit)
+        resolved, score = self._best_match(product_type, candidates)
+        self.resolved_product_types.put(product_type, resolved)
+        self._audit('product_type', product_type, resolved, score, len(candidates))
+        return resolved
+
+    def resolve_task(self, product_type: str, task: str) -> Optional[str]:
+        """
+        Resolves a task name under an already resolved product type.
+
+        Args:
+            product_type (str): A product type known to the cache.
+            task (str): The task name (e.g., 'title_enhancement').
+
+        Returns:
+            Optional[str]: The matched task name, or None if nothing is close enough.
+        """
+        task = task.lower()
+        product_guides = self.styling_guide_cache.get(product_type, {})
+        if task in product_guides:
+            return task
+
+        key = (product_type, task)
+        resolved = self.resolved_tasks.get(key)
+        if resolved is not MISSING:
+            return resolved
+
+        # A product type only has a handful of tasks, so they are scored directly.
+        resolved, score = self._best_match(task, product_guides.keys())
+        self.resolved_tasks.put(key, resolved)
+        self._audit('task', f"{product_type}/{task}", resolved, score, len(product_guides))
+        return resolved
 
     def get_styling_guide(self, product_type: str, task: str) -> str:
         """
@@ -33,35 +119,70 @@ class StylingGuideManager:
         Raises:
             ValueError: If no styling guide is found for the product type or task.
         """
-        product_type = product_type.lower()
-        task = task.lower()
-        product_guides = self.styling_guide_cache.get(product_type)
-
-        if not product_guides:
-            # Perform fuzzy matching on product_type
-            closest_matches = difflib.get_close_matches(product_type, self.styling_guide_cache.keys(), n=1, cutoff=0.6)
-            if closest_matches:
-                matched_product_type = closest_matches[0]
-                product_guides = self.styling_guide_cache[matched_product_type]
-                logging.info(f"Fuzzy matched product type '{product_type}' to '{matched_product_type}'")
-            else:
-                error_msg = f"No styling guide found for product type: '{product_type}'"
-                logging.error(error_msg)
-                raise ValueError(error_msg)
-
-        styling_guide = product_guides.get(task)
-        if styling_guide:
-            logging.debug(f"Found exact styling guide for product type '{product_type}', task '{task}'")
-            return styling_guide
-
-        # Perform fuzzy matching on task
-        closest_task = difflib.get_close_matches(task, product_guides.keys(), n=1, cutoff=0.6)
-        if closest_task:
-            task = closest_task[0]
-            styling_guide = product_guides[task]
-            logging.info(f"Fuzzy matched task '{task}' to '{closest_task[0]}'")
-            return styling_guide
-
-        error_msg = f"No styling guide found for task: '{task}' under product type: '{product_type}'"
-        logging.error(error_msg)
-        raise ValueError(error_msg)
+        matched_product_type = self.resolve_product_type(product_type)
+        if not matched_product_type:
+            raise ValueError(f"No styling guide found for product type: '{product_type.lower()}'")
+
+        matched_task = self.resolve_task(matched_product_type, task)
+        if not matched_task:
+            raise ValueError(f"No styling guide found for task: '{task.lower()}' under product type: '{matched_product_type}'")
+
+        logging.debug(f"Resolved styling guide for product type '{product_type}', task '{task}' "
+                      f"to '{matched_product_type}', '{matched_task}'")
+        return self.styling_guide_cache[matched_product_type][matched_task]
+
+    def get_normalized_styling_guide(self, product_type: str, task: str) -> str:
+        """
+        Like get_styling_guide, but with markup stripped and repeated rules removed (see
+        utils.text_normalizer). Normalized guides are cached by (product type, task, version), so
+        each guide version is normalized once.
+
+        Raises:
+            ValueError: If no styling guide is found for the product type or task.
+        """
+        matched_product_type = self.resolve_product_type(product_type)
+        matched_task = self.resolve_task(matched_product_type, task) if matched_product_type else None
+        if not matched_task:
+            # Raises the same errors as a plain lookup
+            return self.get_styling_guide(product_type, task)
+
+        key = (matched_product_type, matched_task,
+               self.styling_guide_versions.get(matched_product_type, {}).get(matched_task, 1))
+        cached = self.normalized_guides.get(key)
+        if cached is None:
+            original = self.styling_guide_cache[matched_product_type][matched_task]
+            normalized = normalize_text(original)
+            saved = token_estimator.approximate(original) - token_estimator.approximate(normalized)
+            cached = self.normalized_guides[key] = (normalized, saved)
+        metrics.inc('normalization_tokens_saved_total', {'field': 'styling_guide'}, cached[1])
+        return cached[0]
+
+    def get_styling_guide_version(self, product_type: str, task: str) -> int:
+        """
+        Version of the active styling guide for a product type and task, resolved like
+        get_styling_guide (1 if unknown).
+        """
+        matched_product_type = self.resolve_product_type(product_type)
+        matched_task = self.resolve_task(matched_product_type, task) if matched_product_type else None
+        return self.styling_guide_versions.get(matched_product_type, {}).get(matched_task, 1)
+
+    def _best_match(self, query: str, candidates: Iterable[str]) -> (Optional[str], float):
+        matcher = difflib.SequenceMatcher()
+        matcher.set_seq2(query)
+        best, best_score = None, 0.0
+        for candidate in candidates:
+            matcher.set_seq1(candidate)
+            # Same cheap upper bounds difflib.get_close_matches uses before the full ratio.
+            if matcher.real_quick_ratio() < self.cutoff or matcher.quick_ratio() < self.cutoff:
+                continue
+            score = matcher.ratio()
+            if score >= self.cutoff and score > best_score:
+                best, best_score = candidate, score
+        return best, best_score
+
+    def _audit(self, kind: str, query: str, resolved: Optional[str], score: float, candidates: int):
+        if resolved:
+            audit_logger.info(f"Fuzzy matched {kind} '{query}' to '{resolved}' "
+                              f"(score={score:.3f}, candidates={candidates})")
+        else:
+            audit_logger.warning(f"No {kind} match for '{query}' (cutoff={self.cutoff}, candidates={candidates})")
@@ -4,6 +4,7 @@ import logging
 from typing import Dict,Any,List
 from sqlalchemy.orm import Session
 from models.models import GenerationTask, EvaluationTask, TaskExecutionConfig
+from parsers.schema_validator import compile_schema
 
 class TaskManager:
     def __init__(self, db_session: Session):
@@ -13,6 +14,10 @@ class TaskManager:
         self.db_session = db_session
         self.tasks_config: Dict[(str,str),Dict[str,Any]] = {}
         self.task_execution: Dict[str,Any] = {}
+        self.postprocess_hooks: Dict[str,List[Dict[str,Any]]] = {}
+        self.output_validators: Dict[(str,str),Any] = {}
+        # generation task name -> names of the evaluation tasks that judge its output
+        self.evaluation_dependencies: Dict[str,List[str]] = {}
         self.logger = logging.getLogger(__name__)
         self._load_tasks()
         self._load_task_execution_config()
@@ -24,18 +29,31 @@ class TaskManager:
                 'task_type': 'generation',
                 'description': t.description,
                 'max_tokens': t.max_tokens,
-                'output_format': t.output_format
+                'output_format': t.output_format,
+                'output_schema': t.output_schema or None
             }
+            self.evaluation_dependencies[t.task_name] = sorted(e.task_name for e in t.evaluation_tasks)
         evaluation_tasks = self.db_session.query(EvaluationTask).all()
         for t in evaluation_tasks:
             self.tasks_config[(t.task_name, 'evaluation')] = {
                 'task_type': 'evaluation',
                 'description': t.description,
                 'max_tokens': t.max_tokens,
-                'output_format': t.output_format
+                'output_format': t.output_format,
+                'output_schema': t.output_schema or None,
+                'expected_metrics': t.expected_metrics or None
             }
+        self._compile_output_schemas()
         self.logger.info(f"Loaded {len(self.tasks_config)} tasks.")
 
+    def _compile_output_schemas(self):
+        # Validators are compiled once at load time; they are kept apart from tasks_config,
+        # which stays plain data.
+        for key, config in self.tasks_config.items():
+            if config.get('output_schema'):
+                self.output_validators[key] = compile_schema(config['output_schema'])
+        self.logger.info(f"Compiled {len(self.output_validators)} task output schemas.")
+
     def _load_task_execution_config(self):
         config = self.db_session.query(TaskExecutionConfig).order_by(TaskExecutionConfig.config_id.desc()).first()
         if config:
@@ -60,6 +78,21 @@ class TaskManager:
     def get_task_config(self, task_name: str, task_type: str) -> Dict[str,Any]:
         return self.tasks_config.get((task_name, task_type), {})
     
+    def get_evaluation_tasks(self, generation_task: str) -> List[str]:
+        """
+        Returns the evaluation tasks linked to a generation task (generation_task_evaluation_tasks).
+        """
+        return self.evaluation_dependencies.get(generation_task, [])
+
+    def get_output_validator(self, task_name: str, task_type: str = None):
+        """
+        Returns the compiled output validator for a task, or None if the task has no schema.
+        Without task_type, the generation task wins over an evaluation task of the same name.
+        """
+        if task_type:
+            return self.output_validators.get((task_name, task_type))
+        return self.output_validators.get((task_name, 'generation')) or self.output_validators.get((task_name, 'evaluation'))
+
     def get_postprocess_hooks(self, task_name: str):
         """
         Returns a list of dicts: 
@@ -67,7 +100,11 @@ class TaskManager:
           { "hook_type":..., "class_path":..., "parameters":..., "order_index":... },
           ...
         ]
+        Hook configuration is cached per task after the first lookup, so it is
+        queried at most once instead of on every request.
         """
+        if task_name in self.postprocess_hooks:
+            return self.postprocess_hooks[task_name]
         sql = """
         SELECT hook_type, class_path, parameters, order_index
         FROM post_process_hooks_config
@@ -83,4 +120,5 @@ class TaskManager:
                 "parameters": json.loads(r['parameters']),
                 "order_index": r['order_index']
             })
+        self.postprocess_hooks[task_name] = hooks
         return hooks
@@ -7,3 +7,13 @@ class StylingGuideNotFoundException(Exception):
     def __init__(self, product_type):
         self.product_type = product_type
         super().__init__(f"No styling guides found for product type: {product_type}")
+
+
+class ServiceOverloadedException(Exception):
+    """
+    Exception raised when the admission controller sheds a request.
+    """
+    def __init__(self, reason, retry_after):
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(f"Service overloaded: {reason}")
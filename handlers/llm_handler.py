@@ -2,7 +2,6 @@ import logging
 from typing import Dict, Any
 import asyncio
 from models.llm_request_models import BaseLLMRequest
-from openai import RateLimitError, AuthenticationError, OpenAIError, APIConnectionError, Timeout
 from providers.provider_factory import ProviderFactory
 
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -23,6 +22,8 @@ class BaseModelHandler:
         self.max_tokens = max_tokens
         self.temperature = temperature
         self.version = version
+        # Inline image format of the provider, or None if it takes no images
+        self.image_format = getattr(self.provider, 'image_format', None)
 
     async def invoke(self, request: BaseLLMRequest, task: str, retries: int = 3) -> Dict[str, Any]:
         model = request.parameters.get("model") if request.parameters.get("model") else self.model
@@ -33,9 +34,12 @@ class BaseModelHandler:
 
         self.logger.debug("Invoking model: %s with prompt: %s", model, prompt)
 
-        return await self._retry_logic(model, prompt, temperature, max_tokens, task, retries)
+        return await self._retry_logic(model, prompt, temperature, max_tokens, task, retries, request.images)
 
-    async def _retry_logic(self, model: str, prompt: str, temperature: float, max_tokens: int, task: str, retries: int) -> Dict[str, Any]:
+    async def _retry_logic(self, model: str, prompt: str, temperature: float, max_tokens: int, task: str, retries: int,
+                           images: list = None) -> Dict[str, Any]:
+        # Only providers with an image_format accept images
+        extra = {'images': images} if images and self.image_format else {}
         for attempt in range(retries):
             try:
                 response = await asyncio.to_thread(
@@ -43,11 +47,12 @@ class BaseModelHandler:
                     model,
                     [{"role": "user", "content": prompt}],
                     temperature,
-                    max_tokens
+                    max_tokens,
+                    **extra
                 )
                 self.logger.debug("Received response: %s", response)
                 content = response['choices'][0]['message']['content']
-                return {"task": task, "response": content}
+                return {"task": task, "response": content, "usage": response.get('usage')}
             except Exception as e:  # Broad exception for debugging
                 self.logger.error(f"An error occurred: {type(e)} - {str(e)}")
                 if attempt < retries - 1:
@@ -1,7 +1,146 @@
+# main.py
+import os
+import gc
+import sys
+import time
+import signal
+import socket
+import logging
+import argparse
 import uvicorn
-from app_factory import create_app
+from app_factory import build_components, create_app
+from adapters.segment_store import SegmentStore
+from adapters.response_formatter import SegmentStoreResponseFormatter
+from models.database import engine, reinit_after_fork
+from utils.metrics import metrics
+from utils.process_info import memory_usage
+
+logger = logging.getLogger(__name__)
+
+
+def _report_startup(label: str, started: float) -> None:
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    memory = memory_usage()
+    metrics.set_gauge('process_startup_ms', elapsed_ms)
+    for name, value in memory.items():
+        metrics.set_gauge(f'process_startup_{name}', value)
+    details = ", ".join(f"{name}={value / 2 ** 20:.1f}MiB" for name, value in memory.items())
+    logger.info(f"{label} (pid {os.getpid()}) ready in {elapsed_ms:.0f}ms; {details}")
+
+
+def _run_worker(index: int, components: dict, sock: socket.socket) -> None:
+    """
+    Body of a forked worker: drops resources that must not be shared with the parent, then serves
+    the shared socket with an app built on the inherited (copy-on-write) components.
+    """
+    started = time.perf_counter()
+    reinit_after_fork()
+    components['llm_manager'].reset_connections()
+    components['cpu_executor'].reset_after_fork()
+    if os.getenv("SEGMENT_STORE_DIR"):
+        # Segments are append-only files with a single writer, so every worker gets its own directory
+        segment_store = SegmentStore(os.path.join(os.getenv("SEGMENT_STORE_DIR"), f"worker-{index}"),
+                                     max_segment_bytes=int(os.getenv("SEGMENT_MAX_BYTES", str(256 * 1024 * 1024))))
+        components['segment_store'] = segment_store
+        components['batch_formatter'] = SegmentStoreResponseFormatter(segment_store)
+
+    app = create_app(components)
+    _report_startup(f"Worker {index}", started)
+    server = uvicorn.Server(uvicorn.Config(app, log_level=os.getenv("LOG_LEVEL", "info")))
+    server.run(sockets=[sock])
+
+
+def serve_workers(host: str, port: int, workers: int) -> None:
+    """
+    Loads and compiles the configuration (tasks, templates, styling guides, providers) once in this
+    process, then forks ``workers`` server processes that share it copy-on-write and listen on the
+    same socket. A worker that exits unexpectedly is replaced; SIGTERM/SIGINT stop all workers.
+
+    Args:
+        host (str): Bind address.
+        port (int): Bind port.
+        workers (int): Number of server processes.
+    """
+    started = time.perf_counter()
+    components = build_components()
+    # Workers open their own segment files and DB connections; the parent keeps none of either
+    if components['segment_store']:
+        components['segment_store'].close()
+        components['segment_store'] = None
+    engine.dispose()
+    _report_startup("Config snapshot", started)
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    # Objects allocated so far are never collected, so the collector does not write to (and
+    # un-share) their pages in the workers
+    gc.collect()
+    gc.freeze()
+
+    children = {}
+    stopping = False
+
+    def spawn(index: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            try:
+                _run_worker(index, components, sock)
+            except BaseException:
+                logger.exception(f"Worker {index} crashed.")
+                os._exit(1)
+            os._exit(0)
+        children[pid] = index
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for index in range(workers):
+        spawn(index)
+    logger.info(f"Serving on {host}:{port} with {workers} workers.")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        index = children.pop(pid, None)
+        if index is not None and not stopping:
+            logger.warning(f"Worker {index} (pid {pid}) exited with status {status}; restarting.")
+            spawn(index)
+    sock.close()
 
-app = create_app()
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8080)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Runs the item enrichment API.")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8080")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "1")),
+                        help="Server processes forked from one config snapshot.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if args.workers > 1 and hasattr(os, "fork"):
+        serve_workers(args.host, args.port, args.workers)
+        sys.exit(0)
+    started = time.perf_counter()
+    app = create_app()
+    _report_startup("Server", started)
+    uvicorn.run(app, host=args.host, port=args.port)
+else:
+    # Imported by an ASGI server (uvicorn main:app)
+    app = create_app()
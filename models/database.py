@@ -1,11 +1,119 @@
 # models/database.py
 
-from sqlalchemy import create_engine
+import os
+import asyncio
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.pool import QueuePool
 
-DATABASE_URL = "sqlite:///results.db"  # Update with your actual database path
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///results.db")  # Update with your actual database path
+# Optional async engine, e.g. "sqlite+aiosqlite:///results.db" (requires the aiosqlite driver).
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+
+# Applied to every new SQLite connection. WAL lets readers proceed while a writer is active,
+# which is what allows several workers/threads to serve requests from the same file.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "cache_size": -64000,   # ~64MB page cache
+    "temp_store": "MEMORY",
+    "mmap_size": 268435456,
+    "foreign_keys": "ON",
+}
+
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def _engine_kwargs(url: str) -> dict:
+    if not _is_sqlite(url):
+        return {"pool_size": DB_POOL_SIZE, "max_overflow": DB_MAX_OVERFLOW, "pool_pre_ping": True}
+    kwargs = {"connect_args": {"check_same_thread": False}}
+    if ":memory:" not in url and url.rstrip("/") != "sqlite:":
+        # File databases default to NullPool; pool them so sessions reuse connections across threads.
+        kwargs.update(poolclass=QueuePool, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
+    return kwargs
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for pragma, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {pragma}={value}")
+    cursor.close()
+
+
+engine = create_engine(DATABASE_URL, echo=False, **_engine_kwargs(DATABASE_URL))
+if _is_sqlite(DATABASE_URL):
+    event.listen(engine, "connect", _set_sqlite_pragmas)
 
-engine = create_engine(DATABASE_URL, echo=False)
 SessionLocal = sessionmaker(bind=engine)
+# Thread-scoped sessions: every thread touching the DB gets its own Session from the pool.
+ScopedSession = scoped_session(SessionLocal)
 Base = declarative_base()
+_async_engine = None
+
+
+def create_async_session_factory():
+    """
+    Builds an AsyncSession factory when ASYNC_DATABASE_URL is configured.
+
+    Returns:
+        sessionmaker or None: A factory producing AsyncSession objects, or None if no async URL is set.
+    """
+    global _async_engine
+    if not ASYNC_DATABASE_URL:
+        return None
+    from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+
+    if _async_engine is None:
+        _async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=False)
+        if _is_sqlite(ASYNC_DATABASE_URL):
+            event.listen(_async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return sessionmaker(_async_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def dispose_engines():
+    """
+    Releases pooled connections of the sync engine and, if created, the async engine.
+    """
+    ScopedSession.remove()
+    engine.dispose()
+    if _async_engine is not None:
+        await _async_engine.dispose()
+
+
+def reinit_after_fork():
+    """
+    Drops the connection pools inherited from a parent process. Must run in a forked worker before
+    it touches the database: sharing a pooled connection (socket or SQLite handle) across processes
+    corrupts it. The parent's connections are left open for the parent.
+    """
+    ScopedSession.remove()
+    engine.dispose(close=False)
+    if _async_engine is not None:
+        _async_engine.sync_engine.dispose(close=False)
+
+
+async def run_in_session(fn, *args, **kwargs):
+    """
+    Runs blocking DB work in a worker thread so it never stalls the event loop.
+    The thread's scoped session is released once the call returns.
+
+    Args:
+        fn: Callable performing synchronous DB work through ScopedSession.
+
+    Returns:
+        Whatever ``fn`` returns.
+    """
+    def _call():
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            ScopedSession.remove()
+
+    return await asyncio.to_thread(_call)
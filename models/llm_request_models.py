@@ -1,6 +1,6 @@
 # llm_request_models.py
 from pydantic import BaseModel, Field
-from typing import Dict, List, Union, Optional
+from typing import Any, Dict, List, Union, Optional
 
 class BaseLLMRequest(BaseModel):
     """
@@ -9,9 +9,11 @@ class BaseLLMRequest(BaseModel):
     Attributes:
         prompt (str): The input prompt to be sent to the LLM.
         parameters (Optional[Dict[str, Union[str, int, float]]]): Additional parameters for LLM configuration.
+        images (Optional[List[Dict[str, Any]]]): Inline image parts in the provider's format.
     """
     prompt: str
     parameters: Optional[Dict[str, Union[str, int, float]]] = None
+    images: Optional[List[Dict[str, Any]]] = None
 
 class LLMRequest(BaseModel):
     """
@@ -28,6 +30,7 @@ class LLMRequest(BaseModel):
     task_type: Optional[str] = 'generation'  # Default to 'generation'
     image_url : Optional[str] = None 
     attributes_list : Optional[List[str]] = None
+    item_id : Optional[str] = None
     #max_tokens: Optional[int] = 150  
     #metadata: Optional[Dict[str, Union[str, int, float, List[str]]]] = None
     #tasks: Optional[List[str]] = None
@@ -1,7 +1,7 @@
 # models/models.py
 
 from sqlalchemy import (
-    Column, Integer, Float, String, Text, Boolean, DateTime, ForeignKey, UniqueConstraint, Table
+    Column, Integer, Float, String, Text, Boolean, DateTime, ForeignKey, UniqueConstraint, Table, Index
 )
 from sqlalchemy.orm import relationship
 import json
@@ -49,6 +49,7 @@ class GenerationTask(Base):
     description = Column(Text)
     max_tokens  = Column(Integer)
     output_format = Column(Text)
+    output_schema = Column(JSONEncodedDict, nullable=True)  # optional JSON schema for the parsed output
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow)
 
@@ -63,6 +64,7 @@ class EvaluationTask(Base):
     description = Column(Text)
     max_tokens = Column(Integer)
     output_format = Column(Text)
+    output_schema = Column(JSONEncodedDict, nullable=True)  # optional JSON schema for the parsed output
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow)
     expected_metrics = Column(JSONEncodedDict)  
@@ -111,6 +113,7 @@ class ProviderConfig(Base):
     api_base = Column(String, nullable=False)
     max_tokens = Column(Integer, nullable=True)
     temperature = Column(Float, nullable=True)
+    cost_tier = Column(Integer, nullable=True)      # cascade order: lower tiers are tried first
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow)
@@ -171,3 +174,48 @@ class PostProcessHooksConfig(Base):
 
     # Potential relationship to GenerationTask if needed
     # generation_task = relationship('GenerationTask', backref='post_process_hooks')
+
+class EnrichmentResult(Base):
+    __tablename__ = 'enrichment_results'
+
+    result_id = Column(Integer, primary_key=True, autoincrement=True)
+    item_id = Column(String, nullable=False)
+    task_name = Column(String, nullable=False)
+    task_type = Column(String, nullable=False)
+    handler_name = Column(String, nullable=False)
+    prompt_hash = Column(String(64), nullable=True)
+    response = Column(Text, nullable=True)             # raw LLM output, before hooks and parsing
+    parsed_response = Column(JSONEncodedDict, nullable=True)
+    parse_status = Column(String, nullable=False)     # 'ok', 'parse_error', 'schema_error', 'hook_error' or 'llm_error'
+    error = Column(Text, nullable=True)
+    latency_ms = Column(Float, nullable=True)
+    prompt_tokens = Column(Integer, nullable=True)
+    completion_tokens = Column(Integer, nullable=True)
+    # Hash of the task's inputs (template placeholders, template and styling guide versions), see PromptManager
+    input_fingerprint = Column(String(64), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_enrichment_results_item_task', 'item_id', 'task_name', 'handler_name', 'created_at'),
+    )
+
+class EnrichmentJob(Base):
+    __tablename__ = 'enrichment_jobs'
+
+    job_id = Column(String(36), primary_key=True)
+    status = Column(String, nullable=False, default='queued')   # 'queued', 'running', 'succeeded' or 'failed'
+    payload = Column(JSONEncodedDict, nullable=False)           # {'items': [...], 'task_type': ..., 'options': {...}, 'batch': bool}
+    result = Column(JSONEncodedDict, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    callback_url = Column(String, nullable=True)
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)          # visibility timeout of a running job
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    completed_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index('ix_enrichment_jobs_status_created', 'status', 'created_at'),
+    )
@@ -16,6 +16,8 @@ def extract_extracted_vision_attributes(match: Optional[Match], attributes_list:
         Dict[str, str]: A dictionary of extracted vision attributes with 'Not specified' as default.
     """
     attributes = {attr: "Not specified" for attr in attributes_list}
+    # LLMs do not always echo attribute names with the requested casing
+    requested_names = {attr.lower(): attr for attr in attributes_list}
     
     if match:
         try:
@@ -27,7 +29,8 @@ def extract_extracted_vision_attributes(match: Optional[Match], attributes_list:
                     key, value = attr_match.groups()
                     key = key.strip()
                     value = value.strip()
-                    if key in attributes:
+                    key = requested_names.get(key.lower())
+                    if key:
                         attributes[key] = value
                         logging.debug(f"Parsed vision attribute '{key}': {value}")
             return attributes
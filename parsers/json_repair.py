@@ -0,0 +1,160 @@
+# parsers/json_repair.py
+
+import json
+from typing import Any, List, Optional, Tuple
+
+_CLOSERS = {'{': '}', '[': ']'}
+# How many candidate start positions ('{' or '[') are tried before giving up
+MAX_START_ATTEMPTS = 8
+
+
+def extract_json(text: str) -> Tuple[Any, List[str]]:
+    """
+    Finds the outermost balanced JSON object or array anywhere in ``text`` and parses it,
+    repairing common LLM defects on the way.
+
+    The scan is a single linear pass per candidate start position, tracking string/escape state
+    and a bracket stack. Repairs applied:
+      - 'single_quotes': single-quoted strings are re-quoted with double quotes.
+      - 'trailing_commas': commas directly before '}' or ']' are dropped.
+      - 'mismatched_brackets': a closer of the wrong kind is replaced with the expected one.
+      - 'closed_truncated_string' / 'closed_truncated_structure': output cut off (e.g. at max_tokens)
+        is closed; an incomplete last member is dropped if it cannot be completed.
+      - 'surrounding_text': prose or code fences around the JSON were ignored.
+
+    Args:
+        text (str): Raw LLM response.
+
+    Returns:
+        Tuple[Any, List[str]]: The parsed value and the list of repairs applied (empty if none were needed).
+
+    Raises:
+        ValueError: If no parsable JSON object or array can be recovered.
+    """
+    last_error: Optional[Exception] = None
+    start = _next_start(text, 0)
+    attempts = 0
+    while start != -1 and attempts < MAX_START_ATTEMPTS:
+        attempts += 1
+        try:
+            value, repairs, end = _scan(text, start)
+            if _has_surrounding_text(text, start, end):
+                repairs.append('surrounding_text')
+            return value, repairs
+        except ValueError as e:
+            last_error = e
+        start = _next_start(text, start + 1)
+    raise ValueError(f"No JSON object or array could be recovered: {last_error or 'no opening bracket found'}")
+
+
+def _next_start(text: str, position: int) -> int:
+    brace, bracket = text.find('{', position), text.find('[', position)
+    if brace == -1:
+        return bracket
+    if bracket == -1:
+        return brace
+    return min(brace, bracket)
+
+
+def _has_surrounding_text(text: str, start: int, end: int) -> bool:
+    prefix = text[:start].strip()
+    suffix = text[end:].strip()
+    # A plain ```json fence is the expected wrapper, not something that needed repairing
+    if prefix.lower() in ('', '```json', '```') and suffix in ('', '```'):
+        return False
+    return True
+
+
+def _scan(text: str, start: int) -> Tuple[Any, List[str], int]:
+    out: List[str] = []
+    stack: List[str] = []
+    repairs: List[str] = []
+    in_string = False
+    quote = '"'
+    escaped = False
+    # (output length, stack) at the last comma outside strings, used to drop an incomplete last member
+    last_comma: Optional[Tuple[int, Tuple[str, ...]]] = None
+
+    position = start
+    length = len(text)
+    while position < length:
+        char = text[position]
+        position += 1
+
+        if in_string:
+            if escaped:
+                escaped = False
+                if quote == "'" and char == "'":
+                    out[-1] = "'"  # \' is not a valid JSON escape; keep the bare apostrophe
+                else:
+                    out.append(char)
+            elif char == '\\':
+                escaped = True
+                out.append(char)
+            elif char == quote:
+                in_string = False
+                out.append('"')
+            elif char == '"':  # double quote inside a single-quoted string
+                out.append('\\"')
+            else:
+                out.append(char)
+            continue
+
+        if char == '"' or char == "'":
+            in_string = True
+            quote = char
+            if char == "'" and 'single_quotes' not in repairs:
+                repairs.append('single_quotes')
+            out.append('"')
+        elif char in _CLOSERS:
+            stack.append(_CLOSERS[char])
+            out.append(char)
+        elif char in '}]':
+            if _strip_trailing_comma(out) and 'trailing_commas' not in repairs:
+                repairs.append('trailing_commas')
+            expected = stack.pop()
+            if char != expected and 'mismatched_brackets' not in repairs:
+                repairs.append('mismatched_brackets')
+            out.append(expected)
+            if not stack:
+                return json.loads(''.join(out), strict=False), repairs, position
+        elif char == ',':
+            last_comma = (len(out), tuple(stack))
+            out.append(char)
+        else:
+            out.append(char)
+
+    # Ran out of text with open structures: the response was truncated
+    if in_string:
+        if escaped:
+            out.pop()
+        out.append('"')
+        repairs.append('closed_truncated_string')
+    repairs.append('closed_truncated_structure')
+
+    candidate = ''.join(out).rstrip()
+    if candidate.endswith(':'):
+        candidate += ' null'
+    candidate = candidate.rstrip(',')
+    try:
+        return json.loads(candidate + ''.join(reversed(stack)), strict=False), repairs, length
+    except json.JSONDecodeError:
+        if last_comma is None:
+            raise ValueError("Truncated JSON could not be closed.")
+
+    # Drop the incomplete member after the last comma and close what was open at that point
+    cut, cut_stack = last_comma
+    try:
+        return json.loads(''.join(out[:cut]) + ''.join(reversed(cut_stack)), strict=False), repairs, length
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Truncated JSON could not be closed: {e}")
+
+
+def _strip_trailing_comma(out: List[str]) -> bool:
+    index = len(out) - 1
+    while index >= 0 and out[index].isspace():
+        index -= 1
+    if index >= 0 and out[index] == ',':
+        del out[index]
+        return True
+    return False
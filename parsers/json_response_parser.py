@@ -3,7 +3,12 @@
 import json
 import logging
 import re
+from typing import Any, List, Tuple
 from parsers.response_parser import ResponseParser
+from parsers.json_repair import extract_json
+
+FENCED_JSON = re.compile(r'```json\s*\n?(.*?)\n?```', re.DOTALL)
+
 
 class JsonResponseParser(ResponseParser):
     def __init__(self):
@@ -19,30 +24,46 @@ class JsonResponseParser(ResponseParser):
         Returns:
             dict: Parsed JSON data.
         """
+        parsed_json, _ = self.parse_with_repairs(response)
+        return parsed_json
+
+    def parse_with_repairs(self, response: str) -> Tuple[Any, List[str]]:
+        """
+        Parses the JSON response, falling back to tolerant extraction and repair when the strict parse fails.
+
+        Args:
+            response (str): The raw response string from the LLM.
+
+        Returns:
+            Tuple[Any, List[str]]: Parsed JSON data and the repairs that were needed (empty for clean JSON).
+
+        Raises:
+            ValueError: If no JSON object or array can be recovered from the response.
+        """
+        # Fast path: a fenced ```json block or a response that is pure JSON
+        json_content = FENCED_JSON.search(response)
+        if json_content:
+            json_str = json_content.group(1).strip()  # Strip leading/trailing whitespace/newlines
+            logging.debug(f"Extracted JSON from code block: {json_str}")
+        else:
+            json_str = response.strip()
+            logging.debug("No code block found. Attempting to parse full response.")
+
         try:
-            # Attempt to extract JSON content between triple backticks if present
-            json_content = re.search(r'```json\s*\n?(.*?)\n?```', response, re.DOTALL)
-
-            if json_content:
-                json_str = json_content.group(1).strip()  # Strip leading/trailing whitespace/newlines
-                # json_str = json.loads(f'"{json_str}"').strip()  # Wrap the string in quotes to ensure it's valid JSON
-                logging.debug(f"Extracted JSON from code block: {json_str}")
-            else:
-                # Fallback: Use the entire response as JSON, ensuring it's stripped of unnecessary newlines
-                json_str = response.strip()
-                logging.debug("No code block found. Attempting to parse full response.")
-
-            # Validate JSON starts properly if not caught by regex
-            if not json_str.startswith(('{', '[')):
-                json_str = json.loads(f'"{json_str}"').strip()  # Wrap the string in quotes to ensure it's valid JSON
-                if not json_str.startswith(('{', '[')):
-                    logging.warning("Response does not start with JSON object or array.")
-                    raise ValueError("Response does not contain valid JSON.")
-
-            # Attempt to parse JSON
             parsed_json = json.loads(json_str)
-            return parsed_json
+            # A JSON string wrapping the actual JSON document
+            if isinstance(parsed_json, str) and parsed_json.strip().startswith(('{', '[')):
+                parsed_json = json.loads(parsed_json)
+            if isinstance(parsed_json, (dict, list)):
+                return parsed_json, []
+        except json.JSONDecodeError:
+            pass
 
-        except json.JSONDecodeError as e:
+        # Slow path: find the outermost balanced object/array anywhere and repair it
+        try:
+            parsed_json, repairs = extract_json(response)
+        except ValueError as e:
             logging.error(f"Failed to parse JSON response: {e}\nResponse: {response}")
             raise ValueError(f"Failed to parse JSON response: {e}")
+        logging.info(f"Recovered JSON response with repairs: {repairs}")
+        return parsed_json, repairs
@@ -3,15 +3,60 @@
 import re
 import os
 import logging
-from typing import Dict, Any, List, Optional, Match
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
 from importlib import import_module
 
 from .response_parser import ResponseParser
 
+# Matches a '### <header>' line; the response is split on these once per parse.
+SECTION_HEADER = re.compile(r"^[ \t]*###[ \t]*(.+?)[ \t]*$", re.MULTILINE)
+
+
+def load_task_sections(filename: str = "task_sections.txt") -> Dict[str, str]:
+    """
+    Loads the task name -> pattern key mapping used for multi-task prompt fusion.
+    The file is re-read only when it changes.
+
+    Args:
+        filename (str): File name inside the parsers directory.
+
+    Returns:
+        Dict[str, str]: Task name mapped to its patterns_config.txt key (empty if the file is missing).
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        logging.warning(f"Task sections file not found at '{path}'; prompt fusion is unavailable.")
+        return {}
+    return dict(_read_task_sections(path, mtime))
+
+
+@lru_cache(maxsize=4)
+def _read_task_sections(path: str, mtime: int) -> Tuple[Tuple[str, str], ...]:
+    entries = []
+    with open(path, 'r') as file:
+        for line_number, line in enumerate(file, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            task, _, key = (part.strip() for part in line.partition(':'))
+            if not task or not key:
+                logging.warning(f"Invalid task section format at line {line_number}: '{line}'")
+                continue
+            entries.append((task, key))
+    return tuple(entries)
+
+
 class MarkdownResponseParser(ResponseParser):
+    # Keys whose section is a bullet list of attributes, matched against the request's attributes_list
+    ATTRIBUTE_KEYS = ("extracted_attributes", "extracted_vision_attributes")
+
     def __init__(self, patterns_filename: str = "patterns_config.txt", mapping_filename: str = "helper_mapping.txt"):
         """
-        Initializes the MarkdownResponseParser by loading regex patterns and helper mappings from configuration files.
+        Initializes the MarkdownResponseParser by loading section patterns and helper mappings from configuration files.
+        Construction reads both files and imports the helpers, so instances are cached by ParserFactory.
 
         Args:
             patterns_filename (str): The filename of the patterns configuration file.
@@ -26,15 +71,17 @@ class MarkdownResponseParser(ResponseParser):
         self.compiled_patterns = self.compile_patterns(self.patterns)
         self.helper_mapping = self.load_helper_mapping(mapping_path)
 
-    def load_patterns(self, patterns_path: str) -> Dict[str, str]:
+    def load_patterns(self, patterns_path: str) -> Dict[str, Tuple[str, str]]:
         """
-        Loads regex patterns from a TXT configuration file.
+        Loads section definitions from a TXT configuration file.
+
+        Each line has the form ``key:section header:field label``.
 
         Args:
             patterns_path (str): The file path to the patterns configuration TXT file.
 
         Returns:
-            Dict[str, str]: A dictionary mapping task names to their regex patterns.
+            Dict[str, Tuple[str, str]]: A dictionary mapping keys to their (section header, field label).
         """
         if not os.path.exists(patterns_path):
             logging.error(f"Patterns configuration file not found at '{patterns_path}'.")
@@ -46,34 +93,85 @@ class MarkdownResponseParser(ResponseParser):
                 line = line.strip()
                 if not line or line.startswith('#'):
                     continue  # Skip empty lines or comments
-                if ':' not in line:
+                parts = [part.strip() for part in line.split(':', 2)]
+                if len(parts) != 3 or not all(parts):
                     logging.warning(f"Invalid pattern format at line {line_number}: '{line}'")
                     continue
-                key, pattern = line.split(':', 1)
-                patterns[key.strip()] = pattern.strip()
-        logging.info(f"Loaded regex patterns from '{patterns_path}'.")
+                key, header, label = parts
+                patterns[key] = (header, label)
+        logging.info(f"Loaded section patterns from '{patterns_path}'.")
         return patterns
 
-    def compile_patterns(self, patterns: Dict[str, str]) -> Dict[str, re.Pattern]:
+    def compile_patterns(self, patterns: Dict[str, Tuple[str, str]]) -> Dict[str, re.Pattern]:
         """
-        Compiles regex patterns for faster matching.
+        Compiles the field pattern applied inside each section body.
+        Attribute sections are compiled per request instead (see attribute_pattern).
 
         Args:
-            patterns (Dict[str, str]): A dictionary of regex patterns as strings.
+            patterns (Dict[str, Tuple[str, str]]): Section definitions from load_patterns.
 
         Returns:
-            Dict[str, re.Pattern]: A dictionary of compiled regex patterns.
+            Dict[str, re.Pattern]: A dictionary of compiled field patterns.
         """
         compiled = {}
-        for key, pattern in patterns.items():
-            try:
-                compiled[key] = re.compile(pattern, re.IGNORECASE | re.DOTALL)
-                logging.debug(f"Compiled pattern for '{key}': {pattern}")
-            except re.error as e:
-                logging.error(f"Invalid regex pattern for '{key}': {e}")
-                raise e
+        for key, (header, label) in patterns.items():
+            compiled[key] = re.compile(rf"\*\*{re.escape(label)}\*\*:\s*(.+)", re.IGNORECASE | re.DOTALL)
+            logging.debug(f"Compiled pattern for '{key}' (section '{header}').")
         return compiled
 
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def attribute_pattern(label: str, attributes: Tuple[str, ...]) -> re.Pattern:
+        """
+        Builds (and caches) the pattern matching the bullet list of an attribute section,
+        restricted to the attributes requested for the item.
+
+        Args:
+            label (str): The field label preceding the bullet list.
+            attributes (Tuple[str, ...]): Requested attribute names; empty accepts any name.
+
+        Returns:
+            re.Pattern: Pattern whose first group is the bullet list text.
+        """
+        names = '|'.join(re.escape(a) for a in sorted(attributes, key=len, reverse=True)) if attributes else r"[^*\n]+"
+        return re.compile(rf"\*\*{re.escape(label)}\*\*:\s*((?:-\s*\*\*(?:{names})\*\*:[^\n]*\n?)*)", re.IGNORECASE)
+
+    def split_sections(self, response: str) -> Dict[str, str]:
+        """
+        Splits a response into sections on its '### <header>' lines in a single pass.
+
+        Args:
+            response (str): The Markdown response from the LLM.
+
+        Returns:
+            Dict[str, str]: Lower-cased section header mapped to the section body (first occurrence wins).
+        """
+        sections = {}
+        headers = list(SECTION_HEADER.finditer(response))
+        for index, header in enumerate(headers):
+            end = headers[index + 1].start() if index + 1 < len(headers) else len(response)
+            sections.setdefault(header.group(1).strip().lower(), response[header.end():end])
+        return sections
+
+    def section_text(self, sections: Dict[str, str], key: str) -> Optional[str]:
+        """
+        Returns the '### <header>' section for a pattern key as standalone Markdown, or None if the
+        section is missing or does not contain its field label. Used to split a composite response
+        back into per-task responses.
+
+        Args:
+            sections (Dict[str, str]): Output of split_sections.
+            key (str): Pattern key, e.g. 'enhanced_title'.
+
+        Returns:
+            Optional[str]: The section including its header line, or None.
+        """
+        header, label = self.patterns[key]
+        body = sections.get(header.lower())
+        if body is None or f"**{label.lower()}**" not in body.lower():
+            return None
+        return f"### {header}\n{body.strip()}\n"
+
     def load_helper_mapping(self, mapping_path: str) -> Dict[str, Any]:
         """
         Loads helper mappings from a TXT configuration file.
@@ -123,32 +221,44 @@ class MarkdownResponseParser(ResponseParser):
         Returns:
             Dict[str, Any]: A dictionary containing the extracted/enhanced fields.
         """
+        attributes_list = attributes_list or []
+        sections = self.split_sections(response)
         data = {}
 
-        for key, pattern in self.compiled_patterns.items():
-            match = pattern.search(response)
-            if match:
-                helper_function = self.helper_mapping.get(key)
-                if helper_function:
-                    logging.info(f"Pattern matched for key '{key}'. Invoking helper function '{helper_function.__name__}'.")
-                    if key in ["extracted_attributes", "extracted_vision_attributes"]:
-                        extracted_data = helper_function(match, attributes_list)
-                    else:
-                        extracted_data = helper_function(match)
-                    data[self.camel_case(key)] = extracted_data
-                else:
-                    logging.warning(f"No helper function mapped for key '{key}'. Assigning 'Not specified'.")
-                    data[self.camel_case(key)] = "Not specified"
+        for key, (header, label) in self.patterns.items():
+            body = sections.get(header.lower())
+            if body is None:
+                logging.debug(f"Section '{header}' for key '{key}' not found in the response. Assigning 'Not specified'.")
+                data[self.camel_case(key)] = self._not_specified(key, attributes_list)
+                continue
+
+            if key in self.ATTRIBUTE_KEYS:
+                match = self.attribute_pattern(label, tuple(attributes_list)).search(body)
             else:
-                logging.warning(f"Pattern for key '{key}' not found in the response. Assigning 'Not specified'.")
-                if key in ["extracted_attributes", "extracted_vision_attributes"]:
-                    data[self.camel_case(key)] = {attr: "Not specified" for attr in attributes_list} if attributes_list else {}
+                match = self.compiled_patterns[key].search(body)
+
+            helper_function = self.helper_mapping.get(key)
+            if not match:
+                logging.warning(f"Field '{label}' not found in section '{header}'. Assigning 'Not specified'.")
+                data[self.camel_case(key)] = self._not_specified(key, attributes_list)
+            elif helper_function:
+                logging.debug(f"Pattern matched for key '{key}'. Invoking helper function '{helper_function.__name__}'.")
+                if key in self.ATTRIBUTE_KEYS:
+                    data[self.camel_case(key)] = helper_function(match, attributes_list)
                 else:
-                    data[self.camel_case(key)] = "Not specified"
+                    data[self.camel_case(key)] = helper_function(match)
+            else:
+                logging.warning(f"No helper function mapped for key '{key}'. Assigning 'Not specified'.")
+                data[self.camel_case(key)] = "Not specified"
 
         logging.debug(f"Final parsed data: {data}")
         return data
 
+    def _not_specified(self, key: str, attributes_list: List[str]) -> Any:
+        if key in self.ATTRIBUTE_KEYS:
+            return {attr: "Not specified" for attr in attributes_list}
+        return "Not specified"
+
     def camel_case(self, snake_str: str) -> str:
         """
         Converts snake_case string to camelCase string.
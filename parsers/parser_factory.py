@@ -1,10 +1,18 @@
 # parsers/parser_factory.py
 
+import os
+import threading
 from parsers.markdown_response_parser import MarkdownResponseParser
 from parsers.json_response_parser import JsonResponseParser
 from parsers.response_parser import ResponseParser
+from typing import Any, List, Optional, Sequence, Tuple
 
 class ParserFactory:
+    # Parsers keyed by (format, config files, config generation). Building a MarkdownResponseParser reads
+    # the config files, imports helpers and compiles regexes, so it is done once per config generation.
+    _cache = {}
+    _lock = threading.Lock()
+
     @staticmethod
     def get_parser(output_format: str, patterns_filename: str = "patterns_config.txt", mapping_filename: str = "helper_mapping.txt") -> ResponseParser:
         """
@@ -20,8 +28,89 @@ class ParserFactory:
         """
         output_format = output_format.lower()
         if output_format == "markdown":
-            return MarkdownResponseParser(patterns_filename=patterns_filename, mapping_filename=mapping_filename)
+            generation = ParserFactory._config_generation(patterns_filename, mapping_filename)
+            key = (output_format, patterns_filename, mapping_filename, generation)
         elif output_format == "json":
-            return JsonResponseParser()  # No arguments needed
+            key = (output_format,)
         else:
             raise ValueError(f"Unsupported output format: {output_format}")
+
+        parser = ParserFactory._cache.get(key)
+        if parser is None:
+            with ParserFactory._lock:
+                parser = ParserFactory._cache.get(key)
+                if parser is None:
+                    if output_format == "markdown":
+                        parser = MarkdownResponseParser(patterns_filename=patterns_filename, mapping_filename=mapping_filename)
+                        # Drop parsers built from older versions of the same config files
+                        for stale in [k for k in ParserFactory._cache if k[:3] == key[:3]]:
+                            del ParserFactory._cache[stale]
+                    else:
+                        parser = JsonResponseParser()  # No arguments needed
+                    ParserFactory._cache[key] = parser
+        return parser
+
+    @staticmethod
+    def clear_cache() -> None:
+        with ParserFactory._lock:
+            ParserFactory._cache.clear()
+
+    @staticmethod
+    def _config_generation(*filenames: str) -> Tuple[int, ...]:
+        # Modification times of the config files; editing either file yields a new generation
+        parsers_dir = os.path.dirname(os.path.abspath(__file__))
+        generation = []
+        for filename in filenames:
+            try:
+                generation.append(os.stat(os.path.join(parsers_dir, filename)).st_mtime_ns)
+            except FileNotFoundError:
+                generation.append(0)
+        return tuple(generation)
+
+
+def parse_response(output_format: str, response: str, attributes_list: Optional[List[str]] = None) -> Any:
+    """
+    Parses a single LLM response. Module-level so it can be shipped to a worker process.
+
+    Args:
+        output_format (str): 'markdown' or 'json'.
+        response (str): The raw response text.
+        attributes_list (List[str], optional): Attributes requested for extraction tasks (markdown only).
+
+    Returns:
+        Any: The parsed response.
+    """
+    parsed, _ = parse_response_with_repairs(output_format, response, attributes_list)
+    return parsed
+
+
+def parse_response_with_repairs(output_format: str, response: str,
+                                attributes_list: Optional[List[str]] = None) -> Tuple[Any, List[str]]:
+    """
+    Like parse_response, but also returns the repairs the parser had to apply (JSON only).
+
+    Returns:
+        Tuple[Any, List[str]]: The parsed response and the list of repairs (empty if none).
+    """
+    parser = ParserFactory.get_parser(output_format)
+    if output_format.lower() == "markdown":
+        return parser.parse(response, attributes_list or []), []
+    return parser.parse_with_repairs(response)
+
+
+def parse_responses(jobs: Sequence[Tuple[str, str, Optional[List[str]]]]) -> List[Tuple[bool, Any, List[str]]]:
+    """
+    Parses a chunk of (output_format, response, attributes_list) jobs, used for batch parsing across processes.
+    Failures are returned rather than raised so one bad response does not fail the whole chunk.
+
+    Returns:
+        List[Tuple[bool, Any, List[str]]]: (True, parsed, repairs) or (False, error message, []) per job, in order.
+    """
+    outcomes = []
+    for output_format, response, attributes_list in jobs:
+        try:
+            parsed, repairs = parse_response_with_repairs(output_format, response, attributes_list)
+            outcomes.append((True, parsed, repairs))
+        except Exception as e:
+            outcomes.append((False, str(e), []))
+    return outcomes
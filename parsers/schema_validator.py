@@ -0,0 +1,149 @@
+# parsers/schema_validator.py
+
+import re
+from typing import Any, Callable, Dict, List, Tuple
+
+# (path, message) pairs; the path is dotted from the root, e.g. 'attributes.color' or 'tags[2]'
+SchemaErrors = List[Tuple[str, str]]
+Validator = Callable[[Any], SchemaErrors]
+
+_TYPE_CHECKS = {
+    'object': lambda v: isinstance(v, dict),
+    'array': lambda v: isinstance(v, list),
+    'string': lambda v: isinstance(v, str),
+    'number': lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    'integer': lambda v: isinstance(v, int) and not isinstance(v, bool),
+    'boolean': lambda v: isinstance(v, bool),
+    'null': lambda v: v is None,
+}
+
+
+def compile_schema(schema: Dict[str, Any]) -> Validator:
+    """
+    Compiles a JSON schema into a validator function, once, so validating a response is just a
+    series of closure calls. Supports the subset of JSON Schema used for task outputs:
+    type, properties, required, items, enum, minLength, maxLength, pattern, minimum, maximum,
+    minItems and maxItems.
+
+    Args:
+        schema (Dict[str, Any]): The JSON schema.
+
+    Returns:
+        Validator: Function returning a list of (path, message) errors; empty when the value is valid.
+    """
+    check = _compile(schema)
+
+    def validate(value: Any) -> SchemaErrors:
+        errors: SchemaErrors = []
+        check(value, '', errors)
+        return errors
+
+    return validate
+
+
+def top_level_fields(errors: SchemaErrors) -> List[str]:
+    """
+    Returns the distinct top-level field names that errors point at, in order of appearance.
+    An error on the root itself yields '' (the whole value is invalid).
+    """
+    fields = []
+    for path, _ in errors:
+        field = re.split(r'[.\[]', path, maxsplit=1)[0]
+        if field not in fields:
+            fields.append(field)
+    return fields
+
+
+def _compile(schema: Dict[str, Any]) -> Callable[[Any, str, SchemaErrors], None]:
+    checks: List[Callable[[Any, str, SchemaErrors], bool]] = []
+
+    expected = schema.get('type')
+    if expected:
+        types = [expected] if isinstance(expected, str) else list(expected)
+        type_checks = [_TYPE_CHECKS[t] for t in types]
+
+        def check_type(value, path, errors):
+            if any(type_check(value) for type_check in type_checks):
+                return True
+            errors.append((path, f"expected {' or '.join(types)}, got {type(value).__name__}"))
+            return False
+        checks.append(check_type)
+
+    if 'enum' in schema:
+        allowed = list(schema['enum'])
+
+        def check_enum(value, path, errors):
+            if value not in allowed:
+                errors.append((path, f"must be one of {allowed}"))
+            return True
+        checks.append(check_enum)
+
+    min_length, max_length = schema.get('minLength'), schema.get('maxLength')
+    pattern = re.compile(schema['pattern']) if 'pattern' in schema else None
+    if min_length is not None or max_length is not None or pattern is not None:
+        def check_string(value, path, errors):
+            if not isinstance(value, str):
+                return True
+            if min_length is not None and len(value) < min_length:
+                errors.append((path, f"shorter than {min_length} characters"))
+            if max_length is not None and len(value) > max_length:
+                errors.append((path, f"longer than {max_length} characters"))
+            if pattern is not None and not pattern.search(value):
+                errors.append((path, f"does not match pattern '{pattern.pattern}'"))
+            return True
+        checks.append(check_string)
+
+    minimum, maximum = schema.get('minimum'), schema.get('maximum')
+    if minimum is not None or maximum is not None:
+        def check_range(value, path, errors):
+            if not _TYPE_CHECKS['number'](value):
+                return True
+            if minimum is not None and value < minimum:
+                errors.append((path, f"less than minimum {minimum}"))
+            if maximum is not None and value > maximum:
+                errors.append((path, f"greater than maximum {maximum}"))
+            return True
+        checks.append(check_range)
+
+    properties = {name: _compile(sub) for name, sub in schema.get('properties', {}).items()}
+    required = list(schema.get('required', []))
+    if properties or required:
+        def check_object(value, path, errors):
+            if not isinstance(value, dict):
+                return True
+            for name in required:
+                if name not in value or value[name] is None:
+                    errors.append((_join(path, name), "is required"))
+            for name, sub_check in properties.items():
+                if name in value and value[name] is not None:
+                    sub_check(value[name], _join(path, name), errors)
+            return True
+        checks.append(check_object)
+
+    item_check = _compile(schema['items']) if isinstance(schema.get('items'), dict) else None
+    min_items, max_items = schema.get('minItems'), schema.get('maxItems')
+    if item_check or min_items is not None or max_items is not None:
+        def check_array(value, path, errors):
+            if not isinstance(value, list):
+                return True
+            if min_items is not None and len(value) < min_items:
+                errors.append((path, f"fewer than {min_items} items"))
+            if max_items is not None and len(value) > max_items:
+                errors.append((path, f"more than {max_items} items"))
+            if item_check:
+                for index, item in enumerate(value):
+                    item_check(item, f"{path}[{index}]", errors)
+            return True
+        checks.append(check_array)
+
+    def run(value, path, errors):
+        for check in checks:
+            # A type mismatch makes the remaining keyword checks meaningless
+            if not check(value, path, errors):
+                return
+
+    return run
+
+
+def _join(path: str, name: str) -> str:
+    return f"{path}.{name}" if path else name
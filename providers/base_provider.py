@@ -1,5 +1,9 @@
 # providers/base_provider.py
 
 class BaseProvider:
+    # Format of inline image parts the provider accepts via create_chat_completion(images=...)
+    # ('gemini', 'claude'); None if it takes no images.
+    image_format = None
+
     def create_chat_completion(self, model: str, messages: list, temperature: float, max_tokens: int):
         raise NotImplementedError("This method should be overridden by subclasses.")
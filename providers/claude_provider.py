@@ -7,6 +7,9 @@ from providers.base_provider import BaseProvider
 
 
 class ClaudeProvider(BaseProvider):
+    # Inline image part format (see entrypoint/image_fetcher.py)
+    image_format = 'claude'
+
     def __init__(self, model='claude-3-haiku', api_base=None, version=None, max_tokens=None):
         self.logger = logging.getLogger(self.__class__.__name__)
         self.api_key = os.getenv("ELEMENTS_API_KEY_CLAUDE")
@@ -27,7 +30,7 @@ class ClaudeProvider(BaseProvider):
             'Content-Type': 'application/json'
         }
 
-    def create_chat_completion(self, model_key: str, messages: list, temperature: float, max_tokens: int):
+    def create_chat_completion(self, model_key: str, messages: list, temperature: float, max_tokens: int, images: list = None):
 
         # Combine the content of the messages into a single prompt string
         prompt = ""
@@ -43,7 +46,9 @@ class ClaudeProvider(BaseProvider):
                 "messages"         : [
                     {
                         "role"   : "user",
+                        # Prefetched images (base64 image blocks) go before the text
                         "content": [
+                            *(images or []),
                             {
                                 "type": "text",
                                 "text": prompt
@@ -66,7 +71,11 @@ class ClaudeProvider(BaseProvider):
             response.raise_for_status()
             response_data = response.json()
             content = response_data['content'][0]['text']
-            return {"choices": [{"message": {"content": content}}]}
+            usage = response_data.get('usage') or {}
+            return {
+                "choices": [{"message": {"content": content}}],
+                "usage": {"prompt_tokens": usage.get('input_tokens'), "completion_tokens": usage.get('output_tokens')}
+            }
         except requests.exceptions.RequestException as e:
             self.logger.error("Error creating Claude raw predict: %s", str(e))
             raise
\ No newline at end of file
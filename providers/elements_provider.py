@@ -80,7 +80,11 @@ class ElementsProvider(BaseProvider):
             response_data = response.json()
             content = response_data.get('choices', [{}])[
                 0].get('text', '')  # Adjusted based on expected response format
-            return {"choices": [{"message": {"content": content}}]}
+            usage = response_data.get('usage') or {}
+            return {
+                "choices": [{"message": {"content": content}}],
+                "usage": {"prompt_tokens": usage.get('prompt_tokens'), "completion_tokens": usage.get('completion_tokens')}
+            }
         except requests.exceptions.RequestException as e:
             self.logger.error("Error creating chat completion for model '%s': %s", model_key, str(e))
             raise
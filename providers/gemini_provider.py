@@ -8,6 +8,9 @@ import json
 
 
 class GeminiProvider(BaseProvider):
+    # Inline image part format (see entrypoint/image_fetcher.py)
+    image_format = 'gemini'
+
     def __init__(self, model='gemini-1.5-flash', api_base=None, version=None, temperature=None, max_tokens=None):
         self.logger = logging.getLogger(self.__class__.__name__)
         self.api_key = os.getenv("GEMINI_API_KEY")
@@ -59,9 +62,11 @@ class GeminiProvider(BaseProvider):
             "topP"           : 1
         }
 
-    def create_chat_completion(self, model: str, messages: list, temperature: float, max_tokens: int):
+    def create_chat_completion(self, model: str, messages: list, temperature: float, max_tokens: int, images: list = None):
         try:
             parts = [{"text": msg['content']} for msg in messages]
+            # Prefetched images as inline_data parts
+            parts.extend(images or [])
             payload = {
                 "model"        : model,
                 "task"         : "generateContent",
@@ -94,7 +99,11 @@ class GeminiProvider(BaseProvider):
             response.raise_for_status()
             response_data = response.json()
             content = response_data['candidates'][0]['content']['parts'][0]['text']  # Adjusted based on the expected response format
-            return {"choices": [{"message": {"content": content}}]}
+            usage = response_data.get('usageMetadata') or {}
+            return {
+                "choices": [{"message": {"content": content}}],
+                "usage": {"prompt_tokens": usage.get('promptTokenCount'), "completion_tokens": usage.get('candidatesTokenCount')}
+            }
         except requests.exceptions.RequestException as e:
             self.logger.error("Error creating Gemini chat completion: %s", str(e))
             raise
\ No newline at end of file
@@ -80,7 +80,11 @@ class OpenAIProvider(BaseProvider):
             response.raise_for_status()
             response_data = response.json()
             content = response_data['choices'][0]['message']['content']
-            return {"choices": [{"message": {"content": content}}]}
+            usage = response_data.get('usage') or {}
+            return {
+                "choices": [{"message": {"content": content}}],
+                "usage": {"prompt_tokens": usage.get('prompt_tokens'), "completion_tokens": usage.get('completion_tokens')}
+            }
         except requests.exceptions.RequestException as e:
             self.logger.error("Error creating OpenAI chat completion (%s): %s",str(model), str(e))
             raise
@@ -1,10 +1,17 @@
-from providers.claude_provider import ClaudeProvider
-from providers.local_provider import LocalProvider
-from providers.elements_provider import ElementsProvider
-from providers.openai_provider import OpenAIProvider
-from providers.runpod_provider import RunPodProvider
-from providers.gemini_provider import GeminiProvider
 import logging
+from utils.dynamic_import import dynamic_import
+
+
+# Provider type -> class path. Modules are imported on first use, so SDKs of provider types that
+# no active ProviderConfig uses (e.g. openai for local/runpod) are never loaded.
+PROVIDER_REGISTRY = {
+    "openai": "providers.openai_provider.OpenAIProvider",
+    "runpod": "providers.runpod_provider.RunPodProvider",
+    "gemini": "providers.gemini_provider.GeminiProvider",
+    "claude": "providers.claude_provider.ClaudeProvider",
+    "elements_openai": "providers.elements_provider.ElementsProvider",
+    "local": "providers.local_provider.LocalProvider",
+}
 
 
 class ProviderFactory:
@@ -13,42 +20,41 @@ class ProviderFactory:
     # Set default logging configuration
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
-   
+    # Provider type -> resolved class
+    _classes = {}
+
+    @staticmethod
+    def register(provider_name, class_path):
+        """
+        Registers (or replaces) a provider type by the dotted path of its class.
+        """
+        PROVIDER_REGISTRY[provider_name] = class_path
+        ProviderFactory._classes.pop(provider_name, None)
 
+    @staticmethod
+    def get_provider_class(provider_name):
+        provider_class = ProviderFactory._classes.get(provider_name)
+        if provider_class is None:
+            class_path = PROVIDER_REGISTRY.get(provider_name)
+            if class_path is None:
+                ProviderFactory.logger.error(f"Unsupported provider: {provider_name}")
+                raise ValueError(f"Unsupported provider: {provider_name}")
+            provider_class = ProviderFactory._classes[provider_name] = dynamic_import(class_path)
+            ProviderFactory.logger.debug(f"Loaded provider type '{provider_name}' from {class_path}")
+        return provider_class
 
     @staticmethod
     def create_provider(provider_name, **kwargs):
-        if provider_name == "openai":
-            ProviderFactory.logger.debug(f"Creating OpenAI provider ")
-            clean_kwargs = ProviderFactory.filter_kwargs(OpenAIProvider, kwargs)
-            return OpenAIProvider(**clean_kwargs)
-        elif provider_name == "runpod":
-            ProviderFactory.logger.info(f"Creating RunPod provider ")
-            clean_kwargs = ProviderFactory.filter_kwargs(RunPodProvider, kwargs)
-            return RunPodProvider(**clean_kwargs)
-        elif provider_name == "gemini":
-            ProviderFactory.logger.info(f"Creating Gemini provider")
-            clean_kwargs = ProviderFactory.filter_kwargs(GeminiProvider, kwargs)
-            # model = kwargs.get('model', 'gemini-1.5-flash')
-            return GeminiProvider(**clean_kwargs)
-        elif provider_name=="claude":
-            ProviderFactory.logger.info(f"Creating Claude provider")
-            clean_kwargs = ProviderFactory.filter_kwargs(ClaudeProvider, kwargs)
-            return ClaudeProvider(**clean_kwargs)
-        elif provider_name=="elements_openai":
-            # ProviderFactory.logger.info(f"Creating elements_openai provider")
-            clean_kwargs = ProviderFactory.filter_kwargs(ElementsProvider, kwargs)
-            model = kwargs.get('model', 'Unknown')
-            ProviderFactory.logger.info(f"Creating {model} provider")
-            return ElementsProvider(**clean_kwargs)
-        elif provider_name=="local":
+        provider_class = ProviderFactory.get_provider_class(provider_name)
+        if provider_name == "local":
             ProviderFactory.logger.info(f"Creating Local provider")
-            provider_port = kwargs.get("provider_port")
-            return LocalProvider(port=provider_port)
+            return provider_class(port=kwargs.get("provider_port"))
+        clean_kwargs = ProviderFactory.filter_kwargs(provider_class, kwargs)
+        if provider_name == "elements_openai":
+            ProviderFactory.logger.info(f"Creating {kwargs.get('model', 'Unknown')} provider")
         else:
-            ProviderFactory.logger.error(f"Unsupported provider: {provider_name}")
-            raise ValueError(f"Unsupported provider: {provider_name}")
-
+            ProviderFactory.logger.info(f"Creating {provider_class.__name__}")
+        return provider_class(**clean_kwargs)
 
     @staticmethod
     def filter_kwargs(provider_class, kwargs):
@@ -56,4 +62,4 @@ class ProviderFactory:
         import inspect
         signature = inspect.signature(provider_class.__init__)
         valid_kwargs = {k: v for k, v in kwargs.items() if k in signature.parameters}
-        return valid_kwargs
\ No newline at end of file
+        return valid_kwargs
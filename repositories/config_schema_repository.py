@@ -0,0 +1,42 @@
+# repositories/config_schema_repository.py
+import logging
+from typing import List, Tuple
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import Session
+from models.models import GenerationTask, EvaluationTask, ProviderConfig
+
+# Columns added to the configuration tables since they were first created: (model, column, SQL type).
+# Every new column of these tables must be listed here, or existing databases fail to load it.
+ADDED_COLUMNS: List[Tuple[type, str, str]] = [
+    (GenerationTask, 'output_schema', 'TEXT'),
+    (EvaluationTask, 'output_schema', 'TEXT'),
+    (ProviderConfig, 'cost_tier', 'INTEGER'),
+]
+
+
+class ConfigSchemaRepository:
+    def __init__(self, db_session: Session):
+        """
+        Keeps the configuration tables (tasks, providers, ...) in line with the models. The tables
+        are managed outside the service, so only missing nullable columns are added.
+        """
+        self.db_session = db_session
+        self.logger = logging.getLogger(__name__)
+
+    def ensure_schema(self) -> None:
+        """
+        Adds the columns in ADDED_COLUMNS that an existing table lacks. Tables that do not exist are
+        left alone. Safe to run on every start.
+        """
+        bind = self.db_session.get_bind()
+        inspector = inspect(bind)
+        tables = set(inspector.get_table_names())
+        for model, column, column_type in ADDED_COLUMNS:
+            table = model.__tablename__
+            if table not in tables:
+                continue
+            if column in {c['name'] for c in inspector.get_columns(table)}:
+                continue
+            with bind.begin() as connection:
+                connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}"))
+            self.logger.info(f"Added column '{column}' to table '{table}'.")
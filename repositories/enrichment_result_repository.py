@@ -0,0 +1,82 @@
+# repositories/enrichment_result_repository.py
+from typing import Any, Dict, List, Tuple
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import Session
+from models.models import EnrichmentResult
+
+
+class EnrichmentResultRepository:
+    def __init__(self, db_session: Session):
+        self.db_session = db_session
+
+    def ensure_schema(self) -> None:
+        """
+        Creates the enrichment_results table (and its index) if it does not exist yet, and adds
+        columns introduced since an existing table was created.
+        """
+        bind = self.db_session.get_bind()
+        EnrichmentResult.__table__.create(bind=bind, checkfirst=True)
+        existing = {column['name'] for column in inspect(bind).get_columns(EnrichmentResult.__tablename__)}
+        if 'input_fingerprint' not in existing:
+            with bind.begin() as connection:
+                connection.execute(text(f"ALTER TABLE {EnrichmentResult.__tablename__} "
+                                        f"ADD COLUMN input_fingerprint VARCHAR(64)"))
+
+    def latest_results(self, item_id: str, task_names: List[str]) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """
+        Returns the most recent successfully parsed result per (task, handler) for an item.
+
+        Args:
+            item_id (str): The item.
+            task_names (List[str]): Tasks to look up.
+
+        Returns:
+            Dict[Tuple[str, str], Dict[str, Any]]: (task name, handler name) -> {'input_fingerprint',
+            'parsed_response', 'created_at'}.
+        """
+        if not task_names:
+            return {}
+        rows = self.db_session.query(EnrichmentResult).filter(
+            EnrichmentResult.item_id == item_id,
+            EnrichmentResult.task_name.in_(task_names),
+            EnrichmentResult.parse_status == 'ok',
+        ).order_by(EnrichmentResult.created_at.desc(), EnrichmentResult.result_id.desc()).all()
+        latest = {}
+        for row in rows:
+            latest.setdefault((row.task_name, row.handler_name), {
+                'input_fingerprint': row.input_fingerprint,
+                'parsed_response': row.parsed_response,
+                'created_at': row.created_at.isoformat() if row.created_at else None,
+            })
+        return latest
+
+    def bulk_insert(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Inserts result rows in a single transaction.
+
+        Args:
+            rows (List[Dict[str, Any]]): Column-name keyed dicts for EnrichmentResult.
+
+        Returns:
+            int: Number of rows written.
+        """
+        if not rows:
+            return 0
+        try:
+            self.db_session.execute(EnrichmentResult.__table__.insert(), rows)
+            self.db_session.commit()
+        except Exception:
+            self.db_session.rollback()
+            raise
+        return len(rows)
+
+    async def async_bulk_insert(self, async_session_factory, rows: List[Dict[str, Any]]) -> int:
+        """
+        Same as bulk_insert, through an AsyncSession (see models.database.create_async_session_factory).
+        """
+        if not rows:
+            return 0
+        async with async_session_factory() as session:
+            async with session.begin():
+                await session.execute(EnrichmentResult.__table__.insert(), rows)
+        return len(rows)
@@ -0,0 +1,151 @@
+# repositories/job_repository.py
+import uuid
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from sqlalchemy import or_, and_
+from sqlalchemy.orm import Session
+from models.models import EnrichmentJob
+
+
+class JobRepository:
+    def __init__(self, db_session: Session):
+        """
+        Durable enrichment job queue on top of the enrichment_jobs table.
+
+        A worker leases a job by moving it to 'running' with a lease owner and expiry in a single
+        conditional UPDATE, so concurrent workers (threads or processes sharing the database) never
+        both win the same job. A job whose lease expires without completion - its worker crashed or
+        the pod restarted - becomes visible to other workers again.
+        """
+        self.db_session = db_session
+        self.logger = logging.getLogger(__name__)
+
+    def ensure_schema(self) -> None:
+        EnrichmentJob.__table__.create(bind=self.db_session.get_bind(), checkfirst=True)
+
+    def enqueue(self, payload: Dict[str, Any], callback_url: Optional[str] = None, max_attempts: int = 3) -> str:
+        """
+        Stores a new job and returns its id.
+        """
+        now = datetime.utcnow()
+        job = EnrichmentJob(job_id=str(uuid.uuid4()), status='queued', payload=payload, callback_url=callback_url,
+                            attempts=0, max_attempts=max_attempts, created_at=now, updated_at=now)
+        try:
+            self.db_session.add(job)
+            self.db_session.commit()
+        except Exception:
+            self.db_session.rollback()
+            raise
+        return job.job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self.db_session.query(EnrichmentJob).filter_by(job_id=job_id).first()
+        return self._to_dict(job) if job else None
+
+    def lease(self, worker_id: str, lease_seconds: float, candidates: int = 5) -> Optional[Dict[str, Any]]:
+        """
+        Claims the oldest available job: queued, or running with an expired lease and attempts left.
+        Expired jobs that have used all their attempts (their worker kept dying, e.g. OOM-killed) are
+        marked failed first instead of being retried forever.
+
+        Args:
+            worker_id (str): Lease owner recorded on the job.
+            lease_seconds (float): Visibility timeout; the worker must heartbeat or finish before it expires.
+            candidates (int): Jobs tried per call when other workers win the race for the first ones.
+
+        Returns:
+            Optional[Dict[str, Any]]: The leased job, or None if nothing is available.
+        """
+        now = datetime.utcnow()
+        expired = and_(EnrichmentJob.status == 'running', EnrichmentJob.lease_expires_at < now)
+        available = or_(EnrichmentJob.status == 'queued',
+                        and_(expired, EnrichmentJob.attempts < EnrichmentJob.max_attempts))
+        try:
+            exhausted = self.db_session.query(EnrichmentJob).filter(
+                expired, EnrichmentJob.attempts >= EnrichmentJob.max_attempts).update({
+                    'status': 'failed',
+                    'error': 'Lease expired on the last attempt (the worker stopped without reporting)',
+                    'lease_owner': None,
+                    'lease_expires_at': None,
+                    'updated_at': now,
+                    'completed_at': now,
+                }, synchronize_session=False)
+            self.db_session.commit()
+            if exhausted:
+                self.logger.warning(f"Marked {exhausted} jobs failed after their last attempt's lease expired.")
+            job_ids = [row.job_id for row in self.db_session.query(EnrichmentJob.job_id)
+                       .filter(available).order_by(EnrichmentJob.created_at).limit(candidates)]
+            for job_id in job_ids:
+                claimed = self.db_session.query(EnrichmentJob).filter(EnrichmentJob.job_id == job_id, available).update({
+                    'status': 'running',
+                    'lease_owner': worker_id,
+                    'lease_expires_at': now + timedelta(seconds=lease_seconds),
+                    'attempts': EnrichmentJob.attempts + 1,
+                    'updated_at': now,
+                }, synchronize_session=False)
+                self.db_session.commit()
+                if claimed:
+                    return self.get(job_id)
+            return None
+        except Exception:
+            self.db_session.rollback()
+            raise
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """
+        Extends a lease. Returns False if the worker no longer owns the job.
+        """
+        now = datetime.utcnow()
+        return self._update_owned(job_id, worker_id, {'lease_expires_at': now + timedelta(seconds=lease_seconds),
+                                                      'updated_at': now})
+
+    def complete(self, job_id: str, worker_id: str, result: Any) -> bool:
+        now = datetime.utcnow()
+        return self._update_owned(job_id, worker_id, {'status': 'succeeded', 'result': result, 'error': None,
+                                                      'lease_owner': None, 'lease_expires_at': None,
+                                                      'updated_at': now, 'completed_at': now})
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> Optional[str]:
+        """
+        Records a failed attempt: the job is re-queued while attempts remain, otherwise marked failed.
+
+        Returns:
+            Optional[str]: The new status, or None if the worker no longer owns the job.
+        """
+        job = self.db_session.query(EnrichmentJob).filter_by(job_id=job_id).first()
+        if job is None:
+            return None
+        status = 'queued' if job.attempts < job.max_attempts else 'failed'
+        now = datetime.utcnow()
+        updated = self._update_owned(job_id, worker_id, {
+            'status': status, 'error': error, 'lease_owner': None, 'lease_expires_at': None, 'updated_at': now,
+            'completed_at': now if status == 'failed' else None})
+        return status if updated else None
+
+    def _update_owned(self, job_id: str, worker_id: str, values: Dict[str, Any]) -> bool:
+        try:
+            updated = self.db_session.query(EnrichmentJob).filter(
+                EnrichmentJob.job_id == job_id, EnrichmentJob.lease_owner == worker_id,
+                EnrichmentJob.status == 'running').update(values, synchronize_session=False)
+            self.db_session.commit()
+        except Exception:
+            self.db_session.rollback()
+            raise
+        return bool(updated)
+
+    @staticmethod
+    def _to_dict(job: EnrichmentJob) -> Dict[str, Any]:
+        return {
+            'job_id': job.job_id,
+            'status': job.status,
+            'payload': job.payload,
+            'result': job.result or None,
+            'error': job.error,
+            'attempts': job.attempts,
+            'max_attempts': job.max_attempts,
+            'callback_url': job.callback_url,
+            'created_at': job.created_at.isoformat() if job.created_at else None,
+            'updated_at': job.updated_at.isoformat() if job.updated_at else None,
+            'completed_at': job.completed_at.isoformat() if job.completed_at else None,
+        }
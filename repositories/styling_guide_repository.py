@@ -23,6 +23,17 @@ class StylingGuideRepository:
             result[product_type][task_name] = content
         return result
 
+    def fetch_active_styling_guide_versions(self) -> Dict[str, Dict[str, int]]:
+        """
+        Returns the version of every active styling guide, in the same shape as fetch_active_styling_guides:
+        { product_type: {task_name: version} }
+        """
+        styling_guides = self.db_session.query(StylingGuide).filter_by(is_active=True).all()
+        result = {}
+        for sg in styling_guides:
+            result.setdefault(sg.product_type.strip().lower(), {})[sg.task_name.strip().lower()] = sg.version or 1
+        return result
+
     def get_styling_guide(self, product_type: str, task_name: str) -> str:
         """
         If direct access needed in future. Not used now since we load from the manager.
@@ -1,8 +1,39 @@
 # repositories/template_repository.py
-from typing import Optional, Dict, Any
+from functools import lru_cache
+from typing import Optional, Dict, Any, FrozenSet
 from sqlalchemy.orm import Session
 from models.models import ModelFamily, GenerationTask, EvaluationTask, GenerationPromptTemplate, EvaluationPromptTemplate
-from jinja2 import Environment, exceptions
+from jinja2 import Environment, exceptions, meta
+
+_jinja_env = Environment()
+
+
+@lru_cache(maxsize=256)
+def _compile_template(template_content: str):
+    return _jinja_env.from_string(template_content)
+
+
+def render_template(template_content: str, context: Dict[str, Any]) -> Optional[str]:
+    """
+    Renders template text with Jinja2. Module-level (and picklable) so it can run in a worker process;
+    compiled templates are cached per process by their text.
+    """
+    try:
+        return _compile_template(template_content).render(context)
+    except exceptions.TemplateError:
+        return None
+
+
+@lru_cache(maxsize=256)
+def template_variables(template_content: str) -> FrozenSet[str]:
+    """
+    Names of the context variables a template reads (empty if it does not parse).
+    """
+    try:
+        return frozenset(meta.find_undeclared_variables(_jinja_env.parse(template_content)))
+    except exceptions.TemplateError:
+        return frozenset()
+
 
 class TemplateRepository:
     def __init__(self, db_session: Session):
@@ -10,6 +41,14 @@ class TemplateRepository:
         self.jinja_env = Environment()
 
     def get_template_text(self, task_name: str, task_type: str, model_family_name: Optional[str]) -> Optional[str]:
+        template = self.get_template(task_name, task_type, model_family_name)
+        return template['text'] if template else None
+
+    def get_template(self, task_name: str, task_type: str, model_family_name: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Returns the latest template version for a task and model family as
+        {'text', 'version', 'placeholders'}, or None if there is none.
+        """
         if model_family_name:
             model_family = self.db_session.query(ModelFamily).filter_by(name=model_family_name).first()
             if not model_family:
@@ -39,12 +78,8 @@ class TemplateRepository:
         ).order_by(template_class.version.desc())
         template = query.first()
         if template:
-            return template.template_text
+            return {'text': template.template_text, 'version': template.version, 'placeholders': template.placeholders}
         return None
 
     def render_template(self, template_content: str, context: Dict[str, Any]) -> Optional[str]:
-        try:
-            template = self.jinja_env.from_string(template_content)
-            return template.render(context)
-        except exceptions.TemplateError:
-            return None
+        return render_template(template_content, context)
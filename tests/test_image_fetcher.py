@@ -0,0 +1,88 @@
+# tests/test_image_fetcher.py
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from entrypoint.image_fetcher import ImageFetcher
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 64
+ETAG = '"v1"'
+
+
+class _ImageHandler(BaseHTTPRequestHandler):
+    # path -> (content type, body, sends Content-Length)
+    routes = {
+        '/shirt.png': ('image/png', PNG, True),
+        '/large.png': ('image/png', b'\x00' * 4096, True),
+        '/streamed.png': ('image/png', b'\x00' * 4096, False),
+        '/page.html': ('text/html', b'<html></html>', True),
+    }
+
+    def do_GET(self):
+        self.server.requests.append((self.path, self.headers.get('If-None-Match')))
+        if self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        content_type, body, with_length = self.routes[self.path]
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('ETag', ETAG)
+        if with_length:
+            self.send_header('Content-Length', str(len(body)))
+        else:
+            # HTTP/1.0 response without a length: the body ends when the connection closes
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), _ImageHandler)
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _url(server, path):
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+
+def test_prefetch_fetches_each_url_once(server):
+    fetcher = ImageFetcher(max_bytes=1024)
+    url = _url(server, '/shirt.png')
+    images = asyncio.run(fetcher.prefetch([url, url, url]))
+    assert list(images) == [url]
+    assert images[url]['media_type'] == 'image/png' and images[url]['etag'] == ETAG
+    assert [path for path, _ in server.requests] == ['/shirt.png']
+
+
+def test_images_over_max_bytes_are_rejected(server):
+    fetcher = ImageFetcher(max_bytes=1024)
+    with pytest.raises(ValueError, match='limit'):
+        fetcher.fetch(_url(server, '/large.png'))
+    with pytest.raises(ValueError, match='limit'):
+        fetcher.fetch(_url(server, '/streamed.png'))
+
+
+def test_unsupported_types_are_rejected(server):
+    fetcher = ImageFetcher(max_bytes=1024)
+    with pytest.raises(ValueError, match='Unsupported image type'):
+        fetcher.fetch(_url(server, '/page.html'))
+    assert asyncio.run(fetcher.prefetch([_url(server, '/page.html')])) == {_url(server, '/page.html'): None}
+
+
+def test_expired_entries_are_revalidated_with_their_etag(server):
+    fetcher = ImageFetcher(max_bytes=1024, cache_ttl=0)
+    url = _url(server, '/shirt.png')
+    first = fetcher.fetch(url)
+    second = fetcher.fetch(url)
+    assert second is first
+    assert server.requests == [('/shirt.png', None), ('/shirt.png', ETAG)]
@@ -0,0 +1,53 @@
+# tests/test_prompt_manager.py
+from entrypoint.prompt_manager import PromptManager
+from repositories.template_repository import render_template
+
+TEMPLATE = {
+    'text': "Rewrite the title '{{ original_title }}' for a {{ product_type }}.\n\n{{ styling_guide }}",
+    'version': 3,
+    'placeholders': ['item_title', 'long_description'],
+}
+
+
+class _StylingGuides:
+    def get_normalized_styling_guide(self, product_type, task_name):
+        return 'Keep it short.'
+
+    def get_styling_guide_version(self, product_type, task_name):
+        return 1
+
+
+class _Templates:
+    def get_template(self, task_name, task_type, family_name):
+        return TEMPLATE
+
+    def render_template(self, template_content, context):
+        return render_template(template_content, context)
+
+
+class _Tasks:
+    def get_default_tasks(self, task_type):
+        return ['title_generation']
+
+    def get_conditional_tasks(self, task_type):
+        return {}
+
+    def is_task_defined(self, task_name, task_type):
+        return True
+
+    def get_task_config(self, task_name, task_type):
+        return {'output_format': 'json', 'max_tokens': 100}
+
+
+def _fingerprint(item):
+    manager = PromptManager(_StylingGuides(), _Templates(), _Tasks())
+    [prompt_task] = manager.generate_prompts(item, 'gpt', 'generation')
+    return prompt_task['input_fingerprint']
+
+
+def test_fingerprint_follows_the_item_text_the_template_reads():
+    item = {'product_type': 'shirt', 'item_title': 'Blue shirt', 'long_description': 'Soft cotton.', 'price': 10}
+    fingerprint = _fingerprint(item)
+    assert _fingerprint(dict(item, item_title='Red shirt')) != fingerprint
+    assert _fingerprint(dict(item, long_description='Heavy linen.')) != fingerprint
+    assert _fingerprint(dict(item, price=12)) == fingerprint
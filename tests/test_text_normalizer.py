@@ -0,0 +1,21 @@
+# tests/test_text_normalizer.py
+from utils.text_normalizer import normalize_text, strip_markup
+
+
+def test_comparison_signs_are_not_markup():
+    assert normalize_text('Use a < b and c > d') == 'Use a < b and c > d'
+    assert normalize_text('fits sizes < 10, loads > 5 kg') == 'fits sizes < 10, loads > 5 kg'
+
+
+def test_tags_comments_and_scripts_are_removed():
+    text = '<p>Soft <b>cotton</b></p><!-- internal --><script>var a = 1 < 2;</script>'
+    assert normalize_text(text) == 'Soft cotton'
+
+
+def test_list_items_become_lines():
+    assert strip_markup('<ul><li>One</li><li>Two</li></ul>').split() == ['-', 'One', '-', 'Two']
+
+
+def test_nested_lists_keep_their_indentation():
+    text = "Rules:\n- Title case   \n  - Brand first\n  - No   emojis\n\n\n\n    example: Acme Shirt"
+    assert normalize_text(text) == "Rules:\n- Title case\n  - Brand first\n  - No emojis\n\n    example: Acme Shirt"
@@ -0,0 +1,120 @@
+# utils/cpu_executor.py
+import os
+import asyncio
+import logging
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence
+
+
+class CPUExecutor:
+    MODES = ('inline', 'thread', 'process')
+
+    def __init__(self, mode: Optional[str] = None, max_workers: Optional[int] = None,
+                 inline_threshold: Optional[int] = None, batch_chunk_size: Optional[int] = None):
+        """
+        Routes CPU-bound work (template rendering, response parsing) away from the event loop.
+
+        Payloads smaller than ``inline_threshold`` characters run inline, since the hand-off
+        to a pool costs more than the work itself. Larger payloads go to a thread or process
+        pool depending on ``mode``. Batch work is always chunked across a process pool
+        (unless mode is 'inline'), as it is large enough to amortize pickling.
+
+        Functions submitted in 'process' mode, or through map_chunked, must be module-level
+        callables with picklable arguments.
+
+        Args:
+            mode (str): 'inline', 'thread' or 'process'. Defaults to CPU_EXECUTOR_MODE or 'thread'.
+            max_workers (int): Pool size. Defaults to CPU_EXECUTOR_WORKERS or the CPU count.
+            inline_threshold (int): Payload size (chars) below which work stays inline.
+                Defaults to CPU_OFFLOAD_MIN_CHARS or 2048.
+            batch_chunk_size (int): Items per chunk for map_chunked. Defaults to CPU_BATCH_CHUNK_SIZE or 64.
+        """
+        self.mode = (mode or os.getenv("CPU_EXECUTOR_MODE", "thread")).lower()
+        if self.mode not in self.MODES:
+            raise ValueError(f"Unsupported executor mode: {self.mode}")
+        self.max_workers = max_workers or int(os.getenv("CPU_EXECUTOR_WORKERS", str(os.cpu_count() or 2)))
+        self.inline_threshold = inline_threshold if inline_threshold is not None else int(os.getenv("CPU_OFFLOAD_MIN_CHARS", "2048"))
+        self.batch_chunk_size = batch_chunk_size or int(os.getenv("CPU_BATCH_CHUNK_SIZE", "64"))
+        self._pool: Optional[Executor] = None
+        self._batch_pool: Optional[Executor] = None
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def pool(self) -> Executor:
+        if self._pool is None:
+            if self.mode == 'process':
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="cpu-executor")
+            self.logger.info(f"Started {self.mode} pool with {self.max_workers} workers.")
+        return self._pool
+
+    @property
+    def batch_pool(self) -> Executor:
+        if self.mode == 'process':
+            return self.pool
+        if self._batch_pool is None:
+            self._batch_pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            self.logger.info(f"Started batch process pool with {self.max_workers} workers.")
+        return self._batch_pool
+
+    def should_offload(self, size: int) -> bool:
+        return self.mode != 'inline' and size >= self.inline_threshold
+
+    async def run(self, fn: Callable, *args, size: int = 0) -> Any:
+        """
+        Runs ``fn(*args)`` from async code, offloading it if ``size`` is large enough.
+        """
+        if not self.should_offload(size):
+            return fn(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.pool, fn, *args)
+
+    def run_sync(self, fn: Callable, *args, size: int = 0) -> Any:
+        """
+        Runs ``fn(*args)`` from synchronous code that is already off the event loop
+        (e.g. inside run_in_session), offloading it if ``size`` is large enough.
+        """
+        if not self.should_offload(size) or self.mode == 'thread':
+            # Already on a worker thread; another thread hop would only add overhead.
+            return fn(*args)
+        return self.pool.submit(fn, *args).result()
+
+    async def map_chunked(self, fn: Callable[[Sequence[Any]], List[Any]], items: Sequence[Any],
+                          chunk_size: Optional[int] = None) -> List[Any]:
+        """
+        Applies a chunk-level function across ``items`` in parallel processes.
+
+        Args:
+            fn: Module-level callable taking a list of items and returning one result per item.
+            items: The items to process.
+            chunk_size: Items per chunk. Defaults to batch_chunk_size.
+
+        Returns:
+            List[Any]: Results in the same order as ``items``.
+        """
+        items = list(items)
+        if not items:
+            return []
+        if self.mode == 'inline':
+            return fn(items)
+        chunk_size = chunk_size or self.batch_chunk_size
+        loop = asyncio.get_running_loop()
+        chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+        chunk_results = await asyncio.gather(*(loop.run_in_executor(self.batch_pool, fn, chunk) for chunk in chunks))
+        return [result for chunk in chunk_results for result in chunk]
+
+    def shutdown(self) -> None:
+        for pool in (self._pool, self._batch_pool):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+        self._batch_pool = None
+
+    def reset_after_fork(self) -> None:
+        """
+        Forgets pools inherited from a parent process (their worker threads/processes do not exist
+        in a forked child); new pools are started on first use.
+        """
+        self._pool = None
+        self._batch_pool = None
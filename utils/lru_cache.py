@@ -0,0 +1,59 @@
+# utils/lru_cache.py
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable
+
+# Sentinel returned by LRUCache.get when a key is absent, so that callers can
+# memoize ``None`` (e.g. negative lookups) and still tell it apart from a miss.
+MISSING = object()
+
+
+class LRUCache:
+    def __init__(self, maxsize: int = 1024):
+        """
+        A small thread-safe, size-bounded LRU cache.
+
+        Args:
+            maxsize (int): Maximum number of entries kept before the least recently used one is evicted.
+        """
+        if maxsize <= 0:
+            raise ValueError("maxsize must be a positive integer.")
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
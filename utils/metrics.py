@@ -0,0 +1,99 @@
+# utils/metrics.py
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+Labels = Optional[Dict[str, str]]
+
+
+def _key(name: str, labels: Labels) -> Tuple[str, Tuple[Tuple[str, str], ...]]:
+    return name, tuple(sorted((labels or {}).items()))
+
+
+class MetricsRegistry:
+    def __init__(self):
+        """
+        Minimal in-process metrics registry: counters, gauges and summaries (count/sum/min/max),
+        each optionally labelled. Exposed as JSON by the /metrics endpoint.
+        """
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple, float] = {}
+        self._gauges: Dict[Tuple, float] = {}
+        self._summaries: Dict[Tuple, Dict[str, float]] = {}
+
+    def inc(self, name: str, labels: Labels = None, value: float = 1) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, labels: Labels = None) -> None:
+        with self._lock:
+            self._gauges[_key(name, labels)] = value
+
+    def observe(self, name: str, value: float, labels: Labels = None) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                self._summaries[key] = {'count': 1, 'sum': value, 'min': value, 'max': value}
+            else:
+                summary['count'] += 1
+                summary['sum'] += value
+                summary['min'] = min(summary['min'], value)
+                summary['max'] = max(summary['max'], value)
+
+    def get_counter(self, name: str, labels: Labels = None) -> float:
+        with self._lock:
+            return self._counters.get(_key(name, labels), 0)
+
+    def counters_by_label(self, name: str, label: str) -> Dict[str, float]:
+        """
+        Sums a counter over all label sets, grouped by the value of one label.
+        """
+        totals: Dict[str, float] = {}
+        with self._lock:
+            for (counter_name, labels), value in self._counters.items():
+                if counter_name != name:
+                    continue
+                label_value = dict(labels).get(label)
+                if label_value is not None:
+                    totals[label_value] = totals.get(label_value, 0) + value
+        return totals
+
+    def counters_by_labels(self, name: str, labels: Tuple[str, ...]) -> Dict[Tuple[str, ...], float]:
+        """
+        Sums a counter over all label sets, grouped by the values of several labels (label sets
+        missing any of them are left out).
+        """
+        totals: Dict[Tuple[str, ...], float] = {}
+        with self._lock:
+            for (counter_name, label_set), value in self._counters.items():
+                if counter_name != name:
+                    continue
+                label_set = dict(label_set)
+                if all(label in label_set for label in labels):
+                    group = tuple(label_set[label] for label in labels)
+                    totals[group] = totals.get(group, 0) + value
+        return totals
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'counters': [self._entry(key, value) for key, value in self._counters.items()],
+                'gauges': [self._entry(key, value) for key, value in self._gauges.items()],
+                'summaries': [self._entry(key, dict(value)) for key, value in self._summaries.items()],
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._summaries.clear()
+
+    @staticmethod
+    def _entry(key, value) -> Dict[str, Any]:
+        name, labels = key
+        return {'name': name, 'labels': dict(labels), 'value': value}
+
+
+# Process-wide registry
+metrics = MetricsRegistry()
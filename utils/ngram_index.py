@@ -0,0 +1,68 @@
+# utils/ngram_index.py
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Set
+
+
+class NGramIndex:
+    def __init__(self, n: int = 3):
+        """
+        Character n-gram inverted index used to shortlist fuzzy-match candidates.
+
+        Instead of scoring a query against every known term (difflib over the whole
+        vocabulary), only terms sharing at least one n-gram with the query are
+        considered, ranked by their Dice coefficient over n-gram sets.
+
+        Args:
+            n (int): The n-gram length. Defaults to trigrams.
+        """
+        self.n = n
+        self.terms: List[str] = []
+        self._term_grams: List[Set[str]] = []
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+
+    def ngrams(self, text: str) -> Set[str]:
+        padded = f"{' ' * (self.n - 1)}{text} "
+        return {padded[i:i + self.n] for i in range(len(padded) - self.n + 1)}
+
+    def add(self, term: str) -> None:
+        term_id = len(self.terms)
+        grams = self.ngrams(term)
+        self.terms.append(term)
+        self._term_grams.append(grams)
+        for gram in grams:
+            self._postings[gram].add(term_id)
+
+    def build(self, terms: Iterable[str]) -> "NGramIndex":
+        self.terms = []
+        self._term_grams = []
+        self._postings = defaultdict(set)
+        for term in terms:
+            self.add(term)
+        return self
+
+    def candidates(self, query: str, limit: int = 10) -> List[str]:
+        """
+        Returns up to ``limit`` indexed terms sharing the most n-grams with ``query``.
+
+        Args:
+            query (str): The (normalized) string to look up.
+            limit (int): Maximum number of candidates to return.
+
+        Returns:
+            List[str]: Candidate terms, best first.
+        """
+        query_grams = self.ngrams(query)
+        overlap = Counter()
+        for gram in query_grams:
+            for term_id in self._postings.get(gram, ()):
+                overlap[term_id] += 1
+
+        scored = []
+        for term_id, shared in overlap.items():
+            dice = 2.0 * shared / (len(query_grams) + len(self._term_grams[term_id]))
+            scored.append((dice, term_id))
+        scored.sort(key=lambda s: (-s[0], s[1]))
+        return [self.terms[term_id] for _, term_id in scored[:limit]]
+
+    def __len__(self) -> int:
+        return len(self.terms)
@@ -0,0 +1,35 @@
+# utils/process_info.py
+import os
+import resource
+from typing import Dict
+
+# smaps_rollup fields (kB) summed into each reported figure
+_SMAPS_FIELDS = {
+    'rss_bytes': ('Rss',),
+    'shared_bytes': ('Shared_Clean', 'Shared_Dirty'),
+    'private_bytes': ('Private_Clean', 'Private_Dirty'),
+}
+
+
+def memory_usage() -> Dict[str, int]:
+    """
+    Memory of the current process.
+
+    On Linux, resident memory is split into pages still shared with other processes (e.g. a forked
+    parent's copy-on-write heap) and private pages. Elsewhere only the peak RSS is available.
+
+    Returns:
+        Dict[str, int]: 'rss_bytes', plus 'shared_bytes' and 'private_bytes' when known.
+    """
+    try:
+        with open(f"/proc/{os.getpid()}/smaps_rollup") as f:
+            fields = {}
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1]) * 1024
+        return {name: sum(fields.get(field, 0) for field in source) for name, source in _SMAPS_FIELDS.items()}
+    except OSError:
+        # ru_maxrss is in kB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return {'rss_bytes': peak if os.uname().sysname == 'Darwin' else peak * 1024}
@@ -0,0 +1,94 @@
+# utils/text_normalizer.py
+import re
+import html
+from typing import List
+
+_DROP_BLOCKS = re.compile(r"<(script|style)\b[^<>]*>.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_COMMENTS = re.compile(r"<!--.*?-->", re.DOTALL)
+_LINE_BREAK_TAGS = re.compile(r"<\s*(br|/p|/div|/ul|/ol|/h[1-6]|/tr)\b[^<>]*>", re.IGNORECASE)
+_LIST_ITEM_TAGS = re.compile(r"<\s*li\b[^<>]*>", re.IGNORECASE)
+# Tag syntax only: a '<' starting a comparison ("sizes < 10") is text, not markup
+_TAGS = re.compile(r"</?[A-Za-z][A-Za-z0-9-]*\b[^<>]*>")
+_INLINE_SPACE = re.compile(r"[ \t\f\v ]+")
+_INDENT = re.compile(r"[ \t]*")
+_BLANK_LINES = re.compile(r"\n{3,}")
+_BULLET = re.compile(r"^\s*([-*•●▪]|\d+[.)])\s+")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(])")
+_KEY_CHARS = re.compile(r"[\W_]+")
+
+
+def strip_markup(text: str) -> str:
+    """
+    Removes HTML tags (and script/style blocks and comments) and decodes entities, keeping line
+    breaks and list items as lines. Other text between '<' and '>' is kept. Indentation is dropped
+    from text that contains tags, as it carries no meaning in HTML.
+    """
+    if '<' not in text and '&' not in text:
+        return text
+    is_html = bool(_TAGS.search(text) or _COMMENTS.search(text))
+    text = _DROP_BLOCKS.sub(' ', text)
+    text = _COMMENTS.sub(' ', text)
+    text = _LINE_BREAK_TAGS.sub('\n', text)
+    text = _LIST_ITEM_TAGS.sub('\n- ', text)
+    text = _TAGS.sub(' ', text)
+    if is_html:
+        text = '\n'.join(line.strip() for line in text.split('\n'))
+    return html.unescape(text)
+
+
+def collapse_whitespace(text: str) -> str:
+    """
+    Collapses runs of spaces within lines and trailing spaces, and keeps at most one blank line in
+    a row. Leading indentation is kept, so nested lists and indented examples keep their structure.
+    """
+    lines = []
+    for line in text.replace('\r\n', '\n').replace('\r', '\n').split('\n'):
+        indent = _INDENT.match(line).group()
+        body = _INLINE_SPACE.sub(' ', line[len(indent):]).rstrip()
+        lines.append(indent + body if body else '')
+    return _BLANK_LINES.sub('\n\n', '\n'.join(lines)).strip('\n')
+
+
+def remove_duplicates(text: str) -> str:
+    """
+    Drops bullets and sentences that repeat an earlier one (ignoring case, punctuation and bullet
+    markers), keeping the first occurrence and the original order.
+    """
+    seen = set()
+    lines: List[str] = []
+    for line in text.split('\n'):
+        if not line:
+            if lines and lines[-1]:
+                lines.append(line)
+            continue
+        if _BULLET.match(line):
+            key = _dedupe_key(_BULLET.sub('', line))
+            if key and key in seen:
+                continue
+            seen.add(key)
+            lines.append(line)
+            continue
+        sentences = []
+        for sentence in _SENTENCE_SPLIT.split(line):
+            key = _dedupe_key(sentence)
+            if key and key in seen:
+                continue
+            seen.add(key)
+            sentences.append(sentence)
+        if sentences:
+            lines.append(' '.join(sentences))
+    return '\n'.join(lines).strip('\n')
+
+
+def normalize_text(text: str) -> str:
+    """
+    Full compaction of catalog or guide text: markup removal, whitespace collapsing and
+    de-duplication of repeated sentences and bullets.
+    """
+    if not text:
+        return text
+    return remove_duplicates(collapse_whitespace(strip_markup(text)))
+
+
+def _dedupe_key(text: str) -> str:
+    return _KEY_CHARS.sub(' ', text.lower()).strip()
@@ -0,0 +1,123 @@
+# utils/token_estimator.py
+import os
+import re
+import math
+import logging
+import threading
+from typing import Callable, Dict, Optional
+
+# Average characters per token of the approximate estimator, per model family (lower-cased).
+# Families not listed use DEFAULT_CHARS_PER_TOKEN.
+CHARS_PER_TOKEN: Dict[str, float] = {
+    'claude': 3.5,
+    'gemini': 4.0,
+    'gpt': 4.0,
+}
+DEFAULT_CHARS_PER_TOKEN = 4.0
+
+# Where a truncated text may end: after a sentence, a line, or at least a word
+_SENTENCE_END = re.compile(r"[.!?](\s|$)|\n")
+TRUNCATION_MARKER = " ..."
+
+
+class TokenEstimator:
+    def __init__(self):
+        """
+        Counts tokens per model family.
+
+        A family can have its own tokenizer (a callable text -> token count, see register). When
+        the optional ``tiktoken`` package is installed, the families in TIKTOKEN_FAMILIES
+        (default "gpt,openai") use its cl100k_base encoding. The encoding may be downloaded on
+        first use, so it is loaded on the first count for one of those families, not at import.
+        Every other family falls back to a fast approximation from the character count, which
+        errs on the high side for prose.
+        """
+        self.logger = logging.getLogger(__name__)
+        self._counters: Dict[str, Callable[[str], int]] = {}
+        self._lock = threading.Lock()
+        self._tiktoken_families = {f.strip().lower() for f in os.getenv("TIKTOKEN_FAMILIES", "gpt,openai").split(',')
+                                   if f.strip()}
+        self._tiktoken_loaded = False
+
+    def register(self, family: str, counter: Callable[[str], int]) -> None:
+        """
+        Sets the tokenizer of a model family.
+
+        Args:
+            family (str): Model family name (case-insensitive).
+            counter (Callable[[str], int]): Returns the number of tokens in a text.
+        """
+        with self._lock:
+            self._counters[family.lower()] = counter
+
+    def count(self, text: str, family: Optional[str] = None) -> int:
+        if not text:
+            return 0
+        family = (family or '').lower()
+        counter = self._counters.get(family)
+        if counter is None and family in self._tiktoken_families and not self._tiktoken_loaded:
+            self._register_tiktoken()
+            counter = self._counters.get(family)
+        if counter is not None:
+            return counter(text)
+        return self.approximate(text, family)
+
+    @staticmethod
+    def approximate(text: str, family: Optional[str] = None) -> int:
+        if not text:
+            return 0
+        return math.ceil(len(text) / CHARS_PER_TOKEN.get((family or '').lower(), DEFAULT_CHARS_PER_TOKEN))
+
+    def truncate(self, text: str, max_tokens: int, family: Optional[str] = None) -> str:
+        """
+        Shortens a text to at most max_tokens, cutting at a sentence or line end when one is close
+        to the limit, else at a word boundary, and marking the cut.
+
+        Returns:
+            str: The text unchanged if it fits, else the truncated text.
+        """
+        tokens = self.count(text, family)
+        if tokens <= max_tokens:
+            return text
+        if max_tokens <= 0:
+            return ''
+        # Proportional cut, then shrink until it fits (at most a few rounds with real tokenizers)
+        limit = max(1, int(len(text) * max_tokens / tokens))
+        while True:
+            cut = self._cut(text[:limit])
+            if self.count(cut + TRUNCATION_MARKER, family) <= max_tokens or limit <= 1:
+                return cut + TRUNCATION_MARKER if cut else ''
+            limit = int(limit * 0.9)
+
+    @staticmethod
+    def _cut(text: str) -> str:
+        ends = [m.end() for m in _SENTENCE_END.finditer(text)]
+        # Prefer a sentence boundary unless it would drop more than a third of the allowance
+        if ends and ends[-1] >= len(text) * 2 / 3:
+            return text[:ends[-1]].rstrip()
+        space = text.rfind(' ')
+        return (text[:space] if space > len(text) / 2 else text).rstrip()
+
+    def _register_tiktoken(self) -> None:
+        with self._lock:
+            if self._tiktoken_loaded:
+                return
+            # Tried once: without tiktoken or its encoding these families keep the approximation
+            self._tiktoken_loaded = True
+            try:
+                import tiktoken
+            except ImportError:
+                return
+            try:
+                encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                # The encoding file is downloaded on first use and may be unavailable offline
+                self.logger.warning(f"tiktoken is installed but its encoding could not be loaded: {e}")
+                return
+            for family in self._tiktoken_families:
+                # Tokenizers registered explicitly take precedence
+                self._counters.setdefault(family, lambda text: len(encoding.encode(text, disallowed_special=())))
+
+
+# Shared estimator
+token_estimator = TokenEstimator()